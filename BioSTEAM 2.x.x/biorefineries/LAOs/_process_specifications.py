@@ -9,6 +9,7 @@
 import numpy as np
 import biosteam as bst
 from thermosteam.utils import get_instance
+from biorefineries.evaluation import scale_system, evaluate_across_TRY
 from . import units as units
 
 __all__ = ('LAOsProcessSpecifications',
@@ -216,6 +217,70 @@ class LAOsProcessSpecifications:
             plant_size / self.LAOs_over_alcohol * 907.18474 / 24. / self.operating_days
         )
     
+    def scale_plant_size(self, plant_size, check=False):
+        """
+        Load plant size specification and scale the converged system to the
+        new capacity without simulating the system.
+        
+        plant_size : float 
+            Plant size in ton product / yr of LAOs.
+        check=False : bool, optional
+            Whether to check linearity of mass and energy balances
+            (see :func:`~biorefineries.evaluation.scale_system`).
+        
+        Notes
+        -----
+        All other specifications should be the same as the last simulation.
+        
+        """
+        feed = self.fermentation_specification.feed
+        F_mass = feed.F_mass
+        self.load_plant_size(plant_size)
+        ratio = feed.F_mass / F_mass
+        feed.F_mass = F_mass
+        return scale_system(self.system, ratio, check)
+    
+    def evaluate_across_TRY(self, titer, yield_, metrics, productivities,
+                            processes=None):
+        """
+        Evaluate metrics at given titer and yield across a set of 
+        productivities. Return an array with the all metric results
+        (NaN at infeasible titer and yield).
+            
+        Parameters
+        ----------
+        titer : array_like[shape]
+            Titer to evaluate.
+        yield_ : array_like[shape]
+            Yield to evaluate.
+        metrics : Iterable[Callable; M elements]
+            Should return a number given no parameters.
+        productivities : array_like[P elements]
+            Productivities to evaluate.
+        processes=None : int, optional
+            Number of worker processes. Defaults to the number of CPUs.
+        
+        Returns
+        -------
+        results : array[shape x M x P]
+            All metric results at given titer/yield across productivities.
+        
+        Notes
+        -----
+        Slices along the last axis are evaluated in parallel
+        (see :func:`~biorefineries.evaluation.evaluate_across_TRY`).
+        
+        """
+        fspec = self.fermentation_specification
+        def load_titer_and_yield(titer, yield_):
+            fspec.load_yield(yield_)
+            fspec.load_titer(titer)
+            self.load_plant_size(self.plant_size)
+        return evaluate_across_TRY(self.system, fspec.reactor, 
+                                   load_titer_and_yield, fspec.load_productivity,
+                                   titer, yield_, metrics, productivities,
+                                   processes)
+    
     def load_dehydration_reactor_conversion(self, dehydration_reactor_conversion):
         self.dehydration_reactor.reaction.X[:] = self.dehydration_reactor_conversion = dehydration_reactor_conversion
     
@@ -8,13 +8,13 @@
 """
 """
 from biorefineries.cornstover.model import cornstover_model as model_cs
+from biorefineries.evaluation import evaluate_sequentially
 # from sklearn.model_selection import KFold, cross_validate
 
-N_samples = 5000
+N_samples = 5000 # Maximum; stops once percentiles and correlations converge
 rule = 'L'
-samples = model_cs.sample(N_samples, rule)
-model_cs.load_samples(samples)
-model_cs.evaluate()
+N_samples = evaluate_sequentially(model_cs, N_samples, rule=rule,
+                                  spearman_metrics=(model_cs.metrics[0],))
 model_cs.table.to_excel('Monte Carlo cornstover.xlsx')
 spearman = model_cs.spearman(metrics=(model_cs.metrics[0],))
 spearman.to_excel("Spearman correlation cornstover.xlsx")
@@ -13,6 +13,7 @@ from biorefineries.cornstover._chemicals import chemical_groups
 from biorefineries.cornstover import units
 import thermosteam.reaction as rxn
 import numpy as np
+from biorefineries.evaluation import use_linear_recycle_solver, use_distillation_design_cache
 
 
 __all__ = ('create_system',)
@@ -264,6 +265,8 @@ def create_system(ID='cornstover_sys'):
     ethanol_recycle_sys = System('ethanol_recycle_sys',
                                  path=(M402, D403, H402, U401),
                                  recycle=M402-0)
+    use_linear_recycle_solver(ethanol_recycle_sys)
+    use_distillation_design_cache(D402, D403)
     
     # Condense ethanol product
     H403 = bst.HXutility('H403', U401-1, V=0, T=350.)
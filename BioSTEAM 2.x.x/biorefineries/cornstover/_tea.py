@@ -115,7 +115,7 @@ class CellulosicEthanolTEA(TEA):
                  'construction', 'contingency', 'other_indirect_costs', 
                  'labor_cost', 'labor_burden', 'property_insurance',
                  'maintenance', '_ISBL_DPI_cached', '_FCI_cached',
-                 '_utility_cost_cached')
+                 '_utility_cost_cached', 'TCI_ratio')
     
     def __init__(self, system, IRR, duration, depreciation, income_tax,
                  operating_days, lang_factor, construction_schedule,
@@ -144,12 +144,25 @@ class CellulosicEthanolTEA(TEA):
         self.labor_burden = labor_burden
         self.property_insurance = property_insurance
         self.maintenance = maintenance
+        # A ratio used to adjust equipment installed cost, 1 equals baseline ratio,
+        # unit cost items are not changed so units need not be costed again
+        self.TCI_ratio = 1
     
     @property
     def utility_cost(self):
         self._utility_cost_cached = utility_cost = super().utility_cost
         return utility_cost
     
+    @property
+    def purchase_cost(self):
+        """Total purchase cost (USD) adjusted by the TCI ratio."""
+        return self.TCI_ratio * super().purchase_cost
+    
+    @property
+    def installed_equipment_cost(self):
+        """Total installed cost (USD) adjusted by the TCI ratio."""
+        return self.TCI_ratio * super().installed_equipment_cost
+    
     @property
     def ISBL_installed_equipment_cost(self):
         return self._ISBL_DPI(self.DPI)
@@ -157,16 +170,13 @@ class CellulosicEthanolTEA(TEA):
     @property
     def OSBL_installed_equipment_cost(self):
         if self.lang_factor:
-            return sum([i.purchase_cost for i in self.OSBL_units]) * self.lang_factor
+            return self.TCI_ratio * sum([i.purchase_cost for i in self.OSBL_units]) * self.lang_factor
         else:
-            return sum([i.installed_cost for i in self.OSBL_units])
+            return self.TCI_ratio * sum([i.installed_cost for i in self.OSBL_units])
     
     def _ISBL_DPI(self, installed_equipment_cost):
         """Direct permanent investment of units inside battery limits."""
-        if self.lang_factor:
-            self._ISBL_DPI_cached = installed_equipment_cost - sum([i.purchase_cost for i in self.OSBL_units]) * self.lang_factor
-        else:
-            self._ISBL_DPI_cached = installed_equipment_cost - sum([i.installed_cost for i in self.OSBL_units])
+        self._ISBL_DPI_cached = installed_equipment_cost - self.OSBL_installed_equipment_cost
         return self._ISBL_DPI_cached
         
     def _DPI(self, installed_equipment_cost):
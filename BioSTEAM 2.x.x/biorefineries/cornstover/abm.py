@@ -5,9 +5,13 @@ Created on Sun Sep 20 18:48:17 2020
 @author: yrc2
 """
 from biorefineries import cornstover as cs
+from biorefineries.evaluation import scale_system
 
 __all__ = ('ABM_TEA_model',)
 
+# Cornstover fraction of feedstock in last simulation
+_last_cornstover_fraction = None
+
 # From NREL/TP-5100-47764
 cornstover_dry_composition = cs.chemicals.kwarray(
     dict(Glucan=0.319,
@@ -62,6 +66,7 @@ def ABM_TEA_model(
         price_miscanthus=0.08, 
         price_ethanol=0.80,
         IRR=0.10,
+        scale_capacity=False,
     ):
     """
     Return a dictionary of biorefinery metrics for the production of cellulosic
@@ -83,6 +88,12 @@ def ABM_TEA_model(
         Price of ethanol in USD/kg.
     IRR : float
         Internal rate of return as a fraction (not percent!).
+    scale_capacity : bool
+        If True and the feedstock composition is the same as the last
+        call, mass and energy balances are scaled linearly to the new plant
+        capacity (with a linearity check that falls back to simulating the
+        system) instead of simulating the system. Only use if the cornstover
+        system was not changed or simulated elsewhere since the last call.
 
     Returns
     -------
@@ -92,17 +103,24 @@ def ABM_TEA_model(
         Electricity production [MWhr/yr], and Production [kg/yr].
     
     """
+    global _last_cornstover_fraction
     x_cornstover = cornstover_fraction
     if not 0. <= x_cornstover <= 1.:
         raise ValueError('cornstover fraction must be between 0 to 1; {x_cornstover} given')
-    set_mixed_cornstover_miscanthus_feedstock(x_cornstover)
     cs.cornstover.price = (price_cornstover * x_cornstover 
                            + price_miscanthus * (1 - x_cornstover))
     cs.ethanol.price = price_ethanol
     hours = operating_days * 24 
-    cs.cornstover.F_mass = plant_capacity / hours
+    F_mass = plant_capacity / hours
     cs.cornstover_tea.operating_days = operating_days
-    cs.cornstover_sys.simulate()
+    if scale_capacity and x_cornstover == _last_cornstover_fraction:
+        scale_system(cs.cornstover_sys, F_mass / cs.cornstover.F_mass, check=True)
+    else:
+        _last_cornstover_fraction = None
+        set_mixed_cornstover_miscanthus_feedstock(x_cornstover)
+        cs.cornstover.F_mass = F_mass
+        cs.cornstover_sys.simulate()
+        _last_cornstover_fraction = x_cornstover
     cs.cornstover_tea.IRR = IRR
     unit_group = cs.AllAreas
     return {
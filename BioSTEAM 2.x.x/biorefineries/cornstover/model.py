@@ -6,19 +6,26 @@ Created on Tue Aug 13 21:43:56 2019
 """
 from biosteam.evaluation import evaluation_tools as tools
 from biosteam.evaluation import Model, Metric
+from biorefineries.evaluation import UnitGroupResults, MetricGraph
 from biorefineries.cornstover import \
     cornstover_sys, cornstover_tea, \
     ethanol, cornstover, R301, ethanol_density_kggal, \
     areas, BT, Area700, AllAreas
 
 cornstover_sys.simulate()
-get_MESP = lambda: cornstover_tea.solve_price(ethanol) * ethanol_density_kggal
+# Area results are computed from unit results gathered once per sample
+unit_group_results = UnitGroupResults(AllAreas.units, areas)
+# Intermediate results shared by metrics are computed once per sample
+graph = MetricGraph(specification=unit_group_results.reset)
+get_MESP = graph.intermediate(
+    'MESP', f=lambda: cornstover_tea.solve_price(ethanol) * ethanol_density_kggal
+)
 get_FCI = lambda: cornstover_tea.FCI
 get_coproduct_credit = lambda: cornstover_tea.utility_cost
 get_ethanol_production = lambda: ethanol.F_mass
 get_steam_demand = lambda: BT.steam_demand.F_mass
-get_electricity_demand = AllAreas.get_electricity_consumption
-get_electricity_production = AllAreas.get_electricity_production
+get_electricity_demand = unit_group_results.getter('get_electricity_consumption')
+get_electricity_production = unit_group_results.getter('get_electricity_production')
 get_excess_electricity = lambda: get_electricity_production() - get_electricity_demand()
 
 metrics =[Metric('Minimum ethanol selling price', get_MESP, 'USD/gal'),
@@ -32,12 +39,13 @@ metrics =[Metric('Minimum ethanol selling price', get_MESP, 'USD/gal'),
 
 for i, area in enumerate(areas, 1):
     Area = f'Area {i}00'
+    getter = lambda name: unit_group_results.getter(name, area.name)
     metrics.extend(
-        (Metric('Electricity', area.get_electricity_consumption, 'MW', Area),
-         Metric('Cooling duty', area.get_cooling_duty, 'GJ/hr', Area),
-         Metric('Installed equipment cost', area.get_installed_cost, '10^6 USD', Area)))
+        (Metric('Electricity', getter('get_electricity_consumption'), 'MW', Area),
+         Metric('Cooling duty', getter('get_cooling_duty'), 'GJ/hr', Area),
+         Metric('Installed equipment cost', getter('get_installed_cost'), '10^6 USD', Area)))
 
-cornstover_model = Model(cornstover_sys, metrics)
+cornstover_model = Model(cornstover_sys, metrics, specification=graph)
 cornstover_model.load_default_parameters(cornstover, operating_days=False)
 cornstover_sys.simulate()
 param = cornstover_model.parameter
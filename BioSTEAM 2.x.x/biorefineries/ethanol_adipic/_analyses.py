@@ -73,91 +73,65 @@ Requirements:
 
 import numpy as np
 import pandas as pd
+import multiprocessing as mp
 from biosteam.utils import TicToc
 
 timer_efficacy = TicToc('timer_efficacy')
 timer_efficacy.tic()
  
+N_samples = 1000
 lignin = np.arange(0, 0.41, 0.01)
-conversion_max = np.ones(1000)
-conversion_min = np.zeros(1000)
 
-# Liquid hot water (LHW)
+# Parameters of the correlations (drawn in the order of the original analysis,
+# so the same samples are obtained with the same seed)
 np.random.seed(3221)
-intercept_LHW_1 = np.random.normal(0.84, 0.04, 1000)
-intercept_LHW_2 = np.random.normal(1.32, 0.07, 1000)
-slope_LHW_2 = np.random.normal(-2.33, 0.33, 1000)
-df_LHW = pd.DataFrame()
-
+# Liquid hot water (LHW)
+intercept_LHW_1 = np.random.normal(0.84, 0.04, N_samples)
+intercept_LHW_2 = np.random.normal(1.32, 0.07, N_samples)
+slope_LHW_2 = np.random.normal(-2.33, 0.33, N_samples)
 # Acid
-intercept_acid = np.random.normal(1.04, 0.04, 1000)
-slope_acid = np.random.normal(-1.37, 0.18, 1000)
-df_acid = pd.DataFrame()
-
+intercept_acid = np.random.normal(1.04, 0.04, N_samples)
+slope_acid = np.random.normal(-1.37, 0.18, N_samples)
 # Explosion (EXP)
-intercept_EXP = np.random.normal(0.83, 0.07, 1000)
-df_EXP = pd.DataFrame()
-
+intercept_EXP = np.random.normal(0.83, 0.07, N_samples)
 # Base
-intercept_base = np.random.normal(0.82, 0.09, 1000)
-df_base = pd.DataFrame()
-
+intercept_base = np.random.normal(0.82, 0.09, N_samples)
 # Inoic liquid (IL)
-intercept_IL = np.random.normal(1.52, 0.16, 1000)
-slope_IL = np.random.normal(-2.87, 0.61, 1000)
-df_IL = pd.DataFrame()
-
+intercept_IL = np.random.normal(1.52, 0.16, N_samples)
+slope_IL = np.random.normal(-2.87, 0.61, N_samples)
 # Organic acid (ORG)
-intercept_ORG = np.random.normal(0.90, 0.09, 1000)
-df_ORG = pd.DataFrame()
-
+intercept_ORG = np.random.normal(0.90, 0.09, N_samples)
 # Oxidative (OXD)
-intercept_OXD = np.random.normal(0.93, 0.04, 1000)
-df_OXD = pd.DataFrame()
-
-for i in range(1, 42):
-    LHW_individual_1 = intercept_LHW_1
-    LHW_individual_2 = intercept_LHW_2 + lignin[i-1]*slope_LHW_2
-    # Select the smaller of two LHW estimations
-    LHW_individual = np.minimum(LHW_individual_1, LHW_individual_2)
-    acid_individual = intercept_acid + lignin[i-1]*slope_acid
-    EXP_individual = intercept_EXP
-    base_individual = intercept_base
-    IL_individual = intercept_IL + lignin[i-1]*slope_IL
-    ORG_individual = intercept_ORG
-    OXD_individual = intercept_OXD
-    
-    # Constrict conversion to [0, 100%]
-    df_LHW[round(lignin[i-1],2)] = np.minimum(conversion_max, 
-                                              np.maximum(conversion_min, 
-                                                          LHW_individual))
-    df_acid[round(lignin[i-1],2)] = np.minimum(conversion_max, 
-                                                np.maximum(conversion_min, 
-                                                          acid_individual))
-    df_EXP[round(lignin[i-1],2)] = np.minimum(conversion_max, 
-                                              np.maximum(conversion_min, 
-                                                          EXP_individual))
-    df_base[round(lignin[i-1],2)] = np.minimum(conversion_max,
-                                                np.maximum(conversion_min,
-                                                          base_individual))
-    df_IL[round(lignin[i-1],2)] = np.minimum(conversion_max, 
-                                              np.maximum(conversion_min,
-                                                        IL_individual))
-    df_ORG[round(lignin[i-1],2)] = np.minimum(conversion_max, 
-                                              np.maximum(conversion_min,
-                                                          ORG_individual))
-    df_OXD[round(lignin[i-1],2)] = np.minimum(conversion_max, 
-                                              np.maximum(conversion_min,
-                                                          OXD_individual))
+intercept_OXD = np.random.normal(0.93, 0.04, N_samples)
+
+# Efficacies of all samples (rows) at all lignin contents (columns) 
+def compute_efficacy(intercept, slope=None):
+    if slope is None: 
+        return np.repeat(intercept[:, None], lignin.size, axis=1)
+    else:
+        return intercept[:, None] + slope[:, None] * lignin
+
+# Select the smaller of two LHW estimations
+efficacy_LHW = np.minimum(compute_efficacy(intercept_LHW_1),
+                          compute_efficacy(intercept_LHW_2, slope_LHW_2))
+efficacies = (efficacy_LHW,
+              compute_efficacy(intercept_acid, slope_acid),
+              compute_efficacy(intercept_EXP),
+              compute_efficacy(intercept_base),
+              compute_efficacy(intercept_IL, slope_IL),
+              compute_efficacy(intercept_ORG),
+              compute_efficacy(intercept_OXD))
+
+# Constrict conversion to [0, 100%]
+lignin_contents = lignin.round(2)
+df_LHW, df_acid, df_EXP, df_base, df_IL, df_ORG, df_OXD = dfs = [
+    pd.DataFrame(i.clip(0, 1), columns=lignin_contents) for i in efficacies
+]
 
 # Obtain conversion quantiles
-dfs =(df_LHW, df_acid, df_EXP, df_base, df_IL, df_ORG, df_OXD)
 indices = ['LHW', 'Acid', 'EXP', 'Base', 'IL', 'ORG', 'OXD']
-quantiles = [[df.quantile(q=i) for i in (0.05, 0.5, 0.95)] for df in dfs]
-
-df_stats = pd.concat([pd.concat(quantiles[indices.index(index)], axis=1) 
-                      for index in indices], 
-                      axis=1, keys=indices)
+df_stats = pd.concat([df.quantile(q=[0.05, 0.5, 0.95]).transpose() for df in dfs],
+                     axis=1, keys=indices)
 df_stats.rename_axis('Lignin content')
 
 # =============================================================================
@@ -188,6 +162,7 @@ from ethanol_adipic import system_acid as acid
 from ethanol_adipic import system_base as base
 from ethanol_adipic.chemicals import chems
 from ethanol_adipic import utils
+from biorefineries.evaluation import FeedstockComposition
 # from ethanol_adipic.utils import baseline_feedflow
 
 # Set feedstock flow rate
@@ -208,23 +183,26 @@ market_ethanol_price = 2.2 / _ethanol_kg_2_gal
 # From 80% moisture $/kg to $/dry-U.S. ton to $/kg with 20% moiture
 default_feedstock_price = 71.3 / _feedstock_factor
 
+# Feedstock flows of all compositions, relative compositions of hemicellulose
+# and the total flow of cellulose, hemicellulose, and lignin are kept
+# the same as the baseline
+feedstock_composition = FeedstockComposition(
+    acid.feedstock,
+    {'Cellulose': ('Glucan',),
+     'Hemicellulose': ('Xylan', 'Arabinan', 'Galactan', 'Mannan'),
+     'Lignin': ('Lignin',)})
+total_CHL_flow = sum([feedstock_composition.baseline[i[0]].sum()
+                      for i in feedstock_composition.groups.values()])
+feedstock_flows, feasible = feedstock_composition.flows(
+    {i: simulated_composition[i].values for i in feedstock_composition.groups},
+    total=total_CHL_flow)
+if not feasible.all():
+    raise ValueError('infeasible feedstock compositions in rows '
+                     f'{np.where(~feasible)[0].tolist()}')
+
 # Function to adjust feedstock flows
-index_dict = {'Cellulose': [chems.index('Glucan')],
-              'Hemicellulose': chems.indices(('Xylan', 'Arabinan', 'Galactan', 'Mannan')),
-              'Lignin': [chems.index('Lignin')]}
-
-indices = sum([index_dict[i] for i in index_dict.keys()], [])
-total_CHL_flow = baseline_feedflow[indices].sum()
-baseline_hemicellulose_flow = baseline_feedflow[index_dict['Hemicellulose']].sum()
-hemicellulose_ratio = {i: baseline_feedflow[i]/baseline_hemicellulose_flow
-                       for i in index_dict['Hemicellulose']}
-
-def update_feedstock_flows(feedstock, composition):
-    feedstock.imass['Glucan'] = total_CHL_flow * composition['Cellulose']
-    feedstock.imass['Lignin'] = total_CHL_flow * composition['Lignin']
-    total_hemicellulose_flow = total_CHL_flow * composition['Hemicellulose']
-    for i in index_dict['Hemicellulose']:
-        feedstock.mass[i] = total_hemicellulose_flow * hemicellulose_ratio[i]
+def update_feedstock_flows(feedstock, i):
+    feedstock.mass = feedstock_flows[i]
 
 # Function to compute the amount of electricity generated in 10^6 kWh/y,
 # positive indicates net production and negative indicates net consumption,
@@ -256,65 +234,60 @@ def compute_MFPP(feedstock, tea):
 # Run the acid-pretreatment biorefinery for different feedstock compositions
 # =============================================================================
 
-timer_acid = TicToc('timer_acid')
-timer_acid.tic()
-
-# This is for double-checking, simulated total flow rates should be the same 
-# as the default value (default_total_flow, 104180 kg/hr)
-acid_total_flow = []
-
-# These lists store output results
-acid_conversions_C6 = []
-acid_conversions_C5 = []
-acid_ethanol_yields = []
-acid_produced_electricity = []
-acid_MESPs = []
-acid_MFPPs = []
-
-# Run assumed compositions (varying cellulose, hemicellulose, and lignin compositions
-# while keeping compositions of other components unchanged).
-# The first composition in the file is the default one as in refs [1-3]
-feedstock_dry_mass = acid.feedstock.F_mass - acid.feedstock.imass['Water']
-acid_group = UnitGroup('Acid pretreatment', acid.ethanol_sys.units)
-acid_factor = acid.ethanol_no_CHP_tea._annual_factor
-for i in range(0, simulated_composition.shape[0]):
-    # Update feedstock flow
-    update_feedstock_flows(acid.feedstock, simulated_composition.iloc[i])
-    
-    # Adjust cellulose conversion 
-    lignin_percent = acid.feedstock.imass['Lignin'] / feedstock_dry_mass
-    # 0.04 and 0.012 are cellulose (glucan) conversion to other products,
-    # subtract 1e-6 to avoid getting tiny negatives,
-    # 1.04-1.37*lignin_percent is the developed correlation
-    C6_conversion = min(1-0.04-0.012-1e-6, max(0, (1.04-1.37*lignin_percent)))
-    acid.R301.saccharification_rxns_C6[2].X = C6_conversion
-
-    # Adjust hemicellulose conversion
-    # 0.05 and 0.024 are cellulose (glucan) conversion to other products,
-    # subtract 1e-6 to avoid getting tiny negatives
-    C5_conversion = min(1-0.05-0.024-1e-6, C6_conversion)
-    acid.R201.pretreatment_rxns[4].X = C5_conversion # xylan
-    acid.R201.pretreatment_rxns[9].X = C5_conversion # mannan
-    acid.R201.pretreatment_rxns[12].X = C5_conversion # galactan
-    acid.R201.pretreatment_rxns[15].X = C5_conversion # arabinanan
+N_compositions = simulated_composition.shape[0]
+
+# Results are stored by run (rows) in preallocated arrays with columns of
+# total flow (for double-checking, simulated total flow rates should be the same 
+# as the default value, 104180 kg/hr), cellulose conversion, hemicellulose
+# conversion, produced electricity, ethanol yield, MESP, and MFPP
+def run_acid():
+    timer_acid = TicToc('timer_acid')
+    timer_acid.tic()
+    results = np.zeros([N_compositions, 7])
+    # Run assumed compositions (varying cellulose, hemicellulose, and lignin compositions
+    # while keeping compositions of other components unchanged).
+    # The first composition in the file is the default one as in refs [1-3]
+    feedstock_dry_mass = acid.feedstock.F_mass - acid.feedstock.imass['Water']
+    acid_group = UnitGroup('Acid pretreatment', acid.ethanol_sys.units)
+    acid_factor = acid.ethanol_no_CHP_tea._annual_factor
+    for i in range(N_compositions):
+        # Update feedstock flow
+        update_feedstock_flows(acid.feedstock, i)
+        
+        # Adjust cellulose conversion 
+        lignin_percent = acid.feedstock.imass['Lignin'] / feedstock_dry_mass
+        # 0.04 and 0.012 are cellulose (glucan) conversion to other products,
+        # subtract 1e-6 to avoid getting tiny negatives,
+        # 1.04-1.37*lignin_percent is the developed correlation
+        C6_conversion = min(1-0.04-0.012-1e-6, max(0, (1.04-1.37*lignin_percent)))
+        acid.R301.saccharification_rxns_C6[2].X = C6_conversion
     
-    # Simulate system and log results
-    acid.ethanol_sys.simulate()
-    acid_total_flow.append(acid.feedstock.F_mass)
-    acid_conversions_C6.append(C6_conversion)    
-    acid_conversions_C5.append(C5_conversion)
-    acid_produced_electricity.append(compute_electricity(acid_group, acid_factor))
-    acid_ethanol_yields.append(compute_ethanol_yield(acid.ethanol, acid.feedstock))
+        # Adjust hemicellulose conversion
+        # 0.05 and 0.024 are cellulose (glucan) conversion to other products,
+        # subtract 1e-6 to avoid getting tiny negatives
+        C5_conversion = min(1-0.05-0.024-1e-6, C6_conversion)
+        acid.R201.pretreatment_rxns[4].X = C5_conversion # xylan
+        acid.R201.pretreatment_rxns[9].X = C5_conversion # mannan
+        acid.R201.pretreatment_rxns[12].X = C5_conversion # galactan
+        acid.R201.pretreatment_rxns[15].X = C5_conversion # arabinanan
+        
+        # Simulate system and log results
+        acid.ethanol_sys.simulate()
+        row = results[i]
+        row[:5] = (acid.feedstock.F_mass, C6_conversion, C5_conversion,
+                   compute_electricity(acid_group, acid_factor),
+                   compute_ethanol_yield(acid.ethanol, acid.feedstock))
+        
+        acid.feedstock.price = default_feedstock_price
+        row[5] = compute_MESP(acid.ethanol, acid.ethanol_tea)
+       
+        acid.ethanol.price = market_ethanol_price
+        row[6] = compute_MFPP(acid.feedstock, acid.ethanol_tea)
+        print(f'Acid run #{i+1}: {timer_acid.elapsed_time/60:.1f} min')
     
-    acid.feedstock.price = default_feedstock_price
-    acid_MESPs.append(compute_MESP(acid.ethanol, acid.ethanol_tea))
-   
-    acid.ethanol.price = market_ethanol_price
-    acid_MFPPs.append(compute_MFPP(acid.feedstock, acid.ethanol_tea))
-    print(f'Run #{len(acid_MESPs)}: {timer_acid.elapsed_time/60:.1f} min')
-
-print(f'\nSimulation time: {timer_acid.elapsed_time/60:.1f} min')
-print('\n-------- Acid-Pretreatment Biorefinery Simulation Completed --------\n\n')
+    print(f'\nSimulation time: {timer_acid.elapsed_time/60:.1f} min')
+    print('\n-------- Acid-Pretreatment Biorefinery Simulation Completed --------\n\n')
+    return results
 
 
 # %%
@@ -323,57 +296,45 @@ print('\n-------- Acid-Pretreatment Biorefinery Simulation Completed --------\n\
 # Run the base-pretreatment biorefinery for different feedstock compositions
 # =============================================================================
 
-timer_base = TicToc('timer_base')
-timer_base.tic()
-
-base.R502.set_titer_limit = False
-
-# This is for double-checking, simulated total flow rates should be the same 
-# as the default value (104180 kg/hr)
-base_total_flow = []
-
-# These lists store output results, conversions for C6 and C5 are the same
-# (no constrains from other products)
-base_conversions = []
-base_muconic_titers = []
-base_produced_electricity = []
-base_ethanol_yields = []
-base_MESPs = []
-base_MFPPs = []
-
-# Run assumed compositions (varying cellulose, hemicellulose, and lignin compositions
-# while keeping compositions of other components unchanged).
-# The first composition in the file is the default one as in refs [1-3]
-base_group = UnitGroup('Base pretreatment', base.ethanol_adipic_sys.units)
-base_factor = base.ethanol_adipic_no_CHP_tea._annual_factor
-for i in range(0, simulated_composition.shape[0]):
-    update_feedstock_flows(base.feedstock, simulated_composition.iloc[i])
-    
-    # Adjust cellulose and hemicellulose conversions, 0.82 based on developed correlation
-    conversion = 0.82
-    # Cellulose
-    base.R301.saccharification_rxns_C6.X[2] = conversion
-    # Xylan and arabinan, no mention of other carbohydrates conversion in the
-    # baseline based on ref [2]
-    base.R301.saccharification_rxns_C5.X[:] = conversion
-    
-    # Simulate system and log results
-    base.ethanol_adipic_sys.simulate()
-    base_total_flow.append(base.feedstock.F_mass)
-    base_conversions.append(conversion)
-    base_muconic_titers.append(base.R502.effluent_titer)
-    base_produced_electricity.append(compute_electricity(base_group, base_factor))
-    base_ethanol_yields.append(compute_ethanol_yield(base.ethanol, base.feedstock))
-
-    base.feedstock.price = default_feedstock_price
-    base_MESPs.append(compute_MESP(base.ethanol, base.ethanol_adipic_tea))
-    
-    base.ethanol.price = market_ethanol_price
-    base_MFPPs.append(compute_MFPP(base.feedstock, base.ethanol_adipic_tea))
-    print(f'Run #{len(base_MESPs)}: {timer_base.elapsed_time/60:.1f} min')
+# Columns are total flow, carbohydrate conversion (conversions for C6 and C5
+# are the same, no constrains from other products), muconic acid titer,
+# produced electricity, ethanol yield, MESP, and MFPP
+def run_base():
+    timer_base = TicToc('timer_base')
+    timer_base.tic()
+    base.R502.set_titer_limit = False
+    results = np.zeros([N_compositions, 7])
+    # Run assumed compositions (varying cellulose, hemicellulose, and lignin compositions
+    # while keeping compositions of other components unchanged).
+    # The first composition in the file is the default one as in refs [1-3]
+    for i in range(N_compositions):
+        update_feedstock_flows(base.feedstock, i)
+        
+        # Adjust cellulose and hemicellulose conversions, 0.82 based on developed correlation
+        conversion = 0.82
+        # Cellulose
+        base.R301.saccharification_rxns_C6.X[2] = conversion
+        # Xylan and arabinan, no mention of other carbohydrates conversion in the
+        # baseline based on ref [2]
+        base.R301.saccharification_rxns_C5.X[:] = conversion
+        
+        # Simulate system and log results
+        base.ethanol_adipic_sys.simulate()
+        row = results[i]
+        row[:5] = (base.feedstock.F_mass, conversion, base.R502.effluent_titer,
+                   compute_electricity(base_group, base_factor),
+                   compute_ethanol_yield(base.ethanol, base.feedstock))
     
-print(f'\nSimulation time: {timer_base.elapsed_time/60:.1f} min')
-print('\n-------- Base-Pretreatment Biorefinery Simulation Completed --------\n\n')
+        base.feedstock.price = default_feedstock_price
+        row[5] = compute_MESP(base.ethanol, base.ethanol_adipic_tea)
+        
+        base.ethanol.price = market_ethanol_price
+        row[6] = compute_MFPP(base.feedstock, base.ethanol_adipic_tea)
+        print(f'Base run #{i+1}: {timer_base.elapsed_time/60:.1f} min')
+        
+    print(f'\nSimulation time: {timer_base.elapsed_time/60:.1f} min')
+    print('\n-------- Base-Pretreatment Biorefinery Simulation Completed --------\n\n')
+    return results
 
 
 # %%
@@ -384,40 +345,63 @@ print('\n-------- Base-Pretreatment Biorefinery Simulation Completed --------\n\
 # for baseline feedstock composition only.
 # =============================================================================
 
-timer_varied = TicToc('timer_varied')
-timer_varied.tic()
-
-base.R502.set_titer_limit = False
-
-# These lists store output results
-varied_conversion_muconic_titers = []
-varied_conversion_produced_electricity = []
-# Ethanol yields should not change for different titers
-varied_conversion_ethanol_yields = []
-varied_conversion_MESPs = []
-varied_conversion_MFPPs = []
-
 lignin_conversions = np.linspace(0.01, 1, 100)
-for i in lignin_conversions:
-    base.feedstock.mass = baseline_feedflow
-    # Adjust muconic acid titer by changing lignin conversion during fermentation
-    base.R502.main_fermentation_rxns.X[-1] = i
-
-    # Simulate system and log results
-    base.ethanol_adipic_sys.simulate()
-    varied_conversion_muconic_titers.append(base.R502.effluent_titer)
-    varied_conversion_produced_electricity.append(compute_electricity(base_group, base_factor))
-    varied_conversion_ethanol_yields.append(compute_ethanol_yield(base.ethanol, base.feedstock))
+
+# Columns are muconic acid titer, produced electricity, ethanol yield
+# (should not change for different titers), MESP, and MFPP
+def run_varied_conversion():
+    timer_varied = TicToc('timer_varied')
+    timer_varied.tic()
+    base.R502.set_titer_limit = False
+    # Same carbohydrate conversions as in the base-pretreatment runs
+    base.R301.saccharification_rxns_C6.X[2] = 0.82
+    base.R301.saccharification_rxns_C5.X[:] = 0.82
+    results = np.zeros([lignin_conversions.size, 5])
+    for i, conversion in enumerate(lignin_conversions):
+        base.feedstock.mass = baseline_feedflow
+        # Adjust muconic acid titer by changing lignin conversion during fermentation
+        base.R502.main_fermentation_rxns.X[-1] = conversion
     
-    base.feedstock.price = default_feedstock_price
-    varied_conversion_MESPs.append(compute_MESP(base.ethanol, base.ethanol_adipic_tea))
+        # Simulate system and log results
+        base.ethanol_adipic_sys.simulate()
+        row = results[i]
+        row[:3] = (base.R502.effluent_titer,
+                   compute_electricity(base_group, base_factor),
+                   compute_ethanol_yield(base.ethanol, base.feedstock))
+        
+        base.feedstock.price = default_feedstock_price
+        row[3] = compute_MESP(base.ethanol, base.ethanol_adipic_tea)
+        
+        base.ethanol.price = market_ethanol_price
+        row[4] = compute_MFPP(base.feedstock, base.ethanol_adipic_tea)
+        print(f'Varied-conversion run #{i+1}: {timer_varied.elapsed_time/60:.1f} min')
     
-    base.ethanol.price = market_ethanol_price
-    varied_conversion_MFPPs.append(compute_MFPP(base.feedstock, base.ethanol_adipic_tea)) 
-    print(f'Run #{len(varied_conversion_MESPs)}: {timer_varied.elapsed_time/60:.1f} min')
+    print(f'\nSimulation time: {timer_varied.elapsed_time/60:.1f} min')
+    print('\n-------- Varied-conversion Simulation Completed --------\n\n')
+    return results
+
+
+# %%
+
+# =============================================================================
+# Run all studies, each in a forked process (the acid and base biorefineries
+# are created before forking, so workers do not build them again)
+# =============================================================================
+
+base_group = UnitGroup('Base pretreatment', base.ethanol_adipic_sys.units)
+base_factor = base.ethanol_adipic_no_CHP_tea._annual_factor
+studies = (run_acid, run_base, run_varied_conversion)
+
+def run_study(index):
+    return studies[index]()
 
-print(f'\nSimulation time: {timer_varied.elapsed_time/60:.1f} min')
-print('\n-------- Varied-conversion Simulation Completed --------\n\n')
+if 'fork' in mp.get_all_start_methods():
+    with mp.get_context('fork').Pool(len(studies)) as pool:
+        acid_results, base_results, varied_conversion_results = pool.map(
+            run_study, range(len(studies))
+        )
+else:
+    acid_results, base_results, varied_conversion_results = [i() for i in studies]
 
 
 # %%
@@ -426,39 +410,40 @@ print('\n-------- Varied-conversion Simulation Completed --------\n\n')
 # Save biorefinery simulation results in Excel
 # =============================================================================
 
+acid_columns = ('Acid total flow',
+                'Acid cellulose conversion',
+                'Acid hemicellulose conversion',
+                'Acid produced electricity [10^6 kWh/y]',
+                'Acid ethanol yield [gal/dry-ton]',
+                'Acid minimum ethanol selling price [2016$/gal]',
+                'Acid maximum feedstock payment price [2016$/dry-ton]')
+base_columns = ('Base total flow',
+                'Base carbohydrate conversion',
+                'Base muconic acid titer [g/L]',
+                'Base produced electricity [10^6 kWh/y]',
+                'Base ethanol yield [gal/dry-ton]',
+                'Base minimum ethanol selling price [2016$/gal]',
+                'Base maximum feedstock payment price [2016$/dry-ton]')
 df_varied_composition_results = pd.DataFrame(
     {'Cellulose': simulated_composition['Cellulose'],
      'Hemicellulose': simulated_composition['Hemicellulose'],
      'Lignin': simulated_composition['Lignin'],
-     'Acid total flow': acid_total_flow,
-     'Acid cellulose conversion': acid_conversions_C6,
-     'Acid hemicellulose conversion': acid_conversions_C5,
-     'Acid produced electricity [10^6 kWh/y]': acid_produced_electricity,
-     'Acid ethanol yield [gal/dry-ton]': acid_ethanol_yields,
-     'Acid minimum ethanol selling price [2016$/gal]': acid_MESPs,
-     'Acid maximum feedstock payment price [2016$/dry-ton]': acid_MFPPs,
-     'Base total flow': base_total_flow,
-     'Base carbohydrate conversion': base_conversions,
-     'Base muconic acid titer [g/L]': base_muconic_titers,
-     'Base produced electricity [10^6 kWh/y]': base_produced_electricity,
-     'Base ethanol yield [gal/dry-ton]': base_ethanol_yields,
-     'Base minimum ethanol selling price [2016$/gal]': base_MESPs,
-     'Base maximum feedstock payment price [2016$/dry-ton]': base_MFPPs,
-     'Electricity difference (acid-base)':
-         np.asarray(acid_produced_electricity)-np.asarray(base_produced_electricity),
-     'Ethanol yield difference (acid-base)':
-         np.asarray(acid_ethanol_yields)-np.asarray(base_ethanol_yields),
-     'MESP difference (acid-base)': np.asarray(acid_MESPs)-np.asarray(base_MESPs),
-     'MFPP difference (acid-base)': np.asarray(acid_MFPPs)-np.asarray(base_MFPPs)
+     **dict(zip(acid_columns, acid_results.transpose())),
+     **dict(zip(base_columns, base_results.transpose())),
+     'Electricity difference (acid-base)': acid_results[:, 3] - base_results[:, 3],
+     'Ethanol yield difference (acid-base)': acid_results[:, 4] - base_results[:, 4],
+     'MESP difference (acid-base)': acid_results[:, 5] - base_results[:, 5],
+     'MFPP difference (acid-base)': acid_results[:, 6] - base_results[:, 6]
     })
 
+varied_conversion_columns = ('Muconic acid titer [g/L]',
+                             'Produced electricity [10^6 kWh/y]',
+                             'Ethanol yield [gal/dry-ton]',
+                             'Minimum ethanol selling price [2016$/gal]',
+                             'Maximum feedstock payment price [2016$/dry-ton]')
 df_varied_conversion_results = pd.DataFrame(
     {'Lignin conversion': lignin_conversions,
-     'Muconic acid titer [g/L]': varied_conversion_muconic_titers,
-     'Produced electricity [10^6 kWh/y]': varied_conversion_produced_electricity,
-     'Ethanol yield [gal/dry-ton]': varied_conversion_ethanol_yields,
-     'Minimum ethanol selling price [2016$/gal]': varied_conversion_MESPs,
-     'Maximum feedstock payment price [2016$/dry-ton]': varied_conversion_MFPPs
+     **dict(zip(varied_conversion_columns, varied_conversion_results.transpose()))
      })
 
 with pd.ExcelWriter('Biorefinery results.xlsx') as writer:
@@ -1243,11 +1243,12 @@ class AnaerobicDigestion(Unit):
         f_CO2 = 0.49 * 0.86/0.91/biogas_MW	
         f_sludge = 0.05 * 1/0.91/chems.WWTsludge.MW	
         	
-        def anaerobic_rxn(reactant):	
-            MW = getattr(chems, reactant).MW	
+        def anaerobic_rxn(reactant, MW):	
             return Rxn(f'{1/MW}{reactant} -> {f_CH4}CH4 + {f_CO2}CO2 + {f_sludge}WWTsludge',	
                        reactant, 0.91)	
-        self.digestion_rxns = ParallelRxn([anaerobic_rxn(i) for i in self.reactants])
+        MWs = chems.MW[chems.indices(self.reactants)]
+        self.digestion_rxns = ParallelRxn([anaerobic_rxn(i, MW) for i, MW
+                                           in zip(self.reactants, MWs)])
 
         self.sulfate_rxns = ParallelRxn([
             #   Reaction definition                           Reactant    Conversion
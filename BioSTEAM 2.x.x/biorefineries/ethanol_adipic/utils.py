@@ -104,22 +104,43 @@ def compute_muconic_titer(stream, V=None):
 #     C_nH_aO_bN_c + (n+a/4-b/2-3/4c)O2 -> nCO2 + (a/2-3/2c)H2O +cNH3
 # =============================================================================
 
-def compute_COD(IDs, stream):
-    unit_COD = []
-    if not iter(IDs):
-        raise TypeError(f'{IDs.__class__} is not iterable')
+# Stoichiometric O2 demands by Chemicals object and chemical IDs
+_COD_coefficients = {}
+
+def get_COD_coefficients(IDs, chemicals):
+    """
+    Return an array of stoichiometric O2 demands (kmol-O2/kmol) aligned with
+    the index of `chemicals`, chemicals not in `IDs` have a demand of 0.
+    Arrays are computed only once for each Chemicals object and IDs.
+    """
     if isinstance(IDs, str):
         IDs = (IDs,)
+    elif not iter(IDs):
+        raise TypeError(f'{IDs.__class__} is not iterable')
+    IDs = tuple(IDs)
+    key = (id(chemicals), IDs)
+    if key in _COD_coefficients: return _COD_coefficients[key][1]
+    coefficients = np.zeros(chemicals.size)
     for i in IDs:
-        if i not in stream.chemicals.IDs: continue
-        chemical = getattr(stream.chemicals, i)
+        if i not in chemicals.IDs: continue
         atoms = {}
         for j in ('C', 'H', 'O', 'N'): atoms[j] = 0
-        atoms.update(chemical.atoms)
+        atoms.update(getattr(chemicals, i).atoms)
         COD_ratio = atoms['C'] + atoms['H']/4 - atoms['O']/2 - 3/4*atoms['N']
-        unit_COD.append(COD_ratio)
-    unit_COD = np.asarray(unit_COD)
-    return unit_COD.sum()*32
+        coefficients[chemicals.index(i)] += COD_ratio
+    # Chemicals are kept alive so that their id is not reused
+    _COD_coefficients[key] = (chemicals, coefficients)
+    return coefficients
+
+# Note that the sum of stoichiometric O2 demands of all COD chemicals
+# (regardless of their flow) is used as the COD flow for design, 
+# use compute_stream_COD for the COD flow of the stream
+def compute_COD(IDs, stream):
+    return get_COD_coefficients(IDs, stream.chemicals).sum()*32
+
+def compute_stream_COD(IDs, stream):
+    """Return the COD flow of the stream (kg-O2/hr)."""
+    return get_COD_coefficients(IDs, stream.chemicals) @ stream.mol * 32
 
 
 # %%
@@ -159,6 +180,22 @@ def find_split(IDs, flow0, flow1, chemical_groups):
     array[chemicals.index('WWTsludge')] = array[chemicals.index('Z_mobilis')]
     return array
 
+
+# %% 
+
+# =============================================================================
+# Function to set convergence settings of a system and all of its subsystems
+# (instead of the System class, so other systems are not affected)
+# =============================================================================
+
+def set_convergence(system, converge_method, maxiter, molar_tolerance):
+    system.maxiter = maxiter
+    system.molar_tolerance = molar_tolerance
+    if system.recycle: system.converge_method = converge_method
+    for i in system.subsystems:
+        set_convergence(i, converge_method, maxiter, molar_tolerance)
+
+
 IDs = ('Ethanol', 'H2O', 'Glucose', 'Xylose', 'OtherSugars',
     'SugarOligomers', 'OrganicSolubleSolids', 'InorganicSolubleSolids', 'Ammonia', 'AceticAcid', 
     'SulfuricAcid', 'Furfurals', 'OtherOrganics', 'CO2', 'CH4',
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import os
+import warnings
+import numpy as np
+import thermosteam as tmo
+from . import _fork
+
+__all__ = ('evaluate_across_TRY',)
+
+def _recost(system, reactor):
+    # Productivity only changes the residence time of the reactor, so only
+    # the reactor and facilities (which depend on its utilities) are updated
+    reactor._summary()
+    for i in system.facilities: getattr(i, 'simulate', i)()
+
+def _evaluate_slice(args):
+    (system, reactor, load_titer_and_yield, load_productivity,
+     metrics, productivities) = _fork.context
+    titers, yields = args
+    streams = system.streams
+    data = np.full([len(titers), len(metrics), len(productivities)], np.nan)
+    # Converged state of the last feasible point
+    mols = [i.mol.copy() for i in streams]
+    for n, (titer, yield_) in enumerate(zip(titers, yields)):
+        try:
+            # The titer is solved starting from the substrate concentration
+            # and the system is simulated starting from the converged state
+            # of the previous point (i.e., numerical continuation)
+            load_titer_and_yield(titer, yield_)
+            system.simulate()
+        except Exception:
+            tmo.reaction.CHECK_FEASIBILITY = True
+            for i, mol in zip(streams, mols): i.mol[:] = mol
+            continue
+        for i, mol in zip(streams, mols): mol[:] = i.mol
+        for m, productivity in enumerate(productivities):
+            load_productivity(productivity)
+            _recost(system, reactor)
+            data[n, :, m] = [i() for i in metrics]
+    return data
+
+def evaluate_across_TRY(system, reactor, load_titer_and_yield, load_productivity,
+                        titer, yield_, metrics, productivities, processes=None):
+    """
+    Evaluate metrics across titer and yield (each point by simulating the
+    system) and across productivities (each point by recosting the reactor
+    and facilities). Return an array with all metric results.
+
+    Parameters
+    ----------
+    system : System
+        Should simulate the complete process.
+    reactor : Unit
+        Reactor with a residence time that depends on the productivity.
+    load_titer_and_yield : function
+        Should load titer and yield specifications given as arguments
+        (and any other specification that depends on them).
+    load_productivity : function
+        Should load productivity specification.
+    titer : array_like[shape]
+        Titers to evaluate.
+    yield_ : array_like[shape]
+        Yields to evaluate.
+    metrics : Iterable[Callable; M elements]
+        Should return a number given no parameters.
+    productivities : array_like[P elements]
+        Productivities to evaluate.
+    processes=None : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    results : array[shape x M x P]
+        All metric results at given titer/yield across productivities.
+        Results at infeasible titer/yield points are NaN.
+
+    Notes
+    -----
+    Titer and yield are broadcasted together and divided into slices along
+    the last axis (e.g., titers at a given yield for meshgrid arrays). Each
+    slice is evaluated in a forked worker process in order, so that each
+    titer root and system simulation begins at the solution of the
+    previous point. Points where the titer cannot be achieved or the system
+    fails to converge are skipped and the last converged state is restored.
+
+    """
+    titer, yield_ = np.broadcast_arrays(np.asarray(titer, dtype=float),
+                                        np.asarray(yield_, dtype=float))
+    shape = titer.shape
+    N = shape[-1] if shape else 1
+    slices = list(zip(titer.reshape([-1, N]), yield_.reshape([-1, N])))
+    metrics = tuple(metrics)
+    productivities = np.asarray(productivities, dtype=float)
+    if processes is None: processes = os.cpu_count() or 1
+    processes = min(processes, len(slices))
+    shared = (system, reactor, load_titer_and_yield, load_productivity,
+              metrics, productivities)
+    with _fork.forked_pool(processes, shared) as pool:
+        if pool:
+            results = pool.map(_evaluate_slice, slices)
+        else:
+            results = [_evaluate_slice(i) for i in slices]
+    data = np.array(results).reshape([*shape, len(metrics), productivities.size])
+    infeasible = np.isnan(data).all(axis=(-1, -2)).sum()
+    if infeasible:
+        warnings.warn(f'{infeasible} titer-yield points are infeasible; '
+                       'results are NaN', RuntimeWarning)
+    return data
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Tools shared by the biorefinery models for evaluating metrics under uncertainty.
+
+"""
+from . import (_unit_group_results,
+               _metric_graph,
+               _coordinate,
+               _composition,
+               _capacity,
+               _TRY,
+               _service,
+               _sequential,
+               _morris,
+               _polynomial_chaos,
+               _sobol,
+               _fault_isolation,
+               _linear_recycle,
+               _multi_fidelity,
+               _tornado,
+               _design_cache,
+               _convergence_diagnostics,
+               _shared_memory,
+               _work_queue,
+)
+
+__all__ = (*_unit_group_results.__all__,
+           *_metric_graph.__all__,
+           *_coordinate.__all__,
+           *_composition.__all__,
+           *_capacity.__all__,
+           *_TRY.__all__,
+           *_service.__all__,
+           *_sequential.__all__,
+           *_morris.__all__,
+           *_polynomial_chaos.__all__,
+           *_sobol.__all__,
+           *_fault_isolation.__all__,
+           *_linear_recycle.__all__,
+           *_multi_fidelity.__all__,
+           *_tornado.__all__,
+           *_design_cache.__all__,
+           *_convergence_diagnostics.__all__,
+           *_shared_memory.__all__,
+           *_work_queue.__all__,
+)
+
+from ._unit_group_results import *
+from ._metric_graph import *
+from ._coordinate import *
+from ._composition import *
+from ._capacity import *
+from ._TRY import *
+from ._service import *
+from ._sequential import *
+from ._morris import *
+from ._polynomial_chaos import *
+from ._sobol import *
+from ._fault_isolation import *
+from ._linear_recycle import *
+from ._multi_fidelity import *
+from ._tornado import *
+from ._design_cache import *
+from ._convergence_diagnostics import *
+from ._shared_memory import *
+from ._work_queue import *
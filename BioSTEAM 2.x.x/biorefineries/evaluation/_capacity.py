@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+
+__all__ = ('scale_flows', 'scale_system')
+
+def scale_flows(system, ratio, feeds=True):
+    """
+    Scale flow rates of all streams and utilities of a system by a capacity
+    ratio (temperatures, pressures, and compositions remain the same).
+
+    Parameters
+    ----------
+    system : System
+        Converged system.
+    ratio : float
+        Ratio of new to current capacity.
+    feeds=True : bool, optional
+        If False, feed streams are not scaled.
+
+    Notes
+    -----
+    Scaled flows of all streams except feeds (which are set by the
+    specifications) can also be used as the initial guess of a rigorous
+    simulation at the new capacity.
+
+    """
+    streams = system.streams if feeds else system.streams.difference(system.feeds)
+    for i in streams: i.mol *= ratio
+    for i in system.units:
+        for hu in i.heat_utilities: hu.scale(ratio)
+        i.power_utility.scale(ratio)
+
+def _run_path_once(system):
+    for unit in system._unit_path:
+        unit._load_stream_links()
+        unit._setup()
+        specification = unit._specification
+        specification() if specification else unit._run()
+
+def _max_relative_residual(streams, mols):
+    residual = 0.
+    for stream, mol in zip(streams, mols):
+        total = np.abs(mol).sum()
+        if not total: continue
+        error = np.abs(stream.mol - mol).sum() / total
+        if error > residual: residual = error
+    return residual
+
+def scale_system(system, ratio, check=False, rtol=1e-3):
+    """
+    Scale a converged system to a new capacity assuming mass and energy
+    balances are linear with feed flow rates, and redo only the design and
+    cost of all units (the TEA is computed with the new results). Return
+    the maximum relative residual of unit outlets if `check` is True.
+
+    Parameters
+    ----------
+    system : System
+        Converged system.
+    ratio : float
+        Ratio of new to current capacity.
+    check=False : bool, optional
+        If True, run each unit in the path once at the new capacity
+        (without converging recycle loops) and compare outlets with scaled
+        flow rates. If the maximum relative residual is greater than
+        `rtol`, the system is simulated rigorously starting from the
+        scaled flows.
+    rtol=1e-3 : float, optional
+        Relative tolerance of linearity check.
+
+    Notes
+    -----
+    Compositions and specifications (other than the capacity) should be the
+    same as the last simulation. Design results computed by units in their
+    `_run` method (rather than `_design`) are only updated if `check`
+    is True.
+
+    Examples
+    --------
+    >>> # cornstover_sys.simulate()
+    >>> # scale_system(cornstover_sys, 1.5) # Feeds are scaled too
+    >>> # cornstover_tea.solve_price(ethanol)
+
+    """
+    scale_flows(system, ratio)
+    if check:
+        streams = [i for i in system.streams if i]
+        mols = [i.mol.copy() for i in streams]
+        _run_path_once(system)
+        residual = _max_relative_residual(streams, mols)
+        if residual > rtol:
+            system.simulate()
+            return residual
+    system._design_and_cost()
+    if check: return residual
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+
+__all__ = ('FeedstockComposition', 'get_LHV_by_mass')
+
+# Lower heating values by mass by Chemicals object
+_LHV_by_mass = {}
+
+def get_LHV_by_mass(chemicals):
+    """
+    Return an array of lower heating values (kJ/kg) aligned with the index
+    of `chemicals`. Arrays are computed only once for each Chemicals object.
+
+    """
+    key = id(chemicals)
+    if key in _LHV_by_mass: return _LHV_by_mass[key][1]
+    LHV = np.asarray(chemicals.LHV, dtype=float) / chemicals.MW
+    # Chemicals are kept alive so that their id is not reused
+    _LHV_by_mass[key] = (chemicals, LHV)
+    return LHV
+
+
+class FeedstockComposition:
+    """
+    Create a FeedstockComposition object that computes feedstock mass flow
+    rates for many target compositions in a single vectorized call. Target
+    compositions are given as mass fractions of groups of chemicals, where
+    the relative composition within each group is that of the baseline
+    feedstock.
+
+    Parameters
+    ----------
+    stream : Stream
+        Baseline feedstock.
+    groups : dict[str, Iterable[str]]
+        IDs of chemicals in each group by group name.
+    balance=None : str, optional
+        Name of group used to close the mass balance (i.e., the total mass,
+        or dry mass, remains constant).
+    dry=True : bool, optional
+        If True, mass fractions are on a dry basis (excluding water).
+
+    Notes
+    -----
+    Compositions are computed with array operations only; infeasible
+    compositions (i.e., negative flow rates) are flagged in a mask rather
+    than raising an error.
+
+    Examples
+    --------
+    >>> # composition = FeedstockComposition(feedstock,
+    >>> #                                    {'Carbohydrates': ('Glucan', 'Xylan'),
+    >>> #                                     'Extractives': ('Extractives',)},
+    >>> #                                    balance='Extractives')
+    >>> # mass, feasible = composition.flows({'Carbohydrates': np.linspace(0.4, 0.7, 31)})
+
+    """
+    __slots__ = ('chemicals', # [Chemicals] Chemicals of the feedstock.
+                 'baseline', # [1d array] Baseline mass flow rates (kg/hr).
+                 'groups', # dict[str, tuple[1d array, 1d array]] Indices and relative composition by group name.
+                 'balance', # [str] Name of group used to close the mass balance.
+                 'dry', # [bool] Whether mass fractions are on a dry basis.
+                 '_basis') # [1d array] Mask of chemicals in the basis of mass fractions.
+
+    def __init__(self, stream, groups, balance=None, dry=True):
+        chemicals = stream.chemicals
+        baseline = stream.mol * chemicals.MW
+        self.chemicals = chemicals
+        self.baseline = baseline
+        self.groups = {}
+        for name, IDs in groups.items():
+            if isinstance(IDs, str): IDs = (IDs,)
+            index = np.array(chemicals.indices(IDs), dtype=int)
+            mass = baseline[index]
+            total = mass.sum()
+            if total:
+                ratio = mass / total
+            elif index.size == 1:
+                ratio = np.ones(1)
+            else:
+                raise ValueError(f"relative composition of group '{name}' "
+                                  "is undefined (no flow in baseline)")
+            self.groups[name] = (index, ratio)
+        if balance is not None and balance not in self.groups:
+            raise ValueError(f"balance group '{balance}' not in groups")
+        self.balance = balance
+        self.dry = dry
+        self._basis = basis = np.ones(chemicals.size, dtype=bool)
+        if dry: basis[chemicals.index('Water')] = False
+
+    def get_LHV(self, group):
+        """Return the lower heating value (kJ/kg) of a group of chemicals."""
+        index, ratio = self.groups[group]
+        return get_LHV_by_mass(self.chemicals)[index] @ ratio
+
+    def get_total(self, mass):
+        """Return the total mass flow rate in the basis of mass fractions (kg/hr)."""
+        return mass[self._basis].sum()
+
+    def flows(self, targets, stream=None, total=None):
+        """
+        Return a 2d array of mass flow rates (kg/hr) by target composition
+        (rows) and chemical (columns), and a 1d array of whether each
+        composition is feasible.
+
+        Parameters
+        ----------
+        targets : dict[str, float or 1d array]
+            Mass fractions by group name. All arrays must be of the same size.
+        stream=None : Stream, optional
+            Feedstock with the mass flow rates to begin with. Defaults to
+            the baseline.
+        total=None : float, optional
+            Total mass flow rate of mass fractions (kg/hr). Defaults to the
+            total mass flow rate (or dry mass flow rate) to begin with.
+
+        """
+        mass = self.baseline if stream is None else stream.mol * self.chemicals.MW
+        if total is None: total = self.get_total(mass)
+        targets = {i: np.asarray(j, dtype=float) for i, j in targets.items()}
+        N = max([i.size for i in targets.values()], default=1)
+        flows = np.tile(mass, (N, 1))
+        groups = self.groups
+        for name, fraction in targets.items():
+            index, ratio = groups[name]
+            flows[:, index] = np.outer(fraction * total, ratio)
+        balance = self.balance
+        if balance:
+            index, ratio = groups[balance]
+            flows[:, index] = 0.
+            remainder = total - flows[:, self._basis].sum(1)
+            flows[:, index] = np.outer(remainder, ratio)
+        feasible = (flows >= 0.).all(1)
+        return flows, feasible
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {', '.join(self.groups)}>"
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import json
+import numpy as np
+import pandas as pd
+import flexsolve as flx
+from ._linear_recycle import LinearRecycleSolver
+
+__all__ = ('ConvergenceDiagnostics', 'AdaptiveConverger',
+           'diagnose_convergence', 'save_convergence_methods',
+           'load_convergence_methods')
+
+_solvers = {'fixed_point': flx.conditional_fixed_point,
+            'aitken': flx.conditional_aitken,
+            'wegstein': flx.conditional_wegstein}
+
+def _get_method(method):
+    method = method.lower().replace('-', '_').replace(' ', '_')
+    if method not in _solvers:
+        raise ValueError(f"only 'wegstein', 'aitken', and 'fixed point' methods "
+                         f"are valid, not '{method}'")
+    return method
+
+class _Divergence(RuntimeError):
+    """RuntimeError regarding a diverging recycle loop."""
+
+
+class ConvergenceDiagnostics:
+    """
+    Create a ConvergenceDiagnostics object that records the residual
+    history of a recycle loop converged with a given method and damping.
+
+    Parameters
+    ----------
+    method : str
+        Convergence method ('fixed point', 'aitken', or 'wegstein').
+    damping=1. : float, optional
+        Fraction of each step taken (1 for no damping).
+
+    """
+    __slots__ = ('method', 'damping', 'residuals', 'reversals', 'converged', 'error')
+
+    def __init__(self, method, damping=1.):
+        self.method = _get_method(method)
+        self.damping = damping
+        #: list[float] Molar flow rate error [kmol/hr] by iteration.
+        self.residuals = []
+        #: [int] Number of iterations that reverse the direction of the last step.
+        self.reversals = 0
+        #: [bool] Whether the loop converged.
+        self.converged = False
+        #: [str] Reason of failure (empty if converged).
+        self.error = ''
+
+    @property
+    def iterations(self):
+        """[int] Number of iterations."""
+        return len(self.residuals)
+
+    @property
+    def spectral_radius(self):
+        """[float] Estimate of the spectral radius of the iteration (mean
+        reduction ratio of residuals over the last half of iterations)."""
+        residuals = np.array(self.residuals)
+        residuals = residuals[residuals > 0.]
+        if residuals.size < 3: return np.nan
+        tail = np.log(residuals[residuals.size // 2 - 1:])
+        return np.exp(np.diff(tail).mean())
+
+    @property
+    def oscillation(self):
+        """[float] Fraction of iterations that reverse the last step."""
+        return self.reversals / max(self.iterations - 1, 1)
+
+    def get_summary(self):
+        """Return a dictionary of diagnostics."""
+        return {'Method': self.method.replace('_', ' '),
+                'Damping': self.damping,
+                'Converged': self.converged,
+                'Iterations': self.iterations,
+                'Spectral radius': self.spectral_radius,
+                'Oscillation': self.oscillation,
+                'Error': self.error}
+
+    def __repr__(self):
+        return (f"<{type(self).__name__}: {self.method.replace('_', ' ')}, "
+                f"damping={self.damping}, iterations={self.iterations}>")
+
+
+class AdaptiveConverger:
+    """
+    Create an AdaptiveConverger object that converges the recycle of a
+    system (instead of its converge method) with a chosen method and
+    damping. The choice is made by diagnostic runs of all candidates
+    from the same starting point (fastest converging candidate), and
+    made again whenever the loop diverges or fails to converge.
+
+    Parameters
+    ----------
+    system : System
+        System with a recycle.
+    method='aitken' : str, optional
+        Initial convergence method.
+    damping=1. : float, optional
+        Initial fraction of each step taken.
+    candidates=None : Iterable[tuple[str, float]], optional
+        Methods and damping to diagnose. Defaults to fixed point (with and
+        without damping), Aitken, and Wegstein.
+    divergence_factor=10. : float, optional
+        Ratio of the residual to the first residual for which the loop is
+        considered to diverge.
+
+    """
+    __slots__ = ('system', 'method', 'damping', 'candidates',
+                 'divergence_factor', 'diagnostics', 'rechecks')
+
+    default_candidates = (('fixed point', 1.), ('fixed point', 0.5),
+                          ('aitken', 1.), ('wegstein', 1.))
+
+    def __init__(self, system, method='aitken', damping=1., candidates=None,
+                 divergence_factor=10.):
+        if not system.recycle:
+            raise ValueError(f'{system} has no recycle')
+        self.system = system
+        self.method = _get_method(method)
+        self.damping = damping
+        self.candidates = tuple(candidates or self.default_candidates)
+        self.divergence_factor = divergence_factor
+        #: list[ConvergenceDiagnostics] Diagnostics of the last choice.
+        self.diagnostics = []
+        #: [int] Number of times the choice was made again after failures.
+        self.rechecks = 0
+
+    @property
+    def __name__(self):
+        # For `System.converge_method`
+        return '_' + self.method
+
+    def _solve(self, diagnostics):
+        system = self.system
+        iter_run = system._iter_run
+        damping = diagnostics.damping
+        residuals = diagnostics.residuals
+        divergence_factor = self.divergence_factor
+        last_step = None
+        def f(x):
+            nonlocal last_step
+            y, unconverged = iter_run(x)
+            residual = system._mol_error
+            residuals.append(residual)
+            if len(residuals) > 3 and residual > divergence_factor * residuals[0]:
+                raise _Divergence(f'{repr(system)} is diverging')
+            step = y - x
+            if last_step is not None and (step * last_step).sum() < 0.:
+                diagnostics.reversals += 1
+            last_step = step
+            if damping != 1.: y = x + damping * step
+            return y, unconverged
+        system._reset_iter()
+        _solvers[diagnostics.method](f, system.recycle.imol.data.copy())
+
+    def _try(self, diagnostics):
+        try:
+            self._solve(diagnostics)
+        except Exception as error:
+            diagnostics.error = f'{type(error).__name__}: {error}'
+        else:
+            diagnostics.converged = True
+        return diagnostics
+
+    def diagnose(self):
+        """
+        Converge the recycle with all candidates (from the current recycle
+        state) and choose the one that converges in the fewest iterations.
+        Return a list of ConvergenceDiagnostics objects.
+
+        """
+        recycle = self.system.recycle
+        data = recycle.imol.data.copy()
+        T = recycle.T
+        self.diagnostics = diagnostics = []
+        for method, damping in self.candidates:
+            recycle.imol.data[:] = data
+            recycle.T = T
+            diagnostics.append(self._try(ConvergenceDiagnostics(method, damping)))
+        converged = [i for i in diagnostics if i.converged]
+        recycle.imol.data[:] = data
+        recycle.T = T
+        if not converged: return diagnostics
+        best = min(converged, key=lambda i: i.iterations)
+        self.method = best.method
+        self.damping = best.damping
+        self._solve(ConvergenceDiagnostics(best.method, best.damping))
+        return diagnostics
+
+    def __call__(self):
+        """Converge the system recycle."""
+        recycle = self.system.recycle
+        data = recycle.imol.data.copy()
+        T = recycle.T
+        diagnostics = self._try(ConvergenceDiagnostics(self.method, self.damping))
+        if diagnostics.converged: return
+        recycle.imol.data[:] = data
+        recycle.T = T
+        self.rechecks += 1
+        if not any([i.converged for i in self.diagnose()]):
+            raise RuntimeError(f'{repr(self.system)} could not converge with '
+                               f'any method; {diagnostics.error}')
+
+    def __repr__(self):
+        return (f"<{type(self).__name__}: {self.system}, {self.method.replace('_', ' ')}, "
+                f"damping={self.damping}>")
+
+
+def _get_recycle_systems(system):
+    # Inner systems first, so that outer loops are diagnosed with the
+    # methods chosen for inner loops
+    systems = []
+    for i in system.subsystems: systems.extend(_get_recycle_systems(i))
+    if system.recycle: systems.append(system)
+    return systems
+
+def diagnose_convergence(system, candidates=None, divergence_factor=10.):
+    """
+    Simulate the system, diagnose all recycle loops (inner loops first),
+    and converge each with an :class:`AdaptiveConverger` object using the
+    fastest converging candidate. Return a DataFrame of diagnostics by
+    system and candidate.
+
+    Parameters
+    ----------
+    system : System
+        System to diagnose.
+    candidates=None : Iterable[tuple[str, float]], optional
+        Methods and damping to diagnose (see :class:`AdaptiveConverger`).
+    divergence_factor=10. : float, optional
+        Ratio of the residual to the first residual for which a loop is
+        considered to diverge.
+
+    Notes
+    -----
+    Loops converged with a :class:`LinearRecycleSolver` object are not
+    diagnosed. Loops with an AdaptiveConverger object are diagnosed again.
+
+    Examples
+    --------
+    >>> # diagnostics = diagnose_convergence(lactic_sys)
+    >>> # save_convergence_methods(bst.main_flowsheet)
+
+    """
+    system.simulate()
+    data = []
+    for i in _get_recycle_systems(system):
+        converger = i._converge_method
+        if isinstance(converger, LinearRecycleSolver): continue
+        if not isinstance(converger, AdaptiveConverger):
+            converger = AdaptiveConverger(i, i.converge_method, 1., candidates,
+                                          divergence_factor)
+            i._converge_method = converger
+        for diagnostics in converger.diagnose():
+            data.append({'System': i.ID, **diagnostics.get_summary(),
+                         'Chosen': (diagnostics.method == converger.method
+                                    and diagnostics.damping == converger.damping)})
+    system.simulate()
+    return pd.DataFrame(data)
+
+def save_convergence_methods(flowsheet, file=None):
+    """
+    Save the methods and damping chosen by AdaptiveConverger objects of
+    all systems in the flowsheet to a JSON file (defaults to
+    '<flowsheet ID>_convergence.json').
+
+    """
+    file = file or f'{flowsheet.ID}_convergence.json'
+    data = {}
+    for ID, system in flowsheet.system.__dict__.items():
+        converger = system._converge_method
+        if isinstance(converger, AdaptiveConverger):
+            data[ID] = [converger.method, converger.damping]
+    with open(file, 'w') as f: json.dump(data, f, indent=1)
+
+def load_convergence_methods(flowsheet, file=None, candidates=None,
+                             divergence_factor=10.):
+    """
+    Converge systems in the flowsheet with AdaptiveConverger objects using
+    the methods and damping saved in a JSON file (defaults to
+    '<flowsheet ID>_convergence.json'). Return a list of systems not
+    found in the flowsheet.
+
+    """
+    file = file or f'{flowsheet.ID}_convergence.json'
+    with open(file) as f: data = json.load(f)
+    systems = flowsheet.system.__dict__
+    missing = []
+    for ID, (method, damping) in data.items():
+        system = systems.get(ID)
+        if system is None:
+            missing.append(ID)
+            continue
+        system._converge_method = AdaptiveConverger(system, method, damping,
+                                                    candidates, divergence_factor)
+    return missing
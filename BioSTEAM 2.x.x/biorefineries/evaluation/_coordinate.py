@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import os
+import numpy as np
+import pandas as pd
+from . import _fork
+
+__all__ = ('CoordinateResults', 'evaluate_across_coordinate')
+
+
+
+class CoordinateResults:
+    """
+    Create a CoordinateResults object that holds metric values evaluated
+    across a coordinate for all samples of a model.
+
+    Parameters
+    ----------
+    name : str or tuple[str]
+        Name of coordinate.
+    coordinate : array
+        Coordinate values.
+    metrics : tuple[tuple[str, str]]
+        Metric indices (element, name).
+    data : 3d array
+        Metric values by coordinate, sample, and metric.
+
+    """
+    __slots__ = ('name', 'coordinate', 'metrics', 'data')
+
+    def __init__(self, name, coordinate, metrics, data):
+        self.name = name
+        self.coordinate = coordinate
+        self.metrics = tuple(metrics)
+        self.data = data
+
+    def _get_metric_index(self, metric):
+        if isinstance(metric, str):
+            for i, index in enumerate(self.metrics):
+                if index[1] == metric: return i
+        else:
+            if not isinstance(metric, tuple): metric = metric.index
+            if metric in self.metrics: return self.metrics.index(metric)
+        raise LookupError(f'no metric {repr(metric)}')
+
+    def __getitem__(self, metric):
+        """Return metric values by coordinate (rows) and sample (columns)."""
+        return self.data[:, :, self._get_metric_index(metric)]
+
+    def _get_columns(self):
+        coordinate = self.coordinate
+        name = self.name
+        if isinstance(name, str):
+            return pd.Index(coordinate, name=name)
+        else:
+            return pd.MultiIndex.from_tuples(coordinate, names=name)
+
+    def to_frame(self, metric):
+        """Return a DataFrame of metric values by sample (rows) and coordinate (columns)."""
+        return pd.DataFrame(self[metric].transpose(), columns=self._get_columns())
+
+    def to_dict(self):
+        """
+        Return a dictionary of metric values by sample (rows) and coordinate
+        (columns) by metric index, as given by `Model.evaluate_across_coordinate`.
+
+        """
+        data = self.data
+        return {j: data[:, :, i].transpose() for i, j in enumerate(self.metrics)}
+
+    def to_excel(self, xlfile):
+        """Save metric values to an excel file with a sheet for each metric."""
+        with pd.ExcelWriter(xlfile) as writer:
+            for index in self.metrics:
+                self.to_frame(index).to_excel(writer, sheet_name=index[1])
+
+    def __repr__(self):
+        N_points, N_samples, N_metrics = self.data.shape
+        return (f"<{type(self).__name__}: {N_points} points, "
+                f"{N_samples} samples, {N_metrics} metrics>")
+
+
+def _evaluate_job(job):
+    model, f_coordinate, coordinate, multi_coordinate = _fork.context
+    sample_index, coordinate_index = job
+    samples = model._samples
+    evaluate_sample = model._evaluate_sample_thorough
+    data = np.zeros([len(coordinate_index), len(sample_index), len(model.metrics)])
+    points = list(enumerate(coordinate_index))
+    for j, i in enumerate(sample_index):
+        sample = samples[i]
+        for n, k in points:
+            x = coordinate[k]
+            f_coordinate(*x) if multi_coordinate else f_coordinate(x)
+            data[n, j] = evaluate_sample(sample)
+        # Sweep back and forth so that each evaluation starts from the
+        # converged state at the neighbouring coordinate
+        points.reverse()
+    return data
+
+def evaluate_across_coordinate(model, name, f_coordinate, coordinate, *,
+                               multi_coordinate=False, processes=None,
+                               sample_chunksize=None, coordinate_chunksize=None,
+                               notify=False):
+    """
+    Evaluate model metrics across a coordinate for all loaded samples and
+    return a CoordinateResults object.
+
+    Parameters
+    ----------
+    model : Model
+        Model with loaded samples.
+    name : str or tuple[str]
+        Name of coordinate.
+    f_coordinate : function
+        Should change state of system given the coordinate.
+    coordinate : array
+        Coordinate values.
+    multi_coordinate=False : bool, optional
+        If True, coordinate values are tuples of arguments to `f_coordinate`.
+    processes=None : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    sample_chunksize=None : int, optional
+        Number of samples per job. Defaults to dividing samples evenly
+        among processes.
+    coordinate_chunksize=None : int, optional
+        Number of coordinate values per job. Defaults to all values.
+    notify=False : bool, optional
+        If True, notify elapsed time after each job.
+
+    Notes
+    -----
+    Each job evaluates a chunk of samples over a chunk of the coordinate,
+    sweeping back and forth across the coordinate so that each system
+    simulation starts from the converged state at the neighbouring
+    coordinate. Jobs run in forked worker processes, which inherit the
+    model; if processes cannot be forked (or only one process is used),
+    jobs run in this process. All parameters are set for each evaluation,
+    as in `Model.evaluate`.
+
+    Results are kept in memory, use :meth:`CoordinateResults.to_excel` to
+    save them afterwards.
+
+    Examples
+    --------
+    >>> # results = evaluate_across_coordinate(model, 'Lipid fraction',
+    >>> #                                      set_lipid_fraction, coordinate)
+    >>> # results.to_excel('Monte Carlo across lipid fraction.xlsx')
+
+    """
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    N_samples = len(samples)
+    N_points = len(coordinate)
+    if processes is None: processes = os.cpu_count() or 1
+    if not sample_chunksize: sample_chunksize = -(-N_samples // processes)
+    if not coordinate_chunksize: coordinate_chunksize = N_points
+    # Sample chunks keep the model's order of evaluation for performance
+    index = model._index
+    sample_chunks = [index[i:i+sample_chunksize]
+                     for i in range(0, N_samples, sample_chunksize)]
+    coordinate_chunks = [range(i, min(i+coordinate_chunksize, N_points))
+                         for i in range(0, N_points, coordinate_chunksize)]
+    jobs = [(i, j) for i in sample_chunks for j in coordinate_chunks]
+
+    if notify:
+        from biosteam.utils import TicToc
+        timer = TicToc()
+        timer.tic()
+    processes = min(processes, len(jobs))
+    with _fork.forked_pool(processes, (model, f_coordinate, coordinate,
+                                       multi_coordinate)) as pool:
+        if pool:
+            results = pool.imap(_evaluate_job, jobs)
+            results = [_notify(n, i, timer) if notify else i
+                       for n, i in enumerate(results)]
+        else:
+            results = [_notify(n, _evaluate_job(i), timer) if notify
+                       else _evaluate_job(i) for n, i in enumerate(jobs)]
+
+    data = np.zeros([N_points, N_samples, len(model.metrics)])
+    for (sample_index, coordinate_index), values in zip(jobs, results):
+        data[coordinate_index.start:coordinate_index.stop, sample_index] = values
+    return CoordinateResults(name, coordinate, model._metric_indices, data)
+
+def _notify(n, result, timer):
+    print(f"[{n}] Elapsed time: {timer.elapsed_time:.0f} sec")
+    return result
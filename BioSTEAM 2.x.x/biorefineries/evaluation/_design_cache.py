@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+from biosteam.units.design_tools import column_design
+from biosteam.units.design_tools.specification_factors import material_densities_lb_per_in3
+
+__all__ = ('DistillationDesignCache', 'use_distillation_design_cache')
+
+# Diameters of the tower (or its sections) with the height used for the
+# wall thickness and weight
+_sections = (('Diameter', 'Height', 'Wall thickness', 'Weight'),
+             ('Rectifier diameter', 'Rectifier height',
+              'Rectifier wall thickness', 'Rectifier weight'),
+             ('Stripper diameter', 'Stripper height',
+              'Stripper wall thickness', 'Stripper weight'))
+
+
+class DistillationDesignCache:
+    """
+    Create a DistillationDesignCache object that designs a binary
+    distillation column (instead of its `_design` method) and reuses the
+    design for feeds with the same composition and thermal condition
+    (within tolerance) at different flow rates. Stage counts and reflux
+    are kept, diameters are rescaled with the square root of the flow
+    rate, and condenser and boiler flow rates (and thus duties) are
+    rescaled linearly.
+
+    Parameters
+    ----------
+    column : BinaryDistillation
+        Column to design.
+    composition_tolerance=1e-4 : float, optional
+        Maximum change in molar fraction of any chemical in the feed (and
+        of the light key in the products).
+    T_tolerance=0.1 : float, optional
+        Maximum change in feed temperature [K].
+    vapor_fraction_tolerance=1e-3 : float, optional
+        Maximum change in feed vapor fraction.
+    flow_range=2. : float, optional
+        Maximum ratio of feed flow rates (either way) to reuse the design.
+
+    Notes
+    -----
+    The full design is used again if the feed or the specifications of
+    the column (pressure, reflux ratio factor, minimum reflux, and product
+    compositions of keys) change beyond tolerance, so reused designs are
+    always anchored to the last full design. Columns that design the
+    tower walls differently (e.g. under vacuum) may define a
+    `_design_tower` method, which is called on reused designs (after
+    rescaling diameters) instead of computing wall thickness and weight.
+
+    """
+    __slots__ = ('column', 'composition_tolerance', 'T_tolerance',
+                 'vapor_fraction_tolerance', 'flow_range', 'design',
+                 'key', 'F_mol', 'design_results', 'streams', 'flows')
+
+    def __init__(self, column, composition_tolerance=1e-4, T_tolerance=0.1,
+                 vapor_fraction_tolerance=1e-3, flow_range=2.):
+        self.column = column
+        self.composition_tolerance = composition_tolerance
+        self.T_tolerance = T_tolerance
+        self.vapor_fraction_tolerance = vapor_fraction_tolerance
+        self.flow_range = flow_range
+        #: [function] Original design method of the column.
+        self.design = column._design
+        #: [tuple] Feed state and specifications of the last full design.
+        self.key = None
+        #: [float] Feed flow rate of the last full design [kmol/hr].
+        self.F_mol = None
+        #: [dict] Design results of the last full design.
+        self.design_results = None
+        condenser = column.condenser
+        boiler = column.boiler
+        #: tuple[Stream] Streams of the condenser and boiler.
+        self.streams = (condenser.ins[0], condenser.outs[0], boiler.ins[0], boiler.outs[0])
+        #: list[tuple[array, float]] Flow rates and temperatures of condenser and boiler streams.
+        self.flows = None
+
+    def _get_key(self, F_mol):
+        column = self.column
+        feed = column.feed
+        z = feed.mol / F_mol
+        vapor_fraction = feed.imol['g'].sum() / F_mol
+        products = np.array(column._get_y_top_and_x_bot())
+        specifications = (column.P, column.k, column.Rmin)
+        return z, feed.T, vapor_fraction, products, specifications
+
+    def _is_close(self, key, F_mol):
+        if not self.key: return False
+        z, T, vapor_fraction, products, specifications = key
+        z_old, T_old, vapor_fraction_old, products_old, specifications_old = self.key
+        ratio = F_mol / self.F_mol
+        return (1. / self.flow_range <= ratio <= self.flow_range
+                and abs(T - T_old) <= self.T_tolerance
+                and abs(vapor_fraction - vapor_fraction_old) <= self.vapor_fraction_tolerance
+                and (np.abs(z - z_old) <= self.composition_tolerance).all()
+                and (np.abs(products - products_old) <= self.composition_tolerance).all()
+                and specifications == specifications_old)
+
+    def _rescale(self, ratio):
+        column = self.column
+        Design = column.design_results
+        Design.clear()
+        Design.update(self.design_results)
+        Po = column.P * 0.000145078 # to psi
+        rho_M = material_densities_lb_per_in3[column.vessel_material]
+        diameter_ratio = ratio ** 0.5
+        design_tower = getattr(column, '_design_tower', None)
+        for diameter, height, wall_thickness, weight in _sections:
+            if diameter not in Design: continue
+            Design[diameter] = Di = diameter_ratio * Design[diameter]
+            if design_tower: continue
+            H = Design[height]
+            Design[wall_thickness] = tv = column_design.compute_tower_wall_thickness(Po, Di, H)
+            Design[weight] = column_design.compute_tower_weight(Di, H, tv, rho_M)
+        for stream, (data, T) in zip(self.streams, self.flows):
+            stream.imol.data[:] = ratio * data
+            stream.T = T
+        if design_tower: design_tower()
+
+    def __call__(self):
+        """Design the column."""
+        F_mol = self.column.feed.F_mol
+        if not F_mol: return self.design()
+        key = self._get_key(F_mol)
+        if self._is_close(key, F_mol):
+            self._rescale(F_mol / self.F_mol)
+        else:
+            self.design()
+            self.key = key
+            self.F_mol = F_mol
+            self.design_results = self.column.design_results.copy()
+            self.flows = [(i.imol.data.copy(), i.T) for i in self.streams]
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.column}>"
+
+
+def use_distillation_design_cache(*columns, **kwargs):
+    """
+    Design the columns with :class:`DistillationDesignCache` objects
+    (instead of their design methods) and return the caches.
+
+    Examples
+    --------
+    >>> # from biorefineries.cornstover import D402, D403
+    >>> # use_distillation_design_cache(D402, D403)
+
+    """
+    caches = []
+    for column in columns:
+        cache = DistillationDesignCache(column, **kwargs)
+        column._design = cache
+        caches.append(cache)
+    return caches
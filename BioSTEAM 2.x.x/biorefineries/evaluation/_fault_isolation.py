@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import time
+import signal
+import threading
+import numpy as np
+import thermosteam as tmo
+
+__all__ = ('EvaluationTimeout', 'SystemState', 'SampleEvaluator',
+           'evaluate_with_fault_isolation', 'failure_index')
+
+#: [tuple[str, str]] Index of the column with failure reasons in `model.table`.
+failure_index = ('Evaluation', 'Failure')
+
+class EvaluationTimeout(RuntimeError):
+    """RuntimeError regarding the wall-clock budget of a sample evaluation."""
+
+
+class SystemState:
+    """
+    Create a SystemState object that saves flow rates, phases, and thermal
+    conditions of all streams in a system, so that the system can be
+    restored to this state (e.g. after a failed simulation).
+
+    Parameters
+    ----------
+    system : System
+        System to save.
+
+    """
+    __slots__ = ('system', 'streams', 'copies')
+
+    def __init__(self, system):
+        self.system = system
+        self.streams = streams = tuple(system.streams)
+        #: tuple[Stream] Unregistered copies of all streams (multi-phase
+        #: streams are copied with flow rates by phase).
+        self.copies = tuple([i.copy() for i in streams])
+
+    def restore(self):
+        """Restore all streams and reset the cache of all units."""
+        for stream, copy in zip(self.streams, self.copies): stream.copy_like(copy)
+        self.system.reset_cache()
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.system}>"
+
+
+class _Timer:
+    # Raise EvaluationTimeout in the main thread once the time is up (no
+    # limit if seconds is None); the error is raised repeatedly in case it
+    # is caught by a bare except
+    __slots__ = ('seconds', 'active', 'handler')
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.active = False
+        self.handler = None
+
+    def _raise(self, signum, frame):
+        if self.active:
+            raise EvaluationTimeout(f'evaluation exceeded {self.seconds:.3g} sec')
+
+    def __enter__(self):
+        if not self.seconds: return
+        self.active = True
+        self.handler = signal.signal(signal.SIGALRM, self._raise)
+        signal.setitimer(signal.ITIMER_REAL, self.seconds, 0.1)
+
+    def __exit__(self, type, exception, traceback):
+        if not self.active: return
+        self.active = False
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self.handler)
+
+
+def _get_systems(system):
+    systems = [system]
+    for i in systems: systems.extend([j for j in i.subsystems if j not in systems])
+    return systems
+
+
+class SampleEvaluator:
+    """
+    Create a SampleEvaluator object that evaluates model metrics at a
+    sample and isolates failures: the simulation is stopped after a
+    wall-clock or iteration budget, and the system is restored to the
+    state saved at creation before simulating once more (within the
+    remaining wall-clock budget) and before the next evaluation.
+
+    Parameters
+    ----------
+    model : Model
+        Model with loaded samples (or parameters loaded otherwise).
+    timeout=None : float, optional
+        Maximum wall-clock time of each evaluation [s].
+    maxiter=None : int, optional
+        Maximum number of iterations of each recycle loop.
+
+    Notes
+    -----
+    The wall-clock budget is enforced with the SIGALRM signal, so it is
+    only available in the main thread on Unix. Failed evaluations return
+    NaN values and their reason is kept in the `failure` attribute.
+
+    """
+    __slots__ = ('model', 'timeout', 'maxiter', 'state', 'failure')
+
+    def __init__(self, model, timeout=None, maxiter=None):
+        self.model = model
+        if timeout and not (hasattr(signal, 'setitimer')
+                            and threading.current_thread() is threading.main_thread()):
+            timeout = None
+        self.timeout = timeout
+        self.maxiter = maxiter
+        #: [SystemState] State restored after failed evaluations.
+        self.state = SystemState(model._system)
+        #: [str] Reason of last failed evaluation (empty if successful).
+        self.failure = ''
+
+    def _simulate(self, timeout):
+        model = self.model
+        with _Timer(timeout):
+            if model._specification: model._specification()
+            model._system.simulate()
+            return [i() for i in model._getters]
+
+    def _evaluate(self, sample):
+        model = self.model
+        timeout = self.timeout
+        start = time.perf_counter()
+        for f, s in zip(model._setters, sample): f(s)
+        try:
+            return self._simulate(timeout)
+        except Exception:
+            # Simulate once more from the saved state (as `Model.evaluate`
+            # does after emptying recycles) within the remaining budget
+            tmo.reaction.CHECK_FEASIBILITY = True
+            self.state.restore()
+            if timeout:
+                timeout -= time.perf_counter() - start
+                if timeout <= 0.: raise
+            return self._simulate(timeout)
+
+    def __call__(self, sample):
+        """Return metric values at given sample (NaN if evaluation fails)."""
+        maxiter = self.maxiter
+        if maxiter:
+            systems = _get_systems(self.model._system)
+            # Instance attributes (if any) are restored after evaluation
+            originals = [i.__dict__.get('maxiter') for i in systems]
+            for i in systems: i.maxiter = maxiter
+        try:
+            values = self._evaluate(sample)
+        except Exception as error:
+            self.failure = f'{type(error).__name__}: {error}'
+            tmo.reaction.CHECK_FEASIBILITY = True
+            self.state.restore()
+            values = self.model._failed_metrics
+        else:
+            self.failure = ''
+        finally:
+            if maxiter:
+                for i, original in zip(systems, originals):
+                    if original is None: del i.maxiter
+                    else: i.maxiter = original
+        return values
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.model}>"
+
+
+def evaluate_with_fault_isolation(model, timeout=None, maxiter=None, notify=False):
+    """
+    Evaluate metrics at all loaded samples (as in `Model.evaluate`) with a
+    wall-clock and/or iteration budget for each sample, and return a
+    dictionary of failure reasons by sample index. Failure reasons are
+    also saved to `model.table` (see `failure_index`).
+
+    Parameters
+    ----------
+    model : Model
+        Model with loaded samples.
+    timeout=None : float, optional
+        Maximum wall-clock time of each evaluation [s].
+    maxiter=None : int, optional
+        Maximum number of iterations of each recycle loop.
+    notify=False : bool, optional
+        If True, notify each failure.
+
+    Notes
+    -----
+    The system should be converged before evaluation, as failed evaluations
+    restore the system to its state at the beginning.
+
+    Examples
+    --------
+    >>> # model.load_samples(model.sample(1000, 'L'))
+    >>> # failures = evaluate_with_fault_isolation(model, timeout=120.)
+
+    """
+    from biosteam import speed_up
+    speed_up()
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    evaluator = SampleEvaluator(model, timeout, maxiter)
+    values = np.zeros([len(samples), len(model.metrics)])
+    failures = {}
+    for i in model._index:
+        values[i] = evaluator(samples[i])
+        if evaluator.failure:
+            failures[i] = evaluator.failure
+            if notify: print(f"[{i}] {evaluator.failure}")
+    table = model.table
+    table[model._metric_indices] = values
+    table[failure_index] = [failures.get(i, '') for i in range(len(samples))]
+    return failures
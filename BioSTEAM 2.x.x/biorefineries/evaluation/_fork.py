@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import multiprocessing as mp
+from contextlib import contextmanager
+
+# Objects used by workers (e.g. a model with its converged state), set
+# before forking worker processes so that workers inherit them without
+# pickling
+context = None
+
+def initialize_worker():
+    from biosteam import speed_up
+    speed_up()
+
+def can_fork(processes):
+    """Return whether worker processes can be forked."""
+    return processes > 1 and 'fork' in mp.get_all_start_methods()
+
+def fork_pool(processes, shared):
+    """Set the context inherited by workers and return a Pool object of
+    forked worker processes."""
+    global context
+    context = shared
+    return mp.get_context('fork').Pool(processes, initialize_worker)
+
+def clear_context(shared):
+    """Clear the context (if still set to the given object)."""
+    global context
+    if context is shared: context = None
+
+@contextmanager
+def forked_pool(processes, shared):
+    """Set the context and yield a Pool object of forked worker processes
+    (or None if processes cannot be forked). The context is cleared on
+    exit."""
+    global context
+    try:
+        if can_fork(processes):
+            with fork_pool(processes, shared) as pool: yield pool
+        else:
+            initialize_worker()
+            context = shared
+            yield None
+    finally:
+        context = None
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+
+__all__ = ('LinearRecycleSolver', 'use_linear_recycle_solver')
+
+
+class LinearRecycleSolver:
+    """
+    Create a LinearRecycleSolver object that converges the recycle of a
+    system assuming that the map from recycle flow rates to the flow rates
+    computed after one pass through the path is linear (x -> A·x + b), as
+    in loops made mostly of fixed-split and mixing units. The transfer
+    matrix, A, is identified by probing passes and (I - A)·x = b is solved
+    directly; the solution is verified (and corrected) with a few passes.
+
+    Parameters
+    ----------
+    system : System
+        System with a recycle.
+    max_components=10 : int, optional
+        Maximum number of components probed (those with the largest flow
+        rates). Flow rates of other components are updated by substitution.
+    verification=2 : int, optional
+        Maximum number of verification passes after each solution.
+
+    Notes
+    -----
+    The transfer matrix is kept between calls, so it is only identified
+    again if verification passes fail to converge. If the loop is not
+    linear enough (verification fails right after probing), the original
+    converge method of the system is used from then on, starting from
+    the last pass.
+
+    """
+    __slots__ = ('system', 'max_components', 'verification', 'converge',
+                 'active', 'matrix', 'linear')
+
+    def __init__(self, system, max_components=10, verification=2):
+        if not system.recycle:
+            raise ValueError(f'{system} has no recycle')
+        self.system = system
+        self.max_components = max_components
+        self.verification = verification
+        #: [function] Original converge method of the system.
+        self.converge = system._converge_method
+        #: [1d array] Indices of probed components (in flattened flow rates).
+        self.active = None
+        #: [2d array] I - A for probed components.
+        self.matrix = None
+        #: [bool] Whether the recycle is solved as a linear loop.
+        self.linear = True
+
+    @property
+    def __name__(self):
+        # For `System.converge_method`
+        return '_linear'
+
+    def _pass(self, x):
+        # Run the path at given recycle flow rates, as in `System._iter_run`
+        system = self.system
+        recycle = system.recycle
+        data = recycle.imol.data
+        data[:] = x.reshape(data.shape)
+        T = recycle.T
+        system._run()
+        y = data.flatten()
+        system._mol_error = mol_error = np.abs(x - y).sum()
+        system._T_error = T_error = abs(T - recycle.T)
+        system._iter += 1
+        converged = (mol_error < system.molar_tolerance
+                     and T_error < system.temperature_tolerance)
+        return y, converged
+
+    def _probe(self, x, y):
+        # Identify (I - A) for the components with the largest flow rates
+        flows = np.maximum(x, y)
+        active = np.flatnonzero(flows)
+        if active.size > self.max_components:
+            active = active[np.argsort(flows[active])[::-1][:self.max_components]]
+        n = active.size
+        A = np.zeros([n, n])
+        for j, i in enumerate(active):
+            h = 1e-3 * flows[i]
+            x_probe = x.copy()
+            x_probe[i] += h
+            y_probe, _ = self._pass(x_probe)
+            A[:, j] = (y_probe[active] - y[active]) / h
+        self.active = active
+        self.matrix = np.eye(n) - A
+
+    def _step(self, x, y):
+        # Chord step towards the fixed point (substitution for other components)
+        x_new = y.copy()
+        active = self.active
+        x_new[active] = x[active] + np.linalg.solve(self.matrix, y[active] - x[active])
+        x_new[x_new < 0.] = 0.
+        return x_new
+
+    def _verify(self, x, y):
+        for i in range(self.verification):
+            x = self._step(x, y)
+            y, converged = self._pass(x)
+            if converged: return True, x, y
+        return False, x, y
+
+    def __call__(self):
+        """Converge the system recycle."""
+        system = self.system
+        if not self.linear: return self.converge()
+        system._reset_iter()
+        x = system.recycle.imol.data.flatten()
+        y, converged = self._pass(x)
+        if converged: return
+        try:
+            if self.matrix is not None:
+                converged, x, y = self._verify(x, y)
+                if converged: return
+            self._probe(x, y)
+            converged, x, y = self._verify(x, y)
+        except np.linalg.LinAlgError:
+            converged = False
+        if not converged:
+            self.linear = False
+            self.converge()
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.system}>"
+
+
+def use_linear_recycle_solver(system, max_components=10, verification=2):
+    """
+    Converge the recycle of the system with a :class:`LinearRecycleSolver`
+    object (instead of its converge method) and return the solver.
+
+    Examples
+    --------
+    >>> # from biorefineries.cornstover import ethanol_recycle_sys
+    >>> # use_linear_recycle_solver(ethanol_recycle_sys)
+
+    """
+    solver = LinearRecycleSolver(system, max_components, verification)
+    system._converge_method = solver
+    return solver
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+from biosteam.evaluation import Metric
+
+__all__ = ('Intermediate', 'MetricGraph')
+
+class Missing:
+    __slots__ = ()
+    def __repr__(self): return 'missing'
+
+missing = Missing()
+
+
+class Intermediate:
+    """
+    Create an Intermediate object that computes a result shared by many
+    metrics (e.g. the minimum product selling price or TEA results) at most
+    once per sample.
+
+    Parameters
+    ----------
+    name : str
+        Name of intermediate.
+    f : function
+        Should take the values of the dependencies as positional arguments
+        and return the intermediate result.
+    dependencies=() : tuple[Intermediate], optional
+        Intermediates that must be computed before this one.
+
+    """
+    __slots__ = ('name', 'f', 'dependencies', '_value')
+
+    def __init__(self, name, f, dependencies=()):
+        self.name = name
+        self.f = f
+        self.dependencies = tuple(dependencies)
+        self._value = missing
+
+    @property
+    def cached(self):
+        """[bool] Whether the result is cached for the current sample."""
+        return self._value is not missing
+
+    def reset(self):
+        """Clear cached result."""
+        self._value = missing
+
+    def __call__(self):
+        value = self._value
+        if value is missing:
+            self._value = value = self.f(*[i() for i in self.dependencies])
+        return value
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.name}>"
+
+
+class MetricGraph:
+    """
+    Create a MetricGraph object that manages intermediate results shared by
+    metrics so that each intermediate is evaluated exactly once per sample.
+    Metrics declare their dependencies on intermediates, which in turn may
+    depend on other intermediates. The converged system state is the
+    implicit root of the graph, as the Model simulates the system before
+    evaluating metrics.
+
+    Parameters
+    ----------
+    specification=None : function, optional
+        Called after clearing cached results each time the graph is called.
+
+    Notes
+    -----
+    Pass the MetricGraph object as the specification of a Model so that
+    cached results are cleared before each sample is simulated. Because
+    dependencies must be registered before their dependents, the
+    registration order is always a topological order of the graph.
+
+    Examples
+    --------
+    >>> # graph = MetricGraph()
+    >>> # @graph.intermediate('MPSP')
+    >>> # def get_MPSP():
+    >>> #     return tea.solve_price(product)
+    >>> # @graph.intermediate('TEA results', ['MPSP'])
+    >>> # def get_TEA_results(MPSP):
+    >>> #     return {'NPV': tea.NPV, 'TCI': tea.TCI}
+    >>> # metrics = [graph.metric('MPSP', '$/kg', dependencies=['MPSP'], getter=lambda x: x),
+    >>> #            graph.metric('NPV', '$', dependencies=['TEA results'],
+    >>> #                         getter=lambda dct: dct['NPV'])]
+    >>> # model = Model(sys, metrics, specification=graph)
+
+    """
+    __slots__ = ('intermediates', 'specification')
+
+    def __init__(self, specification=None):
+        #: dict[str, Intermediate] All intermediates in topological order.
+        self.intermediates = {}
+
+        #: [function] Called after clearing cached results.
+        self.specification = specification
+
+    def _get_dependencies(self, dependencies):
+        intermediates = self.intermediates
+        isa = isinstance
+        dependencies = [intermediates[i] if isa(i, str) else i for i in dependencies]
+        for i in dependencies:
+            if intermediates.get(i.name) is not i:
+                raise ValueError(f'{i} is not registered in graph')
+        return tuple(dependencies)
+
+    def intermediate(self, name, dependencies=(), f=None):
+        """
+        Define and register an intermediate.
+
+        Parameters
+        ----------
+        name : str
+            Name of intermediate.
+        dependencies=() : Iterable[str or Intermediate], optional
+            Registered intermediates (or their names) that must be computed
+            first. Their values are passed to `f` as positional arguments.
+        f : function
+            Should return the intermediate result.
+
+        """
+        if not f: return lambda f: self.intermediate(name, dependencies, f)
+        if name in self.intermediates:
+            raise ValueError(f"intermediate '{name}' already registered")
+        self.intermediates[name] = intermediate = Intermediate(
+            name, f, self._get_dependencies(dependencies)
+        )
+        return intermediate
+
+    def metric(self, name, units=None, element='Biorefinery',
+               dependencies=(), getter=None):
+        """
+        Return a Metric object that depends on intermediates.
+
+        Parameters
+        ----------
+        name : str
+            Name of metric.
+        units : str, optional
+            Metric units of measure.
+        element='Biorefinery' : str, optional
+            Element corresponding to metric.
+        dependencies=() : Iterable[str or Intermediate], optional
+            Registered intermediates (or their names). Their values are
+            passed to `getter` as positional arguments.
+        getter : function
+            Should return the metric value.
+
+        """
+        if not getter:
+            return lambda getter: self.metric(name, units, element,
+                                              dependencies, getter)
+        dependencies = self._get_dependencies(dependencies)
+        if dependencies:
+            f = getter
+            getter = lambda: f(*[i() for i in dependencies])
+        return Metric(name, getter, units, element)
+
+    def reset(self):
+        """Clear all cached results."""
+        for i in self.intermediates.values(): i.reset()
+
+    def update(self):
+        """Evaluate all intermediates (in topological order)."""
+        for i in self.intermediates.values(): i()
+
+    def __call__(self):
+        self.reset()
+        if self.specification: self.specification()
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {', '.join(self.intermediates)}>"
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import pandas as pd
+
+__all__ = ('morris_samples', 'morris_screening', 'create_reduced_model')
+
+def _parameter_index(parameters):
+    return pd.MultiIndex.from_tuples([i.index for i in parameters],
+                                     names=('Element', 'Parameter'))
+
+def morris_samples(model, r, levels=4, uniform=False):
+    """
+    Return samples of r Morris trajectories (r·(k+1) samples for k
+    parameters), a 2d array of the (signed) step in the unit hypercube
+    by trajectory and parameter, and a 2d array of the index of the
+    parameter changed at each step by trajectory.
+
+    Parameters
+    ----------
+    model : Model
+        Model with parameters to screen.
+    r : int
+        Number of trajectories.
+    levels=4 : int, optional
+        Number of grid levels (must be even).
+    uniform=False : bool, optional
+        If True, grid levels are spaced across parameter bounds. Otherwise,
+        grid levels are quantiles of parameter distributions.
+
+    Notes
+    -----
+    Each trajectory begins at a random grid point and changes one
+    parameter at a time (in random order) by half the number of levels.
+
+    """
+    if levels % 2: raise ValueError('number of levels must be even')
+    parameters = model.get_parameters()
+    k = len(parameters)
+    step = levels // 2
+    indices = np.zeros([r, k + 1, k], dtype=int)
+    steps = np.zeros([r, k])
+    order = np.zeros([r, k], dtype=int)
+    for t in range(r):
+        j = np.random.randint(levels, size=k)
+        indices[t, 0] = j
+        order[t] = np.random.permutation(k)
+        for n, i in enumerate(order[t], 1):
+            delta = step if j[i] + step < levels else -step
+            j = j.copy()
+            j[i] += delta
+            indices[t, n] = j
+            steps[t, i] = delta
+    if uniform:
+        units = indices / (levels - 1.)
+        steps /= levels - 1.
+        lb, ub = np.array([i.bounds for i in parameters]).transpose()
+        samples = lb + units * (ub - lb)
+    else:
+        units = (indices + 0.5) / levels
+        steps /= levels
+        samples = np.zeros(units.shape)
+        for i, p in enumerate(parameters):
+            samples[:, :, i] = p.distribution.inv(units[:, :, i])
+    return samples.reshape([r * (k + 1), k]), steps, order
+
+def morris_screening(model, r=10, levels=4, metrics=None, uniform=False):
+    """
+    Evaluate Morris elementary effects of all parameters on metrics with
+    r·(k+1) simulations and return a DataFrame of the mean (mu), mean of
+    absolute values (mu_star), and standard deviation (sigma) of elementary
+    effects by parameter (rows) and metric (columns).
+
+    Parameters
+    ----------
+    model : Model
+        Model with parameters to screen.
+    r=10 : int, optional
+        Number of trajectories.
+    levels=4 : int, optional
+        Number of grid levels (must be even).
+    metrics=None : Iterable[Metric], optional
+        Metrics to screen parameters against. Defaults to all metrics.
+    uniform=False : bool, optional
+        If True, grid levels are spaced across parameter bounds. Otherwise,
+        grid levels are quantiles of parameter distributions.
+
+    Notes
+    -----
+    Elementary effects are computed with parameters scaled to the unit
+    hypercube, so effects of different parameters are comparable. Samples
+    and results are loaded to `model.table`. Trajectories that fail to
+    evaluate are excluded.
+
+    Examples
+    --------
+    >>> # screening = morris_screening(model, r=10)
+    >>> # screening.sort_values(('Biorefinery', 'MESP [USD/gal]', 'mu_star'))
+    >>> # reduced_model = create_reduced_model(model, screening)
+
+    """
+    from biosteam import speed_up
+    speed_up()
+    samples, steps, order = morris_samples(model, r, levels, uniform)
+    model.load_samples(samples)
+    all_metrics = model.metrics
+    index = [all_metrics.index(i) for i in metrics] if metrics else list(range(len(all_metrics)))
+    evaluate_sample = model._evaluate_sample_thorough
+    # Samples are evaluated in trajectory order, so each simulation starts
+    # from a state where only one parameter was different
+    values = np.array([evaluate_sample(i) for i in samples], dtype=float)
+    model.table[model._metric_indices] = values
+    k = samples.shape[1]
+    values = values[:, index].reshape([r, k + 1, len(index)])
+    effects = np.zeros([r, k, len(index)])
+    for t in range(r):
+        i = order[t]
+        effects[t, i] = np.diff(values[t], axis=0) / steps[t, i, None]
+    feasible = ~np.isnan(effects).any(axis=(1, 2))
+    effects = effects[feasible]
+    sigma = effects.std(0, ddof=1) if len(effects) > 1 else np.zeros(effects.shape[1:])
+    statistics = {'mu': effects.mean(0),
+                  'mu_star': np.abs(effects).mean(0),
+                  'sigma': sigma}
+    metric_indices = [all_metrics[i].index for i in index]
+    data = np.stack([statistics[i] for i in ('mu', 'mu_star', 'sigma')], axis=2)
+    columns = pd.MultiIndex.from_tuples([(*i, j) for i in metric_indices
+                                         for j in ('mu', 'mu_star', 'sigma')])
+    return pd.DataFrame(data.reshape([k, -1]), columns=columns,
+                        index=_parameter_index(model.get_parameters()))
+
+def create_reduced_model(model, screening, threshold=0.1):
+    """
+    Return a copy of the model where non-influential parameters are frozen
+    at their baseline values.
+
+    Parameters
+    ----------
+    model : Model
+        Model that was screened.
+    screening : DataFrame
+        Results of :func:`morris_screening`.
+    threshold=0.1 : float, optional
+        Parameters are influential if the mean of absolute elementary effects
+        on any metric is greater than this fraction of the largest one (for
+        that metric).
+
+    Notes
+    -----
+    Frozen parameters are set at baseline by the specification of the
+    reduced model (before the original specification).
+
+    """
+    mu_star = screening.xs('mu_star', axis=1, level=-1).values
+    mu_star_max = mu_star.max(0)
+    mu_star_max[mu_star_max == 0.] = 1.
+    influential = (mu_star > threshold * mu_star_max).any(1)
+    parameters = model.get_parameters()
+    if len(parameters) != influential.size:
+        raise ValueError('screening results do not match model parameters')
+    frozen = [i for i, j in zip(parameters, influential) if not j]
+    specification = model.specification
+    def load_frozen_parameters():
+        for i in frozen: i.setter(i.baseline)
+        if specification: specification()
+    reduced_model = model.copy()
+    reduced_model.set_parameters([i for i, j in zip(parameters, influential) if j])
+    reduced_model.specification = load_frozen_parameters
+    return reduced_model
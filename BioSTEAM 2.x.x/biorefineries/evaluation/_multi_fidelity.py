@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import pandas as pd
+from ._fault_isolation import _get_systems
+
+__all__ = ('evaluate_multi_fidelity', 'fidelity_index')
+
+#: [tuple[str, str]] Index of the column with the tolerance of each sample in `model.table`.
+fidelity_index = ('Evaluation', 'Fidelity')
+
+class _LooseTolerance:
+    # Multiply the molar tolerance of all systems by a factor; instance
+    # attributes (if any) are restored on exit
+    __slots__ = ('systems', 'factor', 'originals')
+
+    def __init__(self, system, factor):
+        self.systems = _get_systems(system)
+        self.factor = factor
+        self.originals = None
+
+    def __enter__(self):
+        systems = self.systems
+        self.originals = [i.__dict__.get('molar_tolerance') for i in systems]
+        for i in systems: i.molar_tolerance *= self.factor
+
+    def __exit__(self, type, exception, traceback):
+        for i, original in zip(self.systems, self.originals):
+            if original is None: del i.molar_tolerance
+            else: i.molar_tolerance = original
+
+
+def _near(values, targets, bounds):
+    # Whether values (by sample and metric) are within bounds of any target
+    near = np.zeros(values.shape, dtype=bool)
+    for j, metric_targets in enumerate(targets):
+        for target in metric_targets:
+            near[:, j] |= np.abs(values[:, j] - target) <= bounds[j]
+    return near.any(1)
+
+def evaluate_multi_fidelity(model, tolerance_factor=10., N_paired=20,
+                            percentiles=(0.05, 0.5, 0.95), thresholds=None,
+                            metrics=None, safety_factor=2., notify=False):
+    """
+    Evaluate metrics at all loaded samples (as in `Model.evaluate`) at a
+    loose molar tolerance of recycle loops, and evaluate again at the full
+    tolerance only those samples with metric values that are relevant to
+    given percentiles or thresholds. Return a DataFrame of the error of
+    loose evaluations by metric. The tolerance of each sample ('loose' or
+    'full') is saved to `model.table` (see `fidelity_index`).
+
+    Parameters
+    ----------
+    model : Model
+        Model with loaded samples.
+    tolerance_factor=10. : float, optional
+        Ratio of loose to full molar tolerance.
+    N_paired=20 : int, optional
+        Number of random samples evaluated at both tolerances to estimate
+        the error of loose evaluations.
+    percentiles=(0.05, 0.5, 0.95) : Iterable[float], optional
+        Percentiles (as fractions) of metric values to resolve.
+    thresholds=None : dict[Metric, float|Iterable[float]], optional
+        Metric values to resolve (e.g. a market price).
+    metrics=None : Iterable[Metric], optional
+        Metrics to resolve. Defaults to all metrics.
+    safety_factor=2. : float, optional
+        Ratio of the error bound to the maximum error of paired samples.
+        Samples with a metric within the bound of a percentile or a
+        threshold are evaluated at full tolerance.
+    notify=False : bool, optional
+        If True, notify the number of samples evaluated at each tolerance.
+
+    Notes
+    -----
+    Samples far from all percentiles and thresholds (relative to the error
+    bound) cannot change which side of them they fall on, so their loose
+    values are kept. Percentiles are taken from loose values. The returned
+    DataFrame has the number of paired samples, the mean and maximum
+    absolute error of loose values, the error bound, and the number of
+    samples evaluated again at full tolerance by metric.
+
+    Examples
+    --------
+    >>> # model.load_samples(model.sample(1000, 'L'))
+    >>> # error = evaluate_multi_fidelity(model, thresholds={MESP: 2.2})
+    >>> # model.table.to_excel('Monte Carlo.xlsx')
+
+    """
+    from biosteam import speed_up
+    speed_up()
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    N = len(samples)
+    all_metrics = model.metrics
+    metrics = tuple(metrics or all_metrics)
+    metric_index = [all_metrics.index(i) for i in metrics]
+    evaluate_sample = model._evaluate_sample_thorough
+    values = np.zeros([N, len(all_metrics)])
+    with _LooseTolerance(model._system, tolerance_factor):
+        for i in model._index: values[i] = evaluate_sample(samples[i])
+    if notify: print(f"{N} samples evaluated at loose tolerance")
+
+    # Full evaluations keep the relative order of the loose evaluations
+    position = np.empty(N, dtype=int)
+    position[model._index] = np.arange(N)
+    full = np.zeros(N, dtype=bool)
+    def evaluate_full(index):
+        index = index[np.argsort(position[index])]
+        for i in index: values[i] = evaluate_sample(samples[i])
+        full[index] = True
+
+    paired = np.random.choice(N, min(N_paired, N), replace=False)
+    loose_values = values[paired][:, metric_index]
+    evaluate_full(paired)
+    errors = np.abs(values[paired][:, metric_index] - loose_values)
+    errors_mean = np.nanmean(errors, 0)
+    errors_max = np.nanmax(errors, 0)
+    bounds = safety_factor * errors_max
+
+    resolved = values[:, metric_index]
+    with np.errstate(invalid='ignore'):
+        targets = np.nanpercentile(resolved, 100. * np.asarray(percentiles), 0).transpose()
+    targets = [list(i) for i in np.atleast_2d(targets)]
+    if thresholds:
+        for metric, threshold in thresholds.items():
+            targets[metrics.index(metric)].extend(np.atleast_1d(threshold))
+    refine = _near(resolved, targets, bounds) & ~full
+    refined = refine.sum()
+    # Count of samples refined because of each metric
+    counts = [(_near(resolved[:, [j]], [targets[j]], bounds[[j]]) & ~full).sum()
+              for j in range(len(metrics))]
+    evaluate_full(np.flatnonzero(refine))
+    if notify: print(f"{refined + len(paired)} samples evaluated at full tolerance")
+    table = model.table
+    table[model._metric_indices] = values
+    table[fidelity_index] = np.where(full, 'full', 'loose')
+    return pd.DataFrame({'Paired samples': len(paired),
+                         'Mean error': errors_mean,
+                         'Max error': errors_max,
+                         'Error bound': bounds,
+                         'Refined samples': counts},
+                        index=pd.MultiIndex.from_tuples([i.index for i in metrics],
+                                                        names=('Element', 'Metric')))
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+from itertools import combinations
+import numpy as np
+import pandas as pd
+
+__all__ = ('PolynomialChaosExpansion',
+           'fit_polynomial_chaos',
+           'summarize_polynomial_chaos')
+
+def _get_inverse_cdf(distribution):
+    # Chaospy distributions have an `inv` method; scipy frozen distributions
+    # have a `ppf` method
+    inv = getattr(distribution, 'inv', None)
+    return inv if inv else distribution.ppf
+
+
+class UnivariateBasis:
+    """
+    Create a UnivariateBasis object that evaluates polynomials orthonormal
+    with respect to a distribution. Recurrence coefficients are computed by
+    the discretized Stieltjes procedure with Gauss-Legendre quadrature
+    over the inverse cumulative distribution function.
+
+    Parameters
+    ----------
+    distribution : Distribution
+        Should have an `inv` (or `ppf`) method.
+    order : int
+        Maximum polynomial order.
+    quadrature_points=200 : int, optional
+        Number of quadrature points.
+
+    """
+    __slots__ = ('order', 'center', 'scale', 'alpha', 'beta')
+
+    def __init__(self, distribution, order, quadrature_points=200):
+        nodes, weights = np.polynomial.legendre.leggauss(quadrature_points)
+        x = np.asarray(_get_inverse_cdf(distribution)((nodes + 1.) / 2.), dtype=float)
+        w = weights / 2.
+        # Polynomials are evaluated in standardized coordinates for stability
+        self.center = center = w @ x
+        self.scale = scale = np.sqrt(w @ (x - center)**2) or 1.
+        z = (x - center) / scale
+        self.order = order
+        self.alpha = alpha = np.zeros(order + 1)
+        self.beta = beta = np.ones(order + 1)
+        p_last = np.zeros_like(z)
+        p = np.ones_like(z)
+        norm_last = 1.
+        for k in range(order + 1):
+            norm = w @ (p * p)
+            alpha[k] = w @ (z * p * p) / norm
+            if k: beta[k] = norm / norm_last
+            p, p_last = (z - alpha[k]) * p - beta[k] * p_last, p
+            norm_last = norm
+
+    def __call__(self, x):
+        """Return a 2d array of polynomial values by order (rows) and point (columns)."""
+        z = (np.asarray(x, dtype=float) - self.center) / self.scale
+        alpha = self.alpha
+        beta = self.beta
+        values = np.zeros([self.order + 1, z.size])
+        values[0] = 1.
+        p_last = np.zeros(z.size)
+        p = np.ones(z.size)
+        norm = 1.
+        for k in range(self.order):
+            p, p_last = (z - alpha[k]) * p - beta[k] * p_last, p
+            norm *= beta[k + 1]
+            values[k + 1] = p / np.sqrt(norm)
+        return values
+
+
+def get_multi_indices(N_variables, order, q=0.75, max_interaction=2):
+    """
+    Return a 2d array of multi-indices (excluding the constant term) with
+    total order of at most `order`, hyperbolic q-norm of at most `order`,
+    and at most `max_interaction` variables per term.
+
+    """
+    indices = []
+    for N_interaction in range(1, min(max_interaction, N_variables) + 1):
+        degrees = _get_degrees(N_interaction, order)
+        degrees = degrees[(degrees**q).sum(1)**(1./q) <= order + 1e-9]
+        if not degrees.size: continue
+        for variables in combinations(range(N_variables), N_interaction):
+            index = np.zeros([len(degrees), N_variables], dtype=int)
+            index[:, variables] = degrees
+            indices.append(index)
+    if indices: return np.vstack(indices)
+    return np.zeros([0, N_variables], dtype=int)
+
+def _get_degrees(N_interaction, order):
+    # All combinations of positive degrees with a total of at most `order`
+    if N_interaction == 1: return np.arange(1, order + 1)[:, None]
+    degrees = []
+    for i in range(1, order - N_interaction + 2):
+        for j in _get_degrees(N_interaction - 1, order - i):
+            degrees.append([i, *j])
+    return np.array(degrees, dtype=int).reshape([-1, N_interaction])
+
+def _least_angle_order(X, y, max_steps):
+    # Return the order in which columns enter the least angle regression path
+    X = X - X.mean(0)
+    norms = np.sqrt((X * X).sum(0))
+    inactive = norms > 1e-12 * max(norms.max(), 1.)
+    X = X / np.where(inactive, norms, 1.)
+    y = y - y.mean()
+    c = X.T @ y
+    c[~inactive] = 0.
+    j = np.abs(c).argmax()
+    active = [j]
+    inactive[j] = False
+    mu = np.zeros_like(y)
+    while len(active) < max_steps:
+        c = X.T @ (y - mu)
+        C = np.abs(c[active]).max()
+        if C < 1e-12: break
+        XA = X[:, active] * np.sign(c[active])
+        ones = np.ones(len(active))
+        try: Gi1 = np.linalg.solve(XA.T @ XA, ones)
+        except np.linalg.LinAlgError: break
+        A = 1. / np.sqrt(ones @ Gi1)
+        u = XA @ (A * Gi1)
+        a = X.T @ u
+        index = np.flatnonzero(inactive)
+        if not index.size: break
+        cj = c[index]
+        aj = a[index]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gamma = np.vstack([(C - cj) / (A - aj), (C + cj) / (A + aj)])
+        gamma[~(gamma > 1e-12)] = np.inf
+        gamma = gamma.min(0)
+        k = gamma.argmin()
+        if not np.isfinite(gamma[k]): break
+        mu += gamma[k] * u
+        j = index[k]
+        active.append(j)
+        inactive[j] = False
+    return active
+
+
+class PolynomialChaosExpansion:
+    """
+    Create a PolynomialChaosExpansion object that fits a metric as a sparse
+    expansion of polynomials orthonormal with respect to the (independent)
+    distributions of parameters. Terms are selected by least angle
+    regression and the expansion size with the smallest leave-one-out
+    error is kept (i.e., hybrid least angle regression).
+
+    Parameters
+    ----------
+    distributions : Iterable[Distribution]
+        Parameter distributions.
+    order=3 : int, optional
+        Maximum total order of polynomials. Orders from 1 to `order` are
+        tried and the one with the smallest leave-one-out error is kept.
+    q=0.75 : float, optional
+        Hyperbolic truncation of multi-indices.
+    max_interaction=2 : int, optional
+        Maximum number of parameters in each term.
+
+    Notes
+    -----
+    Because the basis is orthonormal, the mean is the constant coefficient,
+    the variance is the sum of squared coefficients, and Sobol indices are
+    sums of squared coefficients of terms with the respective parameters.
+
+    Examples
+    --------
+    >>> # expansion = PolynomialChaosExpansion([i.distribution for i in parameters])
+    >>> # expansion.fit(samples, values)
+    >>> # expansion.mean, expansion.std, expansion.loo_error
+    >>> # first_order, total = expansion.sobol_indices()
+
+    """
+    __slots__ = ('distributions', 'order', 'q', 'max_interaction',
+                 'bases', # list[UnivariateBasis] Orthonormal polynomials by parameter.
+                 'multi_indices', # [2d array] Multi-indices of selected terms (excluding the constant).
+                 'coefficients', # [1d array] Coefficients of the constant and selected terms.
+                 'loo_error') # [float] Leave-one-out error relative to the variance of training values.
+
+    def __init__(self, distributions, order=3, q=0.75, max_interaction=2):
+        self.distributions = tuple(distributions)
+        self.order = order
+        self.q = q
+        self.max_interaction = max_interaction
+        self.bases = [UnivariateBasis(i, order) for i in self.distributions]
+        self.multi_indices = self.coefficients = self.loo_error = None
+
+    def _evaluate_basis(self, samples, multi_indices):
+        samples = np.atleast_2d(samples)
+        univariate = [basis(x) for basis, x in zip(self.bases, samples.T)]
+        X = np.ones([len(samples), len(multi_indices)])
+        for n, index in enumerate(multi_indices):
+            for i in np.flatnonzero(index): X[:, n] *= univariate[i][index[i]]
+        return X
+
+    def fit(self, samples, values):
+        """Fit expansion to samples (rows) of parameter values and return self."""
+        samples = np.asarray(samples, dtype=float)
+        values = np.asarray(values, dtype=float)
+        feasible = ~np.isnan(values)
+        samples = samples[feasible]
+        values = values[feasible]
+        N = len(values)
+        if N < 3: raise RuntimeError('not enough samples to fit expansion')
+        variance = values.var() or 1.
+        best = (np.inf, np.zeros([0, samples.shape[1]], dtype=int))
+        for order in range(1, self.order + 1):
+            multi_indices = get_multi_indices(samples.shape[1], order,
+                                              self.q, self.max_interaction)
+            if not multi_indices.size: continue
+            X = self._evaluate_basis(samples, multi_indices)
+            active = _least_angle_order(X, values, N - 2)
+            # Orthogonalize terms in the order they enter the regression so
+            # that leave-one-out errors of all expansion sizes are computed at once
+            Q, R = np.linalg.qr(np.hstack([np.ones([N, 1]), X[:, active]]))
+            independent = np.abs(np.diag(R)) > 1e-10 * np.abs(R[0, 0])
+            independent[0] = True
+            Q = Q[:, independent]
+            active = np.asarray(active)[independent[1:]]
+            projections = Q * (Q.T @ values)
+            predictions = np.cumsum(projections, 1)
+            leverage = np.cumsum(Q * Q, 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                residuals = (values[:, None] - predictions) / (1. - leverage)
+            loo_errors = (residuals**2).mean(0) / variance
+            loo_errors[~np.isfinite(loo_errors)] = np.inf
+            m = loo_errors.argmin()
+            if loo_errors[m] < best[0]:
+                best = (loo_errors[m], multi_indices[active[:m]])
+        self.loo_error, self.multi_indices = best
+        X = np.hstack([np.ones([N, 1]), self._evaluate_basis(samples, self.multi_indices)])
+        self.coefficients = np.linalg.lstsq(X, values, rcond=None)[0]
+        return self
+
+    def __call__(self, samples):
+        """Return metric values at samples (rows) of parameter values."""
+        X = self._evaluate_basis(samples, self.multi_indices)
+        coefficients = self.coefficients
+        return coefficients[0] + X @ coefficients[1:]
+
+    @property
+    def mean(self):
+        """[float] Mean of metric."""
+        return self.coefficients[0]
+
+    @property
+    def variance(self):
+        """[float] Variance of metric."""
+        return (self.coefficients[1:]**2).sum()
+
+    @property
+    def std(self):
+        """[float] Standard deviation of metric."""
+        return np.sqrt(self.variance)
+
+    def sobol_indices(self):
+        """Return 1d arrays of first order and total Sobol indices by parameter."""
+        squares = self.coefficients[1:]**2
+        variance = squares.sum()
+        included = self.multi_indices > 0
+        if not variance:
+            zeros = np.zeros(included.shape[1])
+            return zeros, zeros.copy()
+        alone = included & (included.sum(1) == 1)[:, None]
+        first_order = squares @ alone / variance
+        total = squares @ included / variance
+        return first_order, total
+
+    def sample(self, N):
+        """Return metric values at N random samples of parameter distributions."""
+        u = np.random.rand(N, len(self.distributions))
+        samples = np.column_stack([_get_inverse_cdf(j)(u[:, i])
+                                   for i, j in enumerate(self.distributions)])
+        return self(samples)
+
+    def percentiles(self, q, N=100000):
+        """Return percentiles of metric (q as fractions) by sampling the expansion."""
+        return np.quantile(self.sample(N), q)
+
+    def __repr__(self):
+        terms = 'unfitted' if self.coefficients is None else f'{self.coefficients.size} terms'
+        return f"<{type(self).__name__}: {terms}>"
+
+
+def fit_polynomial_chaos(model, N=None, rule='L', metrics=None, **kwargs):
+    """
+    Return a dictionary of PolynomialChaosExpansion objects fitted to
+    each metric by metric index.
+
+    Parameters
+    ----------
+    model : Model
+        Model with parameters and metrics.
+    N=None : int, optional
+        Number of samples to evaluate (and load to `model.table`). Defaults
+        to fitting to the data already in `model.table`.
+    rule='L' : str, optional
+        Sampling rule.
+    metrics=None : Iterable[Metric], optional
+        Metrics to fit. Defaults to all metrics.
+    **kwargs
+        Options of PolynomialChaosExpansion objects.
+
+    Examples
+    --------
+    >>> # expansions = fit_polynomial_chaos(model, 300)
+    >>> # summarize_polynomial_chaos(expansions)
+
+    """
+    parameters = model.get_parameters()
+    if N:
+        from biosteam import speed_up
+        speed_up()
+        samples = model.sample(N, rule)
+        model.load_samples(samples)
+        evaluate_sample = model._evaluate_sample_thorough
+        values = np.zeros([N, len(model.metrics)])
+        for i in model._index: values[i] = evaluate_sample(samples[i])
+        model.table[model._metric_indices] = values
+    table = model.table
+    if table is None: raise RuntimeError('no samples evaluated')
+    samples = table[[i.index for i in parameters]].values
+    distributions = [i.distribution for i in parameters]
+    return {i.index: PolynomialChaosExpansion(distributions, **kwargs).fit(samples, table[i.index].values)
+            for i in (metrics or model.metrics)}
+
+def summarize_polynomial_chaos(expansions, percentiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+                               N=100000):
+    """
+    Return a DataFrame of the mean, standard deviation, percentiles, and
+    leave-one-out error of each metric (rows) given a dictionary of
+    PolynomialChaosExpansion objects by metric index.
+
+    """
+    data = []
+    for expansion in expansions.values():
+        data.append([expansion.mean, expansion.std,
+                     *expansion.percentiles(percentiles, N),
+                     expansion.loo_error])
+    columns = ['Mean', 'Std', *[f'{100*i:g}%' for i in percentiles], 'LOO error']
+    return pd.DataFrame(data, index=pd.MultiIndex.from_tuples(expansions),
+                        columns=columns)
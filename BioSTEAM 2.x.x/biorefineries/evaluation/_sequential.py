@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+from scipy.stats import norm, rankdata
+from ._fault_isolation import SampleEvaluator, failure_index
+
+__all__ = ('evaluate_sequentially',
+           'percentile_confidence_intervals',
+           'spearman_confidence_intervals')
+
+# Sampling rules where independent batches can be drawn; sequences of other
+# rules (e.g. Sobol) are deterministic, so all samples are drawn at once
+_batch_rules = ('L', 'R')
+
+def percentile_confidence_intervals(values, percentiles, confidence=0.95):
+    """
+    Return the lower and upper bounds of distribution-free confidence
+    intervals of percentiles by metric (2d arrays of percentiles by metric).
+
+    Parameters
+    ----------
+    values : 2d array
+        Metric values by sample (rows) and metric (columns).
+    percentiles : 1d array
+        Percentiles as fractions.
+    confidence=0.95 : float, optional
+        Confidence level.
+
+    Notes
+    -----
+    Bounds are order statistics with ranks given by the normal
+    approximation of the binomial distribution.
+
+    """
+    N = len(values)
+    percentiles = np.asarray(percentiles, dtype=float)
+    z = norm.ppf(0.5 + confidence / 2.)
+    mean = N * percentiles
+    std = z * np.sqrt(mean * (1. - percentiles))
+    lb = np.clip(np.floor(mean - std).astype(int), 0, N - 1)
+    ub = np.clip(np.ceil(mean + std).astype(int), 0, N - 1)
+    values = np.sort(values, axis=0)
+    return values[lb], values[ub]
+
+def spearman_confidence_intervals(rho, N, confidence=0.95):
+    """
+    Return the lower and upper bounds of confidence intervals of Spearman's
+    rank correlation coefficients given the number of samples.
+
+    Notes
+    -----
+    Bounds are computed by Fisher transformation with the standard error
+    of Fieller et al. (1957).
+
+    """
+    z = norm.ppf(0.5 + confidence / 2.) * np.sqrt(1.06 / max(N - 3, 1))
+    arctanh = np.arctanh(np.clip(rho, -0.999999, 0.999999))
+    return np.tanh(arctanh - z), np.tanh(arctanh + z)
+
+def _spearman(parameters, metrics):
+    x = rankdata(parameters, axis=0)
+    y = rankdata(metrics, axis=0)
+    x -= x.mean(0)
+    y -= y.mean(0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (x.T @ y) / np.outer(np.sqrt((x * x).sum(0)),
+                                    np.sqrt((y * y).sum(0)))
+
+def _converged(samples, values, percentiles, metric_index, spearman_index,
+               rtol, spearman_tol, confidence):
+    # Failed evaluations are excluded
+    feasible = ~np.isnan(values).any(1)
+    values = values[feasible]
+    samples = samples[feasible]
+    if len(values) < 4: return False
+    if percentiles.size:
+        data = values[:, metric_index]
+        lb, ub = percentile_confidence_intervals(data, percentiles, confidence)
+        spread = data.max(0) - data.min(0)
+        if ((ub - lb) > 2. * rtol * spread).any(): return False
+    if spearman_index:
+        rho = _spearman(samples, values[:, spearman_index])
+        lb, ub = spearman_confidence_intervals(rho, len(values), confidence)
+        width = ub - lb
+        if (width[~np.isnan(width)] > 2. * spearman_tol).any(): return False
+    return True
+
+def evaluate_sequentially(model, N_max, batch_size=100, rule='L',
+                          percentiles=(0.05, 0.25, 0.5, 0.75, 0.95), metrics=None,
+                          spearman_metrics=(), rtol=0.01, spearman_tol=0.05,
+                          confidence=0.95, N_min=None, timeout=None,
+                          maxiter=None, notify=False):
+    """
+    Evaluate the model at batches of samples until confidence intervals of
+    metric percentiles and Spearman's rank correlation coefficients are
+    within tolerance (or `N_max` samples are evaluated), and return the
+    number of samples evaluated. Samples and results are loaded to
+    `model.table`, as with `Model.evaluate`.
+
+    Parameters
+    ----------
+    model : Model
+        Model to evaluate.
+    N_max : int
+        Maximum number of samples.
+    batch_size=100 : int, optional
+        Number of samples evaluated between convergence checks.
+    rule='L' : str, optional
+        Sampling rule. Independent batches are drawn with Latin hypercube
+        ('L') or random ('R') sampling; for other rules (e.g. 'S' for the
+        Sobol sequence), `N_max` samples are drawn and evaluated in order.
+    percentiles=(0.05, 0.25, 0.5, 0.75, 0.95) : Iterable[float], optional
+        Percentiles (as fractions) that must converge.
+    metrics=None : Iterable[Metric], optional
+        Metrics with percentiles that must converge. Defaults to all metrics.
+    spearman_metrics=() : Iterable[Metric], optional
+        Metrics with Spearman's rank correlation coefficients (against all
+        parameters) that must converge.
+    rtol=0.01 : float, optional
+        Maximum half width of confidence intervals of percentiles relative
+        to the range of metric values.
+    spearman_tol=0.05 : float, optional
+        Maximum half width of confidence intervals of Spearman's rank
+        correlation coefficients.
+    confidence=0.95 : float, optional
+        Confidence level.
+    N_min=None : int, optional
+        Minimum number of samples. Defaults to two batches.
+    timeout=None : float, optional
+        Maximum wall-clock time of each evaluation [s]. If given (or if 
+        `maxiter` is given), failed evaluations restore the system to its
+        state at the beginning and their reasons are saved to `model.table`
+        (see :class:`SampleEvaluator`).
+    maxiter=None : int, optional
+        Maximum number of iterations of each recycle loop.
+    notify=False : bool, optional
+        If True, notify number of samples and elapsed time after each batch.
+
+    Examples
+    --------
+    >>> # N = evaluate_sequentially(model, 5000, spearman_metrics=model.metrics[:1])
+    >>> # model.table.to_excel('Monte Carlo.xlsx')
+    >>> # spearman = model.spearman(metrics=model.metrics[:1])
+
+    """
+    from biosteam import speed_up
+    speed_up()
+    if notify:
+        from biosteam.utils import TicToc
+        timer = TicToc()
+        timer.tic()
+    if N_min is None: N_min = 2 * batch_size
+    all_metrics = model.metrics
+    metric_index = ([all_metrics.index(i) for i in metrics] if metrics
+                    else list(range(len(all_metrics))))
+    spearman_index = [all_metrics.index(i) for i in spearman_metrics]
+    percentiles = np.asarray(percentiles, dtype=float)
+    batches = rule in _batch_rules
+    if not batches: sequence = model.sample(N_max, rule)
+    samples = []
+    values = []
+    failures = []
+    evaluator = None
+    N = 0
+    while N < N_max:
+        size = min(batch_size, N_max - N)
+        batch = model.sample(size, rule) if batches else sequence[N:N+size]
+        model.load_samples(batch)
+        batch_values = np.zeros([size, len(all_metrics)])
+        batch_failures = size * ['']
+        if timeout or maxiter:
+            if not evaluator: evaluator = SampleEvaluator(model, timeout, maxiter)
+            for i in model._index:
+                batch_values[i] = evaluator(batch[i])
+                batch_failures[i] = evaluator.failure
+        else:
+            evaluate_sample = model._evaluate_sample_thorough
+            for i in model._index: batch_values[i] = evaluate_sample(batch[i])
+        samples.append(batch)
+        values.append(batch_values)
+        failures.extend(batch_failures)
+        N += size
+        if notify:
+            print(f"[{N}] Elapsed time: {timer.elapsed_time:.0f} sec")
+        if N >= N_min and _converged(np.vstack(samples), np.vstack(values),
+                                     percentiles, metric_index, spearman_index,
+                                     rtol, spearman_tol, confidence):
+            break
+    model.load_samples(np.vstack(samples))
+    model.table[model._metric_indices] = np.vstack(values)
+    if evaluator: model.table[failure_index] = failures
+    return N
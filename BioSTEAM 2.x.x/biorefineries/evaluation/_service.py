@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import os
+import queue
+import hashlib
+import threading
+import numpy as np
+import biosteam as bst
+from .. import __version__
+from . import _fork
+
+__all__ = ('EvaluationJob', 'EvaluationService')
+
+def _evaluate(sample):
+    return np.array(_fork.context._evaluate_sample_thorough(sample), dtype=float)
+
+
+class EvaluationJob:
+    """
+    Create an EvaluationJob object that represents the evaluation of a
+    sample by an EvaluationService object.
+
+    Parameters
+    ----------
+    key : tuple[float]
+        Rounded sample.
+
+    """
+    __slots__ = ('key', '_event', '_values', '_error', '_callbacks', '_lock')
+
+    def __init__(self, key):
+        self.key = key
+        self._event = threading.Event()
+        self._values = self._error = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def done(self):
+        """Return whether the evaluation is finished."""
+        return self._event.is_set()
+
+    def get(self, timeout=None):
+        """Return metric values (wait until the evaluation is finished)."""
+        if not self._event.wait(timeout):
+            raise TimeoutError(f'evaluation not finished after {timeout} sec')
+        if self._error is not None: raise self._error
+        return self._values
+
+    def add_done_callback(self, f):
+        """Call `f` with this job once the evaluation is finished."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(f)
+                return
+        f(self)
+
+    def _finish(self, values=None, error=None):
+        with self._lock:
+            self._values = values
+            self._error = error
+            self._event.set()
+            callbacks = self._callbacks
+            self._callbacks = []
+        for f in callbacks: f(self)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {'done' if self.done() else 'pending'}>"
+
+
+class EvaluationService:
+    """
+    Create an EvaluationService object that serves concurrent requests to
+    evaluate a model at given samples. Requests are queued to a pool of
+    worker processes forked from the converged system, identical requests
+    are evaluated only once, and results are cached on disk.
+
+    Parameters
+    ----------
+    model : Model
+        Model to evaluate.
+    processes=None : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    cache=None : str, optional
+        Directory of cached results (e.g. in a user or temporary
+        directory). Defaults to no disk cache.
+    decimals=6 : int, optional
+        Samples are rounded to this number of decimals, both for
+        evaluation and as keys of cached results.
+    version=None : str, optional
+        Version of the model (e.g. of the flowsheet). Results are cached
+        by the version, the names of parameters and metrics, and the
+        versions of biosteam and biorefineries, so that results of a
+        different model are not used.
+
+    Notes
+    -----
+    The worker pool is created (and workers are forked) on the first
+    request or by calling :meth:`start`; make sure the system is converged
+    before then. If processes cannot be forked (or only one process is
+    used), samples are evaluated one at a time in this process. The
+    baseline sample is loaded to the model if no samples are loaded, as
+    evaluations use parameter setters and metric getters cached by
+    `Model.load_samples`.
+
+    Examples
+    --------
+    >>> # cache = os.path.join(tempfile.gettempdir(), 'cornstover_cache')
+    >>> # service = EvaluationService(model, cache=cache)
+    >>> # service.evaluate(model.get_baseline_sample())
+    >>> # for i, values in service.imap(model.sample(100, 'L')): ...
+
+    """
+    __slots__ = ('model', 'processes', 'cache', 'decimals', 'fingerprint',
+                 '_pool', '_jobs', '_lock', '_model_lock')
+
+    def __init__(self, model, processes=None, cache=None, decimals=6,
+                 version=None):
+        if model._samples is None:
+            model.load_samples(np.array([model.get_baseline_sample()]))
+        self.model = model
+        self.processes = processes or os.cpu_count() or 1
+        self.cache = cache
+        self.decimals = decimals
+        identity = (version, __version__, bst.__version__,
+                    [i.index for i in model.get_parameters()],
+                    [i.index for i in model.metrics])
+        #: [str] Hash of the model identity; results are cached in a
+        #: subdirectory of this name.
+        self.fingerprint = hashlib.sha1(repr(identity).encode()).hexdigest()
+        self._pool = None
+        self._jobs = {} # dict[tuple, EvaluationJob] Jobs by key.
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+
+    def start(self):
+        """Fork worker processes (if not already started)."""
+        with self._lock:
+            if self._pool or not _fork.can_fork(self.processes): return
+            self._pool = _fork.fork_pool(self.processes, self.model)
+
+    def close(self):
+        """Terminate worker processes."""
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+            _fork.clear_context(self.model)
+        if pool:
+            pool.terminate()
+            pool.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        self.close()
+
+    def get_key(self, sample):
+        """Return the key of a sample (i.e. the rounded sample)."""
+        return tuple(np.round(np.asarray(sample, dtype=float), self.decimals).tolist())
+
+    def _get_path(self, key):
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache, self.fingerprint, name + '.npy')
+
+    def _load(self, key):
+        if not self.cache: return None
+        path = self._get_path(key)
+        if os.path.exists(path): return np.load(path)
+
+    def _save(self, key, values):
+        # Failed evaluations (NaN values) are not cached
+        if not self.cache or np.isnan(values).any(): return
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file = f'{path}.{os.getpid()}.{threading.get_ident()}.npy'
+        np.save(file, values)
+        os.replace(file, path)
+
+    def _on_success(self, job, values):
+        self._save(job.key, values)
+        with self._lock: del self._jobs[job.key]
+        job._finish(values)
+
+    def _on_error(self, job, error):
+        with self._lock: del self._jobs[job.key]
+        job._finish(error=error)
+
+    def submit(self, sample):
+        """Queue the evaluation of a sample and return an EvaluationJob object."""
+        key = self.get_key(sample)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job: return job
+        values = self._load(key)
+        if values is None:
+            self.start()
+            with self._lock:
+                job = self._jobs.get(key)
+                if job: return job
+                self._jobs[key] = job = EvaluationJob(key)
+                pool = self._pool
+                if pool:
+                    pool.apply_async(
+                        _evaluate, (np.array(key),),
+                        callback=lambda values: self._on_success(job, values),
+                        error_callback=lambda error: self._on_error(job, error),
+                    )
+            if not pool:
+                try:
+                    with self._model_lock:
+                        values = np.array(self.model._evaluate_sample_thorough(np.array(key)),
+                                          dtype=float)
+                except Exception as error:
+                    self._on_error(job, error)
+                else:
+                    self._on_success(job, values)
+        else:
+            job = EvaluationJob(key)
+            job._finish(values)
+        return job
+
+    def evaluate(self, sample, timeout=None):
+        """Return metric values at a sample."""
+        return self.submit(sample).get(timeout)
+
+    def imap(self, samples, timeout=None):
+        """
+        Queue the evaluation of all samples and yield tuples of the index
+        of each sample and its metric values as soon as they are available.
+
+        """
+        finished = queue.Queue()
+        jobs = []
+        for i, sample in enumerate(samples):
+            job = self.submit(sample)
+            job.add_done_callback(lambda job, i=i: finished.put((i, job)))
+            jobs.append(job)
+        for n in range(len(jobs)):
+            try:
+                i, job = finished.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f'evaluation not finished after {timeout} sec')
+            yield i, job.get()
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.model}>"
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import os
+import numpy as np
+from . import _fork
+try:
+    from multiprocessing import shared_memory
+except ImportError: # Python < 3.8
+    shared_memory = None
+
+__all__ = ('SharedArray', 'evaluate_in_shared_memory')
+
+def _evaluate_chunk(bounds):
+    model, index, samples, values = _fork.context
+    evaluate_sample = model._evaluate_sample_thorough
+    start, stop = bounds
+    for i in index[start:stop]: values[i] = evaluate_sample(samples[i])
+    return stop - start
+
+
+class SharedArray:
+    """
+    Create a SharedArray object that holds a float NumPy array in a shared
+    memory block, so that forked worker processes read and write it in
+    place.
+
+    Parameters
+    ----------
+    shape : tuple[int]
+        Shape of the array.
+    fill=0. : float, optional
+        Initial value of all elements.
+
+    """
+    __slots__ = ('block', 'array')
+
+    def __init__(self, shape, fill=0.):
+        size = max(int(np.prod(shape)), 1) * np.dtype(float).itemsize
+        #: [SharedMemory] Shared memory block.
+        self.block = block = shared_memory.SharedMemory(create=True, size=size)
+        #: [ndarray] Array mapped to the shared memory block.
+        self.array = array = np.ndarray(shape, dtype=float, buffer=block.buf)
+        array[:] = fill
+
+    def release(self):
+        """Free the shared memory block (the array can no longer be used)."""
+        self.array = None
+        self.block.close()
+        self.block.unlink()
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.block.name}>"
+
+
+def evaluate_in_shared_memory(model, processes=None, chunksize=None, notify=False):
+    """
+    Evaluate metrics at all loaded samples (as in `Model.evaluate`) with
+    forked worker processes that read samples from and write metric values
+    to arrays in shared memory. Results are loaded to `model.table` once
+    all samples are evaluated.
+
+    Parameters
+    ----------
+    model : Model
+        Model with loaded samples.
+    processes=None : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunksize=None : int, optional
+        Number of consecutive samples (in the model's evaluation order)
+        evaluated by a worker at a time. Defaults to a quarter of the
+        samples per process.
+    notify=False : bool, optional
+        If True, notify the number of samples evaluated after each chunk.
+
+    Notes
+    -----
+    Only chunk bounds and sample counts pass through pipes. Failed
+    evaluations return NaN values. Samples are evaluated serially if
+    forking or shared memory is not available (or with one process).
+
+    Examples
+    --------
+    >>> # model.load_samples(model.sample(5000, 'L'))
+    >>> # evaluate_in_shared_memory(model, processes=8)
+    >>> # model.table.to_excel('Monte Carlo.xlsx')
+
+    """
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    N = len(samples)
+    processes = min(processes or os.cpu_count() or 1, N)
+    if shared_memory is None or not _fork.can_fork(processes):
+        _fork.initialize_worker()
+        values = np.zeros([N, len(model.metrics)])
+        evaluate_sample = model._evaluate_sample_thorough
+        for n, i in enumerate(model._index, 1):
+            values[i] = evaluate_sample(samples[i])
+            if notify: print(f"[{n}] samples evaluated")
+        model.table[model._metric_indices] = values
+        return
+    chunksize = chunksize or max(N // (4 * processes), 1)
+    chunks = [(i, min(i + chunksize, N)) for i in range(0, N, chunksize)]
+    shared_samples = SharedArray(samples.shape)
+    shared_values = SharedArray([N, len(model.metrics)], np.nan)
+    try:
+        shared_samples.array[:] = samples
+        shared = (model, model._index, shared_samples.array, shared_values.array)
+        with _fork.forked_pool(processes, shared) as pool:
+            n = 0
+            for size in pool.imap_unordered(_evaluate_chunk, chunks):
+                n += size
+                if notify: print(f"[{n}] samples evaluated")
+        model.table[model._metric_indices] = shared_values.array.copy()
+    finally:
+        shared_samples.release()
+        shared_values.release()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import pandas as pd
+from ._polynomial_chaos import PolynomialChaosExpansion, _get_inverse_cdf
+
+__all__ = ('SurrogateEnsemble', 'sobol_analysis')
+
+
+class SurrogateEnsemble:
+    """
+    Create a SurrogateEnsemble object of polynomial chaos expansions fitted
+    to bootstrap resamples of training data of a metric. The spread of the
+    ensemble estimates the uncertainty of the surrogate.
+
+    Parameters
+    ----------
+    distributions : Iterable[Distribution]
+        Parameter distributions.
+    samples : 2d array
+        Parameter values by sample (rows) and parameter (columns).
+    values : 1d array
+        Metric values by sample.
+    N_bootstrap=50 : int, optional
+        Number of bootstrap resamples.
+    **kwargs
+        Options of PolynomialChaosExpansion objects.
+
+    """
+    __slots__ = ('expansion', 'ensemble')
+
+    def __init__(self, distributions, samples, values, N_bootstrap=50, **kwargs):
+        samples = np.asarray(samples, dtype=float)
+        values = np.asarray(values, dtype=float)
+        distributions = tuple(distributions)
+        #: [PolynomialChaosExpansion] Expansion fitted to all training data.
+        self.expansion = PolynomialChaosExpansion(distributions, **kwargs).fit(samples, values)
+        N = len(values)
+        ensemble = []
+        for i in range(N_bootstrap):
+            index = np.random.randint(N, size=N)
+            try:
+                expansion = PolynomialChaosExpansion(distributions, **kwargs)
+                ensemble.append(expansion.fit(samples[index], values[index]))
+            except (RuntimeError, np.linalg.LinAlgError):
+                continue
+        #: list[PolynomialChaosExpansion] Expansions fitted to bootstrap resamples.
+        self.ensemble = ensemble
+
+    def predict(self, samples):
+        """Return 1d arrays of the mean and standard deviation of ensemble predictions."""
+        if not self.ensemble:
+            predictions = self.expansion(samples)
+            return predictions, np.zeros_like(predictions)
+        predictions = np.array([i(samples) for i in self.ensemble])
+        return predictions.mean(0), predictions.std(0)
+
+    def sobol_indices(self, confidence=0.95):
+        """
+        Return a dictionary of 1d arrays by parameter of first order ('S1')
+        and total ('ST') Sobol indices, and the lower ('lb') and upper
+        ('ub') bounds of their bootstrap confidence intervals.
+
+        """
+        S1, ST = self.expansion.sobol_indices()
+        if self.ensemble:
+            indices = np.array([i.sobol_indices() for i in self.ensemble])
+            tail = 50. * (1. - confidence)
+            (S1_lb, ST_lb), (S1_ub, ST_ub) = np.percentile(indices, [tail, 100. - tail], axis=0)
+        else:
+            S1_lb = S1_ub = S1
+            ST_lb = ST_ub = ST
+        return {'S1': S1, 'S1 lb': S1_lb, 'S1 ub': S1_ub,
+                'ST': ST, 'ST lb': ST_lb, 'ST ub': ST_ub}
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self.ensemble)} expansions>"
+
+
+def _sample_distributions(distributions, N):
+    u = np.random.rand(N, len(distributions))
+    return np.column_stack([_get_inverse_cdf(j)(u[:, i])
+                            for i, j in enumerate(distributions)])
+
+def sobol_analysis(model, metrics=None, N_adaptive=0, batch_size=10,
+                   N_candidates=1000, N_bootstrap=50, confidence=0.95,
+                   notify=False, **kwargs):
+    """
+    Return a DataFrame of first order and total Sobol indices (with
+    bootstrap confidence intervals) by parameter (rows) and metric
+    (columns). Indices are estimated from surrogates trained on the samples
+    in `model.table`.
+
+    Parameters
+    ----------
+    model : Model
+        Model with evaluated samples.
+    metrics=None : Iterable[Metric], optional
+        Metrics to analyze. Defaults to all metrics.
+    N_adaptive=0 : int, optional
+        Number of additional samples to evaluate where surrogates are most
+        uncertain. All samples are loaded to `model.table`.
+    batch_size=10 : int, optional
+        Number of samples evaluated between surrogate updates.
+    N_candidates=1000 : int, optional
+        Number of random candidate samples to choose from.
+    N_bootstrap=50 : int, optional
+        Number of bootstrap resamples for each surrogate.
+    confidence=0.95 : float, optional
+        Confidence level of intervals.
+    notify=False : bool, optional
+        If True, notify the number of samples after each batch.
+    **kwargs
+        Options of PolynomialChaosExpansion objects.
+
+    Notes
+    -----
+    Surrogates are sparse polynomial chaos expansions, so Sobol indices
+    are computed analytically from coefficients; the bootstrap ensemble
+    gives both confidence intervals and the uncertainty used to choose
+    new samples (largest standard deviation of ensemble predictions
+    relative to the standard deviation of each metric, summed over metrics).
+
+    Examples
+    --------
+    >>> # model.load_samples(model.sample(200, 'L'))
+    >>> # model.evaluate()
+    >>> # sobol = sobol_analysis(model, metrics=model.metrics[:2], N_adaptive=50)
+
+    """
+    table = model.table
+    if table is None: raise RuntimeError('no samples evaluated')
+    parameters = model.get_parameters()
+    distributions = [i.distribution for i in parameters]
+    all_metrics = model.metrics
+    metrics = tuple(metrics or all_metrics)
+    index = [all_metrics.index(i) for i in metrics]
+    samples = table[[i.index for i in parameters]].values
+    values = table[model._metric_indices].values
+    fit = lambda: [SurrogateEnsemble(distributions, samples, values[:, i],
+                                     N_bootstrap, **kwargs) for i in index]
+    surrogates = fit()
+    if N_adaptive:
+        from biosteam import speed_up
+        speed_up()
+        evaluate_sample = model._evaluate_sample_thorough
+        N = 0
+        while N < N_adaptive:
+            size = min(batch_size, N_adaptive - N)
+            candidates = _sample_distributions(distributions, N_candidates)
+            uncertainty = np.zeros(N_candidates)
+            for surrogate, i in zip(surrogates, index):
+                std = np.nanstd(values[:, i]) or 1.
+                uncertainty += surrogate.predict(candidates)[1] / std
+            batch = candidates[np.argsort(uncertainty)[::-1][:size]]
+            batch_values = np.array([evaluate_sample(i) for i in batch], dtype=float)
+            samples = np.vstack([samples, batch])
+            values = np.vstack([values, batch_values])
+            N += size
+            if notify: print(f"[{len(samples)}] samples evaluated")
+            surrogates = fit()
+        model.load_samples(samples)
+        model.table[model._metric_indices] = values
+    data = {}
+    for metric, surrogate in zip(metrics, surrogates):
+        for name, indices in surrogate.sobol_indices(confidence).items():
+            data[(*metric.index, name)] = indices
+    columns = pd.MultiIndex.from_tuples(data)
+    return pd.DataFrame(data, columns=columns,
+                        index=pd.MultiIndex.from_tuples([i.index for i in parameters],
+                                                        names=('Element', 'Parameter')))
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import os
+import numpy as np
+import pandas as pd
+from ._fault_isolation import SystemState
+from . import _fork
+
+__all__ = ('tornado_analysis',)
+
+def _evaluate_coupled(perturbation):
+    return _fork.context.evaluate_coupled(*perturbation)
+
+
+class _Tornado:
+    # Evaluate one parameter at a time starting from the baseline state
+    __slots__ = ('model', 'parameters', 'getters', 'baseline', 'state')
+
+    def __init__(self, model, metrics):
+        self.model = model
+        self.parameters = model.get_parameters()
+        self.getters = [i.getter for i in metrics]
+        self.baseline = model.get_baseline_sample()
+
+    def load_baseline(self):
+        for p, x in zip(self.parameters, self.baseline): p.setter(x)
+        model = self.model
+        if model._specification: model._specification()
+        model._system.simulate()
+        self.state = SystemState(model._system)
+        return [i() for i in self.getters]
+
+    def evaluate_isolated(self, index, value):
+        # Only the element of the parameter is simulated (if any)
+        parameter = self.parameters[index]
+        specification = self.model._specification
+        try:
+            parameter.setter(value)
+            if specification: specification()
+            parameter.simulate()
+            return [i() for i in self.getters]
+        except Exception:
+            return len(self.getters) * [np.nan]
+        finally:
+            parameter.setter(self.baseline[index])
+            if specification: specification()
+            parameter.simulate()
+
+    def evaluate_coupled(self, index, value):
+        # The system is simulated from the baseline state
+        model = self.model
+        parameters = self.parameters
+        baseline = self.baseline
+        self.state.restore()
+        for p, x in zip(parameters, baseline): p.setter(x)
+        parameters[index].setter(value)
+        try:
+            if model._specification: model._specification()
+            model._system.simulate()
+            return [i() for i in self.getters]
+        except Exception:
+            return len(self.getters) * [np.nan]
+
+
+def tornado_analysis(model, metrics=None, percentile=None, processes=None):
+    """
+    Evaluate metrics at the lower and upper values of each parameter (one
+    at a time, with all other parameters at baseline) and return a
+    DataFrame of parameter and metric values by parameter (rows) with
+    baseline metric values in the 'Baseline' columns.
+
+    Parameters
+    ----------
+    model : Model
+        Model with parameters to perturb.
+    metrics=None : Iterable[Metric], optional
+        Metrics to evaluate. Defaults to all metrics.
+    percentile=None : float, optional
+        Lower percentile (as a fraction) of parameter distributions to
+        evaluate (the upper one is 1 - percentile). Defaults to parameter
+        bounds.
+    processes=None : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Notes
+    -----
+    Each simulation starts from the converged baseline state. Parameters
+    that do not affect the system (e.g. with element 'TEA' or kind
+    'isolated') only simulate their element (if any). Other perturbations
+    are evaluated in forked worker processes (or serially if forking is
+    not available). Failed evaluations return NaN values. The system is
+    left simulated at baseline.
+
+    Examples
+    --------
+    >>> # tornado = tornado_analysis(model, metrics=model.metrics[:1])
+    >>> # tornado.to_excel('Tornado.xlsx')
+
+    """
+    _fork.initialize_worker()
+    metrics = tuple(metrics or model.metrics)
+    tornado = _Tornado(model, metrics)
+    parameters = tornado.parameters
+    if percentile is None:
+        lb, ub = np.array([i.bounds for i in parameters]).transpose()
+    else:
+        lb = np.array([i.distribution.inv(percentile) for i in parameters], dtype=float)
+        ub = np.array([i.distribution.inv(1. - percentile) for i in parameters], dtype=float)
+    baseline_values = tornado.load_baseline()
+    N_metrics = len(metrics)
+    low = np.zeros([len(parameters), N_metrics])
+    high = np.zeros([len(parameters), N_metrics])
+    coupled = []
+    for i, p in enumerate(parameters):
+        if p.system:
+            coupled.extend([(i, lb[i]), (i, ub[i])])
+        else:
+            low[i] = tornado.evaluate_isolated(i, lb[i])
+            high[i] = tornado.evaluate_isolated(i, ub[i])
+    processes = min(processes or os.cpu_count() or 1, len(coupled))
+    if _fork.can_fork(processes):
+        # Workers inherit the converged baseline state
+        with _fork.forked_pool(processes, tornado) as pool:
+            values = pool.map(_evaluate_coupled, coupled)
+    else:
+        values = [tornado.evaluate_coupled(*i) for i in coupled]
+        # Simulate at baseline again so that unit designs and costs do
+        # not hold the last perturbation
+        tornado.state.restore()
+        tornado.load_baseline()
+    # Coupled perturbations are in (low, high) pairs
+    for (i, _), low_values, high_values in zip(coupled[::2], values[::2], values[1::2]):
+        low[i] = low_values
+        high[i] = high_values
+    data = {('Parameter', 'Value', 'Low'): lb,
+            ('Parameter', 'Value', 'High'): ub}
+    for j, metric in enumerate(metrics):
+        data[(*metric.index, 'Baseline')] = baseline_values[j]
+        data[(*metric.index, 'Low')] = low[:, j]
+        data[(*metric.index, 'High')] = high[:, j]
+    return pd.DataFrame(data, columns=pd.MultiIndex.from_tuples(data),
+                        index=pd.MultiIndex.from_tuples([i.index for i in parameters],
+                                                        names=('Element', 'Parameter')))
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+
+__all__ = ('UnitGroupResults',)
+
+#: tuple[str] Quantities gathered for each unit (in order of matrix columns).
+quantities = ('Installed cost', # USD
+              'Heating duty', # kJ/hr
+              'Cooling duty', # kJ/hr
+              'Power', # kW
+              'Electricity consumption', # kW
+              'Electricity production', # kW
+              'Utility cost') # USD/hr
+
+INSTALLED_COST, HEATING_DUTY, COOLING_DUTY, POWER, \
+ELECTRICITY_CONSUMPTION, ELECTRICITY_PRODUCTION, UTILITY_COST = range(len(quantities))
+
+
+class UnitGroupResults:
+    """
+    Create a UnitGroupResults object that gathers the installed equipment
+    cost, heating and cooling duties, power, and utility cost of all units
+    into a unit by quantity matrix in a single pass. Results of unit groups
+    are then computed all at once as masked sums over the matrix.
+
+    Parameters
+    ----------
+    units : Iterable[Unit]
+        Unit operations to gather results from.
+    groups=() : Iterable[UnitGroup], optional
+        Unit groups to compute results for. Units of the groups are
+        included in the matrix even if not in `units`.
+
+    Notes
+    -----
+    Results are gathered the first time they are requested after calling
+    :meth:`reset`. Pass :meth:`reset` as the specification of a Model
+    (or call it within the specification) to gather results once per sample,
+    regardless of the number of metrics.
+
+    All getters return the same values (and units of measure) as the
+    corresponding UnitGroup methods. If no group name is given, results
+    correspond to all units.
+
+    Examples
+    --------
+    >>> # from biosteam.evaluation import Model, Metric
+    >>> # results = UnitGroupResults(sys.units, groups)
+    >>> # metrics = [Metric(i.name, results.getter('get_heating_duty', i.name), 'GJ/hr')
+    >>> #            for i in groups]
+    >>> # model = Model(sys, metrics, specification=results.reset)
+
+    """
+    __slots__ = ('units', # tuple[Unit] All units in matrix.
+                 'groups', # dict[str, UnitGroup] Unit groups by name.
+                 'matrix', # [2d array] Unit by quantity results.
+                 'totals', # dict[str, 1d array] Quantity results by group name.
+                 '_masks', # [2d array] Group by unit mask.
+                 '_stale') # [bool] Whether results must be gathered again.
+
+    def __init__(self, units, groups=()):
+        groups = {i.name: i for i in groups}
+        units = list(units)
+        isunit = set(units)
+        for group in groups.values():
+            for i in group.units:
+                if i in isunit: continue
+                units.append(i)
+                isunit.add(i)
+        index = {j: i for i, j in enumerate(units)}
+        masks = np.zeros([len(groups), len(units)])
+        for mask, group in zip(masks, groups.values()):
+            mask[[index[i] for i in group.units]] = 1.
+        self.units = tuple(units)
+        self.groups = groups
+        self.matrix = np.zeros([len(units), len(quantities)])
+        self.totals = {}
+        self._masks = masks
+        self._stale = True
+
+    def reset(self):
+        """Flag results to be gathered again when next requested."""
+        self._stale = True
+
+    def update(self):
+        """Gather results of all units and compute group totals."""
+        matrix = self.matrix
+        for row, unit in zip(matrix, self.units):
+            heating_duty = cooling_duty = 0.
+            for hu in unit.heat_utilities:
+                if hu.flow > 0.:
+                    duty = hu.duty
+                    if duty > 0.: heating_duty += duty
+                    elif duty < 0.: cooling_duty -= duty
+            power_utility = unit.power_utility
+            consumption = power_utility.consumption
+            production = power_utility.production
+            row[:] = (unit.installed_cost,
+                      heating_duty,
+                      cooling_duty,
+                      consumption - production,
+                      consumption,
+                      production,
+                      unit.utility_cost)
+        totals = self._masks @ matrix
+        self.totals = dct = dict(zip(self.groups, totals))
+        dct[None] = matrix.sum(0)
+        self._stale = False
+
+    def get(self, quantity, group=None):
+        """
+        Return the sum of a quantity over a unit group (or all units if no
+        group is given) in the units of measure of the matrix.
+
+        Parameters
+        ----------
+        quantity : str or int
+            Name or column index of quantity.
+        group : str or UnitGroup, optional
+            Name of unit group.
+
+        """
+        if self._stale: self.update()
+        if isinstance(quantity, str): quantity = quantities.index(quantity)
+        if group is not None and not isinstance(group, str): group = group.name
+        return self.totals[group][quantity]
+
+    def get_installed_cost(self, group=None):
+        """Return the total installed equipment cost in million USD."""
+        return self.get(INSTALLED_COST, group) / 1e6
+
+    def get_heating_duty(self, group=None):
+        """Return the total heating duty in GJ/hr."""
+        return self.get(HEATING_DUTY, group) / 1e6
+
+    def get_cooling_duty(self, group=None):
+        """Return the total cooling duty in GJ/hr."""
+        return self.get(COOLING_DUTY, group) / 1e6
+
+    def get_power(self, group=None):
+        """Return the net power requirement in kW."""
+        return self.get(POWER, group)
+
+    def get_electricity_consumption(self, group=None):
+        """Return the total electricity consumption in MW."""
+        return self.get(ELECTRICITY_CONSUMPTION, group) / 1e3
+
+    def get_electricity_production(self, group=None):
+        """Return the total electricity production in MW."""
+        return self.get(ELECTRICITY_PRODUCTION, group) / 1e3
+
+    def get_utility_cost(self, group=None):
+        """Return the total utility cost in USD/hr."""
+        return self.get(UTILITY_COST, group)
+
+    def getter(self, name, group=None):
+        """
+        Return a function that takes no arguments and returns the result
+        of the given getter method for the unit group.
+
+        Examples
+        --------
+        >>> # get_cooling_duty = results.getter('get_cooling_duty', 'Area 300')
+
+        """
+        f = getattr(self, name)
+        return lambda: f(group)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self.units)} units, {len(self.groups)} groups>"
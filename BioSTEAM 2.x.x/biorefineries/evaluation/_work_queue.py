@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import os
+import json
+import time
+import socket
+import sqlite3
+import numpy as np
+from ._fault_isolation import SampleEvaluator, failure_index
+
+__all__ = ('WorkChunk', 'WorkQueue', 'run_worker')
+
+_schema = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    rows BLOB NOT NULL,
+    samples BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    results BLOB,
+    failures TEXT
+);
+"""
+
+
+class WorkChunk:
+    """
+    Create a WorkChunk object that holds samples claimed from a WorkQueue
+    object.
+
+    Parameters
+    ----------
+    ID : int
+        Chunk number.
+    rows : 1d array
+        Indices of samples in the enqueued sample matrix.
+    samples : 2d array
+        Parameter values by sample (rows) and parameter (columns).
+
+    """
+    __slots__ = ('ID', 'rows', 'samples')
+
+    def __init__(self, ID, rows, samples):
+        self.ID = ID
+        self.rows = rows
+        self.samples = samples
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.ID}, {len(self.rows)} samples>"
+
+
+class WorkQueue:
+    """
+    Create a WorkQueue object that distributes chunks of model samples to
+    independent worker processes (on any node with access to the file)
+    through an SQLite database. Workers claim chunks with a lease,
+    renew it while evaluating, and write results in a single transaction;
+    chunks with expired leases are claimed again by other workers, up to
+    a maximum number of attempts.
+
+    Parameters
+    ----------
+    file : str
+        Path of the SQLite database (e.g. on a shared filesystem).
+    lease=600. : float, optional
+        Time that a claimed chunk is reserved for a worker without renewal [s].
+    timeout=60. : float, optional
+        Maximum time to wait for the database lock [s].
+    max_attempts=3 : int, optional
+        Maximum number of times a chunk is claimed. Chunks with an expired
+        lease after the last attempt (e.g. that crash or hang workers)
+        fail, with NaN values and the failure reason of each sample.
+
+    Notes
+    -----
+    The database uses rollback journaling (not write-ahead logging), which
+    relies on the file locking of the filesystem; the shared filesystem
+    must support POSIX locks (e.g. NFS with a lock manager).
+
+    Examples
+    --------
+    Orchestrating script:
+
+    >>> # queue = WorkQueue('cornstover.db')
+    >>> # model.load_samples(model.sample(5000, 'L'))
+    >>> # queue.enqueue(model, chunksize=20)
+    >>> # queue.collect(model, wait=True)
+    >>> # model.table.to_excel('Monte Carlo.xlsx')
+
+    Worker script (run any number of times on any node):
+
+    >>> # run_worker(model, 'cornstover.db')
+
+    """
+    __slots__ = ('file', 'lease', 'timeout', 'max_attempts')
+
+    def __init__(self, file, lease=600., timeout=60., max_attempts=3):
+        self.file = file
+        self.lease = lease
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+
+    def _connect(self):
+        connection = sqlite3.connect(self.file, timeout=self.timeout,
+                                     isolation_level=None)
+        connection.executescript(_schema)
+        return connection
+
+    def _transaction(self, connection, sql, parameters=()):
+        # Lock the database before reading so that claims are exclusive;
+        # return the result of a function or the number of rows changed
+        cursor = connection.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            result = sql(cursor) if callable(sql) else cursor.execute(sql, parameters).rowcount
+        except:
+            cursor.execute('ROLLBACK')
+            raise
+        cursor.execute('COMMIT')
+        return result
+
+    def _query(self, sql, parameters=()):
+        connection = self._connect()
+        try: return connection.execute(sql, parameters).fetchall()
+        finally: connection.close()
+
+    def _fail_abandoned(self, cursor):
+        # Chunks with an expired lease after the last attempt are not claimed again
+        max_attempts = self.max_attempts
+        abandoned = cursor.execute(
+            "SELECT id, rows FROM chunks WHERE status = 'leased' AND expires < ? "
+            "AND attempts >= ?", (time.time(), max_attempts)
+        ).fetchall()
+        failure = f'AbandonedChunk: lease expired after {max_attempts} attempts'
+        cursor.executemany(
+            "UPDATE chunks SET status = 'failed', failures = ? WHERE id = ?",
+            [(json.dumps(len(np.frombuffer(rows, dtype=np.int64)) * [failure]), ID)
+             for ID, rows in abandoned]
+        )
+        return len(abandoned)
+
+    def fail_abandoned(self):
+        """Mark chunks with an expired lease after the last attempt as
+        failed and return the number of chunks marked."""
+        connection = self._connect()
+        try: return self._transaction(connection, self._fail_abandoned)
+        finally: connection.close()
+
+    def get_meta(self):
+        """Return a dictionary of the number of samples, parameters, and metrics."""
+        return {i: json.loads(j) for i, j in self._query('SELECT key, value FROM meta')}
+
+    def enqueue(self, model, chunksize=10):
+        """
+        Replace all chunks in the queue with the samples loaded to the model
+        (in the model's evaluation order) and return the number of chunks.
+
+        """
+        samples = model._samples
+        if samples is None: raise RuntimeError('must load samples before enqueuing')
+        samples = np.asarray(samples, dtype=float)
+        index = np.asarray(model._index, dtype=np.int64)
+        meta = {'N_samples': len(samples),
+                'N_parameters': samples.shape[1],
+                'N_metrics': len(model.metrics)}
+        chunks = [index[i:i+chunksize] for i in range(0, len(index), chunksize)]
+        def enqueue(cursor):
+            cursor.execute('DELETE FROM chunks')
+            cursor.execute('DELETE FROM meta')
+            cursor.executemany('INSERT INTO meta VALUES (?, ?)',
+                               [(i, json.dumps(j)) for i, j in meta.items()])
+            cursor.executemany('INSERT INTO chunks (id, rows, samples) VALUES (?, ?, ?)',
+                               [(ID, rows.tobytes(), samples[rows].tobytes())
+                                for ID, rows in enumerate(chunks)])
+        connection = self._connect()
+        try: self._transaction(connection, enqueue)
+        finally: connection.close()
+        return len(chunks)
+
+    def claim(self, worker):
+        """Return a WorkChunk object leased to the worker (or None if no
+        chunks are queued or expired)."""
+        def claim(cursor):
+            self._fail_abandoned(cursor)
+            now = time.time()
+            row = cursor.execute(
+                "SELECT id, rows, samples FROM chunks WHERE status = 'queued' "
+                "OR (status = 'leased' AND expires < ? AND attempts < ?) "
+                "ORDER BY id LIMIT 1", (now, self.max_attempts)
+            ).fetchone()
+            if row is None: return None
+            ID, rows, samples = row
+            cursor.execute("UPDATE chunks SET status = 'leased', worker = ?, "
+                           "expires = ?, attempts = attempts + 1 WHERE id = ?",
+                           (worker, now + self.lease, ID))
+            rows = np.frombuffer(rows, dtype=np.int64)
+            samples = np.frombuffer(samples, dtype=float).reshape([len(rows), -1])
+            return WorkChunk(ID, rows, samples.copy())
+        connection = self._connect()
+        try: return self._transaction(connection, claim)
+        finally: connection.close()
+
+    def renew(self, chunk, worker):
+        """Extend the lease of the chunk and return whether the worker still holds it."""
+        connection = self._connect()
+        try:
+            return 1 == self._transaction(
+                connection,
+                "UPDATE chunks SET expires = ? WHERE id = ? AND worker = ? "
+                "AND status = 'leased'", (time.time() + self.lease, chunk.ID, worker)
+            )
+        finally: connection.close()
+
+    def complete(self, chunk, values, failures=None):
+        """Save metric values (and failure reasons) of the chunk, unless it
+        was already completed by another worker (results of failed chunks
+        are replaced). Return whether results were saved."""
+        values = np.asarray(values, dtype=float)
+        failures = json.dumps(list(failures)) if failures else None
+        connection = self._connect()
+        try:
+            return 1 == self._transaction(
+                connection,
+                "UPDATE chunks SET status = 'done', results = ?, failures = ? "
+                "WHERE id = ? AND status != 'done'", (values.tobytes(), failures, chunk.ID)
+            )
+        finally: connection.close()
+
+    def progress(self):
+        """Return a dictionary of the number of chunks by status."""
+        return dict(self._query('SELECT status, COUNT(*) FROM chunks GROUP BY status'))
+
+    def collect(self, model, wait=False, poll=30., notify=False):
+        """
+        Load metric values (NaN for chunks not completed or failed) and
+        failure reasons to `model.table` and return the number of samples
+        completed. The model must have the same samples loaded as when
+        enqueued.
+
+        Parameters
+        ----------
+        model : Model
+            Model with loaded samples.
+        wait=False : bool, optional
+            If True, wait until all chunks are completed or failed.
+        poll=30. : float, optional
+            Time between checks while waiting [s].
+        notify=False : bool, optional
+            If True, notify progress while waiting.
+
+        """
+        while wait:
+            self.fail_abandoned()
+            progress = self.progress()
+            remaining = _count_remaining(progress)
+            if not remaining: break
+            if notify: print(f"{progress.get('done', 0)} chunks completed, "
+                             f"{progress.get('failed', 0)} failed, {remaining} remaining")
+            time.sleep(poll)
+        meta = self.get_meta()
+        N = meta['N_samples']
+        if model._samples is None or len(model._samples) != N:
+            raise RuntimeError('model samples do not match enqueued samples')
+        values = np.full([N, meta['N_metrics']], np.nan)
+        failures = N * ['']
+        any_failures = False
+        for rows, results, failures_json in self._query(
+                "SELECT rows, results, failures FROM chunks "
+                "WHERE status IN ('done', 'failed')"):
+            rows = np.frombuffer(rows, dtype=np.int64)
+            if results is not None:
+                values[rows] = np.frombuffer(results, dtype=float).reshape([len(rows), -1])
+            if failures_json:
+                any_failures = True
+                for i, failure in zip(rows, json.loads(failures_json)): failures[i] = failure
+        table = model.table
+        table[model._metric_indices] = values
+        if any_failures: table[failure_index] = failures
+        return int((~np.isnan(values).all(1)).sum())
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.file}>"
+
+
+def _count_remaining(progress):
+    return sum([j for i, j in progress.items() if i not in ('done', 'failed')])
+
+def run_worker(model, file, worker=None, lease=600., poll=30., timeout=None,
+               maxiter=None, notify=False, max_attempts=3):
+    """
+    Evaluate chunks of samples claimed from a work queue until all chunks
+    are completed (or failed), and return the number of chunks completed
+    by the worker.
+
+    Parameters
+    ----------
+    model : Model
+        Model with the same parameters and metrics as the enqueued model.
+    file : str
+        Path of the SQLite database of the work queue.
+    worker=None : str, optional
+        Worker name. Defaults to '<host name>:<process ID>'.
+    lease=600. : float, optional
+        Time that a claimed chunk is reserved without renewal [s]. The
+        lease is renewed after each sample.
+    poll=30. : float, optional
+        Time between checks for expired leases when no chunks are queued [s].
+    timeout=None : float, optional
+        Maximum wall-clock time of each evaluation [s] (see :class:`SampleEvaluator`).
+    maxiter=None : int, optional
+        Maximum number of iterations of each recycle loop.
+    notify=False : bool, optional
+        If True, notify each chunk completed.
+    max_attempts=3 : int, optional
+        Maximum number of times a chunk is claimed (see :class:`WorkQueue`).
+
+    """
+    from biosteam import speed_up
+    speed_up()
+    worker = worker or f'{socket.gethostname()}:{os.getpid()}'
+    queue = WorkQueue(file, lease, max_attempts=max_attempts)
+    meta = queue.get_meta()
+    if (meta['N_parameters'] != len(model.get_parameters())
+        or meta['N_metrics'] != len(model.metrics)):
+        raise RuntimeError('model parameters and metrics do not match enqueued model')
+    evaluator = None
+    N_chunks = 0
+    while True:
+        chunk = queue.claim(worker)
+        if chunk is None:
+            if not _count_remaining(queue.progress()): break
+            time.sleep(poll)
+            continue
+        samples = chunk.samples
+        # Loading sorts the chunk so that each simulation starts close to
+        # the last converged state
+        model.load_samples(samples)
+        values = np.zeros([len(samples), len(model.metrics)])
+        failures = len(samples) * ['']
+        if timeout or maxiter:
+            if not evaluator: evaluator = SampleEvaluator(model, timeout, maxiter)
+        N = len(samples)
+        lost = False
+        for n, i in enumerate(model._index, 1):
+            if evaluator:
+                values[i] = evaluator(samples[i])
+                failures[i] = evaluator.failure
+            else:
+                values[i] = model._evaluate_sample_thorough(samples[i])
+            # The chunk is abandoned if another worker claimed it
+            if n < N and not queue.renew(chunk, worker):
+                lost = True
+                break
+        if lost: continue
+        # Results are saved even if the lease expired (unless already completed)
+        if queue.complete(chunk, values, failures if any(failures) else None):
+            N_chunks += 1
+            if notify: print(f"[{worker}] chunk {chunk.ID} completed")
+    return N_chunks
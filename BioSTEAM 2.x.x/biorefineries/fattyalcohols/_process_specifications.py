@@ -8,6 +8,7 @@
 
 import biosteam as bst
 import thermosteam as tmo
+from biorefineries.evaluation import scale_system, evaluate_across_TRY
 from . import units
 
 __all__ = ('FattyalcoholProcessSpecifications',)
@@ -36,6 +37,9 @@ class FattyalcoholProcessSpecifications:
                  'yield_',
                  'reaction_name',
                  'unit',
+                 'reactor',
+                 'system',
+                 'tea',
     )
     
     products = fermentation_products
@@ -53,7 +57,9 @@ class FattyalcoholProcessSpecifications:
         self.productivity = productivity
         self.yield_ = yield_
         self.reaction_name = 'fermentation_reaction'
-        self.unit = tmo.utils.get_instance(system.units, units.FattyAlcoholBioreactor)
+        self.unit = self.reactor = tmo.utils.get_instance(system.units, units.FattyAlcoholBioreactor)
+        self.system = system
+        self.tea = tea
         
     def load_specifications(self, plant_size=None, operating_days=None,
                             titer=None, productivity=None, yield_=None):
@@ -71,6 +77,38 @@ class FattyalcoholProcessSpecifications:
         feed.F_mass = F_mass_substrates / z_mass_substrates
         self.plant_size = plant_size
     
+    def scale_plant_size(self, plant_size, check=False):
+        """
+        Load plant size specification and scale the converged system to the
+        new capacity without simulating the system. All other specifications
+        should be the same as the last simulation.
+        
+        """
+        feed = self.feed
+        F_mass = feed.F_mass
+        self.load_plant_size(plant_size)
+        ratio = feed.F_mass / F_mass
+        feed.F_mass = F_mass
+        return scale_system(self.system, ratio, check)
+    
+    def evaluate_across_TRY(self, titer, yield_, metrics, productivities,
+                            processes=None):
+        """
+        Evaluate metrics at given titer and yield across a set of 
+        productivities in parallel and return an array with the all metric
+        results [shape x M x P] (see
+        :func:`~biorefineries.evaluation.evaluate_across_TRY`).
+        
+        """
+        def load_titer_and_yield(titer, yield_):
+            self.load_yield(yield_)
+            self.load_titer(titer)
+            self.load_plant_size(self.plant_size)
+        return evaluate_across_TRY(self.system, self.unit, 
+                                   load_titer_and_yield, self.load_productivity,
+                                   titer, yield_, metrics, productivities,
+                                   processes)
+    
     def load_operating_days(self, operating_days):
         self.operating_days = self.tea.operating_days = operating_days
     
@@ -81,7 +119,6 @@ class FattyalcoholProcessSpecifications:
     _titer_objective_function = ReactorSpecification._titer_objective_function
     evaluate_across_productivity = ReactorSpecification.evaluate_across_productivity
     evaluate_across_productivity = ReactorSpecification.evaluate_across_productivity
-    evaluate_across_TRY = ReactorSpecification.evaluate_across_TRY
     feed = ReactorSpecification.feed
     vent = ReactorSpecification.vent
     effluent = ReactorSpecification.effluent
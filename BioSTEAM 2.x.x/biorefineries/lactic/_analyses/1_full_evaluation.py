@@ -38,6 +38,7 @@ lactic acid from lignocellulosic feedstocks
 import numpy as np
 import pandas as pd
 from biosteam.utils import TicToc
+from biorefineries.evaluation import evaluate_sequentially
 from lactic import models
 
 percentiles = [0, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 1]
@@ -58,33 +59,33 @@ model = models.model_full
 '''Quick look at baseline values'''
 # Set seed to make sure each time the same set of random numbers will be used
 np.random.seed(3221)
-N_simulation = 100 # 1000
-samples = model.sample(N=N_simulation, rule='L')
+N_simulation = 100 # 1000, maximum as evaluation stops once results converge
 
-# samples = samples[77:79,]
-
-
-model.load_samples(samples)
 baseline = model.metrics_at_baseline()
 baseline_df = pd.DataFrame(data=np.array([[i for i in baseline.values],]), 
                             index=('baseline',), columns=baseline.keys())
 # baseline_df.to_excel('baseline.xlsx')
 
 '''Full evaluation'''
-model.evaluate()
+# Note that if only one metric is used, then need to make sure it's a tuple
+spearman_metrics = model.metrics[0:4]
+# Convergence is checked every 20 samples (after the first 40); samples that
+# take over 10 min are stopped and recorded as failures
+N_simulation = evaluate_sequentially(model, N_simulation, batch_size=20,
+                                     rule='L', percentiles=percentiles[1:-1],
+                                     spearman_metrics=spearman_metrics,
+                                     N_min=40, timeout=600)
 # Parameters and probabilities
 parameter_len = len(model.get_baseline_sample())
 parameters = model.table.iloc[:, :parameter_len].copy()
 # Add baseline values to the end
 parameters.loc['baseline'] = model.get_baseline_sample()
 
-Monte_Carlo_results = model.table.iloc[:, parameter_len::].copy()
+Monte_Carlo_results = model.table[[i.index for i in model.metrics]].copy()
 Monte_Carlo_percentiles = Monte_Carlo_results.quantile(q=percentiles)
 # Add baseline values to the end
 Monte_Carlo_results.loc['baseline'] = model.metrics_at_baseline()
 
-# Note that if only one metric is used, then need to make sure it's a tuple
-spearman_metrics = model.metrics[0:4]
 spearman_results = model.spearman(spearman_metrics)
 
 # Calculate the probabilities of each parameter and the overall scenario
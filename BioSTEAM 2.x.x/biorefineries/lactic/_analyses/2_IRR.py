@@ -39,6 +39,7 @@ import numpy as np
 import pandas as pd
 from biosteam.utils import TicToc
 from biosteam.plots import plot_montecarlo_across_coordinate
+from biorefineries.evaluation import evaluate_with_fault_isolation
 from lactic import models
 
 percentiles = [0, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 1]
@@ -69,10 +70,10 @@ N_simulation = 100 # 1000
 samples = model.sample(N=N_simulation, rule='L')
 
 model.load_samples(samples)
-model.evaluate()
+# Samples that take over 10 min are stopped and recorded as failures
+failures = evaluate_with_fault_isolation(model, timeout=600, notify=True)
 
-parameter_len = len(model.get_baseline_sample())
-results = model.table.iloc[:, parameter_len::].copy()
+results = model.table[[i.index for i in model.metrics]].copy()
 percentiles = results.quantile(q=percentiles)
 
 '''To get a quick plot'''
@@ -38,6 +38,7 @@ lactic acid from lignocellulosic feedstocks
 import numpy as np
 import pandas as pd
 from biosteam.utils import TicToc
+from biorefineries.evaluation import evaluate_across_coordinate
 from lactic import models
 
 
@@ -70,14 +71,17 @@ coordinate = np.linspace(0.4, 0.7, 31) # step = 0.01, ascending
 
 # coordinate = np.array([0.4, 0.5, 0.589])
 
-data = model.evaluate_across_coordinate(
-    'Feedstock carbohydate content', set_carbs, coordinate, notify=True)
+# With a single sample, split the coordinate among jobs (each job sweeps
+# a chunk of the coordinate starting from neighbouring converged states)
+results = evaluate_across_coordinate(
+    model, 'Feedstock carbohydate content', set_carbs, coordinate,
+    coordinate_chunksize=8, notify=True)
 
 MPSPs_NPVs = pd.DataFrame({
     ('Parameter','Carbohydrate content [dry mass %]'): coordinate})
 
-for (i, j) in zip(data.keys(), data.values()):
-    MPSPs_NPVs[i] = j[0]
+for i, metric in enumerate(results.metrics):
+    MPSPs_NPVs[metric] = results.data[:, 0, i]
 
 '''Organize data for easy plotting'''
 x_axis = [f'{i:.3f}' for i in coordinate]
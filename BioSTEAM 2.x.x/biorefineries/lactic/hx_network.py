@@ -232,11 +232,9 @@ def get_T_transient(pinch_T_arr, indices, T_in_arr):
     T_transient[indices] = T_in_arr[indices]
     return T_transient
 
-def synthesize_network(hus, T_min_app=10, find=None):
+def synthesize_network(hus, T_min_app=10, find=None, ID_original='lactic_sys'):
     
-    # ID_original =  bst.main_flowsheet.ID
-    #!!! This is bad, need to read
-    ID_original = ('lactic_sys')
+    # Heat exchangers of the network are registered in a separate flowsheet
     bst.main_flowsheet.set_flowsheet('%s-HXN'%ID_original)
     
     pinch_T_arr, hot_util_load, cold_util_load, T_in_arr, T_out_arr, T_hot_side_arr, T_cold_side_arr, \
@@ -680,11 +678,14 @@ class HX_Network(Facility):
         
         hx_utils = bst.process_tools.heat_exchanger_utilities_from_units(sys.units)
         hx_utils.sort(key = lambda x: x.duty)
+        main_flowsheet = bst.main_flowsheet.get_flowsheet()
         
         matches_hs, matches_cs, Q_hot_side, Q_cold_side, unavailables, act_hot_util_load,\
         act_cold_util_load, HXs_hot_side, HXs_cold_side, new_HX_utils, hxs, T_in_arr,\
             T_out_arr, pinch_T_arr, C_flow_vector, hx_utils_rearranged, streams, stream_HXs_dict,\
-                hot_indices, cold_indices = synthesize_network(hx_utils, T_min_app = self.T_min_app)
+                hot_indices, cold_indices = synthesize_network(hx_utils, T_min_app = self.T_min_app,
+                                                               ID_original = sys.ID)
+        bst.main_flowsheet.set_flowsheet(main_flowsheet)
         
         original_purchase_costs= [hx.purchase_cost for hx in hxs]
         original_installed_costs = [hx.installed_cost for hx in hxs]
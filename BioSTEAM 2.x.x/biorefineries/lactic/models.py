@@ -40,6 +40,8 @@ import biosteam as bst
 import lactic.system as system
 from chaospy import distributions as shape
 from biosteam.evaluation import Model, Metric
+from biorefineries.evaluation import UnitGroupResults, MetricGraph, \
+    FeedstockComposition
 
 lactic_no_CHP_tea = system.lactic_no_CHP_tea
 get_annual_factor = lambda: lactic_no_CHP_tea._annual_factor
@@ -70,6 +72,26 @@ def get_MPSP():
         lactic_acid.price = lactic_tea.solve_price(lactic_acid)
     return lactic_acid.price
 
+# Intermediate results shared by metrics are computed only once per sample;
+# unit results are gathered in one pass after each simulation and 
+# group results are then computed as masked sums
+process_groups = system.process_groups
+unit_group_results = UnitGroupResults(lactic_sys.units, process_groups)
+graph = MetricGraph(specification=unit_group_results.reset)
+MPSP = graph.intermediate('MPSP', f=get_MPSP)
+
+# Sales (and thus NPV) depend on product price, so TEA results are
+# computed after solving the MPSP
+@graph.intermediate('TEA', [MPSP])
+def TEA_results(MPSP):
+    return {'TCI': lactic_tea.TCI,
+            'AOC': lactic_tea.AOC,
+            'Material cost': lactic_tea.material_cost,
+            'Sales': lactic_tea.sales,
+            'Utility cost': lactic_tea.utility_cost,
+            'Installed equipment cost': lactic_tea.installed_equipment_cost,
+            'NPV': lactic_tea.NPV}
+
 # Mass flow rate of lactic_acid stream
 get_yield = lambda: lactic_acid.F_mass*get_annual_factor()/1e6
 # Purity (%) of LacticAcid in the final product
@@ -78,14 +100,14 @@ get_purity = lambda: lactic_acid.imass['LacticAcid']/lactic_acid.F_mass
 R301 = system.R301
 get_recovery = lambda: lactic_acid.imol['LacticAcid'] \
     /(R301.outs[0].imol['LacticAcid']+2*R301.outs[0].imol['CalciumLactate'])
-get_overall_TCI = lambda: lactic_tea.TCI/1e6
+get_overall_TCI = lambda: TEA_results()['TCI']/1e6
 # Annual operating cost, note that AOC excludes electricity credit
-get_overall_AOC = lambda: lactic_tea.AOC/1e6
-get_material_cost = lambda: lactic_tea.material_cost/1e6
+get_overall_AOC = lambda: TEA_results()['AOC']/1e6
+get_material_cost = lambda: TEA_results()['Material cost']/1e6
 # Annual sale revenue from products, note that electricity credit is not included,
 # but negative sales from waste disposal are included
 # (i.e., wastes are products of negative selling price)
-get_annual_sale = lambda: lactic_tea.sales/1e6
+get_annual_sale = lambda: TEA_results()['Sales']/1e6
 # System power usage, individual unit power usage should be positive
 CHP = system.CHP
 excess_power = lambda: CHP.electricity_generated
@@ -93,7 +115,7 @@ electricity_price = bst.PowerUtility.price
 # Electricity credit is positive if getting revenue from excess electricity
 get_electricity_credit = lambda: (excess_power()*electricity_price*get_annual_factor())/1e6
 
-metrics = [Metric('Minimum product selling price', get_MPSP, '$/kg'),
+metrics = [Metric('Minimum product selling price', MPSP, '$/kg'),
            Metric('Product yield', get_yield, '10^6 kg/yr'),
            Metric('Product purity', get_purity, '%'),
            Metric('Product recovery', get_recovery, '%'),
@@ -108,9 +130,9 @@ metrics = [Metric('Minimum product selling price', get_MPSP, '$/kg'),
 # Capital cost breakdown
 # =============================================================================
 
-process_groups = system.process_groups
 def get_installed_cost(group):
-    return lambda: group.get_installed_cost()
+    getter = unit_group_results.getter('get_installed_cost', group.name)
+    return lambda: lactic_no_CHP_tea.TCI_ratio * getter()
 for group in process_groups:
     if group.name == 'feedstock_group': continue
     metrics.extend(
@@ -119,7 +141,7 @@ for group in process_groups:
 # All checks should be ~0
 check_installed_cost = \
     lambda: sum(get_installed_cost(group)() 
-                for group in process_groups) - lactic_tea.installed_equipment_cost/1e6
+                for group in process_groups) - TEA_results()['Installed equipment cost']/1e6
 metrics.extend((Metric('Check', check_installed_cost, '10^6 $', 'Installed cost'),))
 
 
@@ -138,7 +160,7 @@ get_fermentation_lime_ratio = lambda: lime_R301.imol['Lime'] \
 T602_S = system.T602_S
 get_separation_sulfuric_acid_ratio = lambda: T602_S.outs[1].F_mass/T602_S.F_mass_out
 check_material_cost = lambda: sum(get_material_cost(feed)()
-                                  for feed in system_feeds) - lactic_tea.material_cost/1e6
+                                  for feed in system_feeds) - TEA_results()['Material cost']/1e6
 
 metrics.extend((
     Metric('Fermentation lime ratio', get_fermentation_lime_ratio, 
@@ -153,7 +175,7 @@ for product in system_products:
     metrics.extend((Metric(product.ID, get_product_sale(product), '10^6 $/yr', 'Product sale'),))
 check_product_sale= \
     lambda: sum(get_product_sale(product)() for product in system_products) \
-        - lactic_tea.sales/1e6
+        - TEA_results()['Sales']/1e6
 metrics.extend((Metric('Check', check_product_sale, '10^6 $/yr', 'Product sale'),))
 
 
@@ -170,7 +192,8 @@ get_CHP_heating_demand = lambda: sum(i.duty for i in CHP.heat_utilities
                                     if i.duty*i.cost>0)*get_annual_factor()/1e9
 
 def get_heating_demand(group):
-    return lambda: group.get_heating_duty()*get_annual_factor()/1e3
+    get_heating_duty = unit_group_results.getter('get_heating_duty', group.name)
+    return lambda: get_heating_duty()*get_annual_factor()/1e3
 
 for group in process_groups:
     if group.name in ('feedstock_group', 'HXN_group', 'CHP_group'): continue
@@ -205,7 +228,8 @@ get_CT_cooling_water_duty = lambda: sum(i.duty for i in CT.heat_utilities
                                     if i.duty*i.cost<0)*get_annual_factor()/1e9
 
 def get_cooling_demand(group):
-    return lambda: group.get_heating_duty()*get_annual_factor()/1e3
+    get_heating_duty = unit_group_results.getter('get_heating_duty', group.name)
+    return lambda: get_heating_duty()*get_annual_factor()/1e3
 
 for group in process_groups:
     if group.name in ('feedstock_group', 'HXN_group', 'CT_group'): continue
@@ -226,11 +250,10 @@ metrics.extend((
 # Power demand breakdown (positive if using power)
 # =============================================================================
 
-get_system_power_demand = lambda: sum(i.power_utility.rate for i in lactic_sys.units
-                                      if i.power_utility)
+get_system_power_demand = unit_group_results.getter('get_power')
 
 def get_power_demand(group):
-    return lambda: sum(i.rate for i in group.power_utilities)
+    return unit_group_results.getter('get_power', group.name)
 
 for group in process_groups:
     if group.name == 'feedstock_group': continue
@@ -247,10 +270,11 @@ metrics.extend((
 # Utility cost breakdown (including heating, cooling, and power)
 # =============================================================================
 
-get_system_utility_cost = lambda: lactic_tea.utility_cost/1e6
+get_system_utility_cost = lambda: TEA_results()['Utility cost']/1e6
 
 def get_utility_cost(group):
-    return lambda: sum(i.utility_cost for i in group.units)*get_annual_factor()/1e6
+    get_utility_cost = unit_group_results.getter('get_utility_cost', group.name)
+    return lambda: get_utility_cost()*get_annual_factor()/1e6
 
 for group in process_groups:
     if group.name == 'feedstock_group': continue
@@ -266,7 +290,7 @@ metrics.extend((
     ))
 
 # To see if TEA converges well for each simulation
-get_NPV = lambda: lactic_tea.NPV
+get_NPV = lambda: TEA_results()['NPV']
 metrics.extend((Metric('Net present value', get_NPV, '$', 'TEA'), ))
 
 
@@ -276,7 +300,8 @@ metrics.extend((Metric('Net present value', get_NPV, '$', 'TEA'), ))
 # Construct base model
 # =============================================================================
 
-model_full = Model(lactic_sys, metrics)
+# Cached intermediate results are cleared before simulating each sample
+model_full = Model(lactic_sys, metrics, specification=graph)
 param = model_full.parameter
 
 def baseline_uniform(baseline, ratio):
@@ -348,13 +373,7 @@ D = baseline_uniform(1, 0.25)
 @param(name='TCI ratio', element='TEA', kind='isolated', units='% of baseline',
         baseline=1, distribution=D)
 def set_TCI_ratio(new_ratio):
-    old_ratio = lactic_no_CHP_tea._TCI_ratio_cached
-    for unit in lactic_sys.units:
-        if hasattr(unit, 'cost_items'):
-            for item in unit.cost_items:
-                unit.cost_items[item].cost /= old_ratio
-                unit.cost_items[item].cost *= new_ratio
-    lactic_no_CHP_tea._TCI_ratio_cached = new_ratio
+    for tea in lactic_tea.TEAs: tea.TCI_ratio = new_ratio
 
 
 # =============================================================================
@@ -517,17 +536,23 @@ parameters = model_full.get_parameters()
 # Model to evalute system across internal rate of return
 # =============================================================================
 
+IRR_graph = MetricGraph()
 def create_IRR_metrics(IRR):
-    def get_IRR_based_MPSP():
+    element = f'IRR={IRR:.0%}'
+    # MPSP and NPV are computed together at the IRR regardless of metric order
+    @IRR_graph.intermediate(element)
+    def get_IRR_based_results():
         lactic_tea.IRR = IRR
-        return get_MPSP()
-    return [Metric('Minimum product selling price', get_IRR_based_MPSP, '$/kg', f'IRR={IRR:.0%}'),
-            Metric('Net present value', get_NPV, '$', f'IRR={IRR:.0%}')]
+        return get_MPSP(), lactic_tea.NPV
+    return [IRR_graph.metric('Minimum product selling price', '$/kg', element,
+                             [get_IRR_based_results], lambda results: results[0]),
+            IRR_graph.metric('Net present value', '$', element,
+                             [get_IRR_based_results], lambda results: results[1])]
 
 IRRs = np.linspace(0, 0.4, 41)
 IRR_metrics = sum([create_IRR_metrics(IRR) for IRR in IRRs],[])
 
-model_IRR = Model(lactic_sys, IRR_metrics)
+model_IRR = Model(lactic_sys, IRR_metrics, specification=IRR_graph)
 model_IRR.set_parameters(parameters)
 
 
@@ -537,15 +562,19 @@ model_IRR.set_parameters(parameters)
 # Model to evalute system across feedstock price and carbohydate content
 # =============================================================================
 
+price_graph = MetricGraph()
 def create_price_metris(price):
-    def get_price_based_MPSP():
+    element = f'Price={price:.0f} [$/dry-ton]'
+    # MPSP and NPV are computed together at the price regardless of metric order
+    @price_graph.intermediate(element)
+    def get_price_based_results():
         price_per_kg = price / _kg_per_ton * 0.8
         feedstock.price = price_per_kg
-        return get_MPSP()
-    return [Metric('Minimum product selling price', get_price_based_MPSP,
-                   '$/kg', f'Price={price:.0f} [$/dry-ton]'),
-            Metric('Net present value', get_NPV,
-                   '$', f'Price={price:.0f} [$/dry-ton]')]
+        return get_MPSP(), lactic_tea.NPV
+    return [price_graph.metric('Minimum product selling price', '$/kg', element,
+                               [get_price_based_results], lambda results: results[0]),
+            price_graph.metric('Net present value', '$', element,
+                               [get_price_based_results], lambda results: results[1])]
 
 prices = np.linspace(50, 300, 26)
 # 71.3 is the baseline
@@ -553,19 +582,25 @@ prices = np.concatenate((prices, np.array([71.3])))
 
 price_metrics = sum([create_price_metris(price) for price in prices],[])
 
+# Feedstock compositions are computed on a dry basis using Extractives
+# to close the mass balance, use feedstock_composition.flows to get 
+# feedstock flows of many compositions at once
+feedstock_composition = FeedstockComposition(
+    system.feedstock,
+    {'Carbohydrates': ('Glucan', 'Xylan', 'Arabinan', 'Galactan', 'Mannan'),
+     'SuccinicAcid': ('SuccinicAcid',),
+     'Extractives': ('Extractives',)},
+    balance='Extractives'
+)
+
 def set_carbs(carbs_content):
-    carbs = ('Glucan', 'Xylan', 'Arabinan', 'Galactan', 'Mannan')
-    dry_mass = feedstock.F_mass.copy() - feedstock.imass[('H2O',)].copy()
-    old_carbs_mass_total = feedstock.imass[carbs].sum().copy()
-    ratio = feedstock.get_normalized_mass(carbs)
-    new_carbs_mass = dry_mass * carbs_content * ratio
-    feedstock.set_flow(new_carbs_mass, 'kg/hr', carbs)
-    mass_diff = new_carbs_mass.sum() - old_carbs_mass_total
-    feedstock.imass['Extractives'] -= mass_diff
-    if any(feedstock.mass < 0):
+    (mass,), (feasible,) = feedstock_composition.flows(
+        {'Carbohydrates': carbs_content}, feedstock)
+    if not feasible:
         raise ValueError(f'Carbohydrate content of {carbs_content*100:.0f}% dry weight is infeasible')
+    feedstock.mass = mass
 
-model_feedstock = Model(lactic_sys, price_metrics)
+model_feedstock = Model(lactic_sys, price_metrics, specification=price_graph)
 
 param = model_feedstock.parameter
 
@@ -586,14 +621,13 @@ def set_fake_parameter(anything):
 # =============================================================================
 
 def set_succinic(content):
-    dry_mass = feedstock.F_mass - feedstock.imass['H2O']
-    feedstock.imass['SuccinicAcid'] = content * dry_mass
-    # Use Extractives to close mass balance
-    feedstock.imass['Extractives'] -= (feedstock.F_mass-feedstock.imass['H2O']) - dry_mass
-    if any(feedstock.mass<0):
+    (mass,), (feasible,) = feedstock_composition.flows(
+        {'SuccinicAcid': content}, feedstock)
+    if not feasible:
         raise ValueError(f'Succinic acid content of {content*100:.0f}% dry weight is infeasible')
+    feedstock.mass = mass
 
-model_succinic = Model(lactic_sys, metrics)
+model_succinic = Model(lactic_sys, metrics, specification=graph)
 model_succinic.set_parameters(parameters)
 
 
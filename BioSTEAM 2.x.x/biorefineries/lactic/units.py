@@ -60,7 +60,7 @@ from biosteam.units.design_tools import separations
 from lactic.process_settings import price
 from lactic.chemicals import COD_chemicals, solubles, insolubles
 from lactic.utils import CEPCI, baseline_feedflow, compute_lactic_titer, \
-    compute_extra_chemical, adjust_recycle, compute_COD
+    compute_extra_chemical, copy_stream, adjust_recycle, compute_COD
 
 _kg_per_ton = 907.18474
 _MGD_2_m3hr = (3.78541*1e6/24) / 1e3
@@ -885,6 +885,9 @@ class Esterification(Reactor):
     reactives = ('LacticAcid', 'Ethanol', 'H2O', 'EthylLactate',
                  'AceticAcid', 'EthylAcetate', 'SuccinicAcid', 'EthylSuccinate')
     
+    _acids = ('LacticAcid', 'AceticAcid', 'SuccinicAcid')
+    _acid_ratios = np.array([1, 1, 2])
+    
     def __init__(self, ID='', ins=None, outs=(), thermo=None, *, 
                  T=351.15, P=101325, tau=None, tau_max=15, 
                  V_wf=0.8, length_to_diameter=2, kW_per_m3=0.985,
@@ -908,6 +911,21 @@ class Esterification(Reactor):
         self.vessel_material = vessel_material
         self.vessel_type = vessel_type
         self.heat_exchanger = HXutility(None, None, None, T=T)
+        
+        # Conversions are updated in _run
+        self.esterification_rxns = ParallelRxn([
+            #   Reaction definition                                     Reactant  Conversion
+            Rxn('LacticAcid + Ethanol -> EthylLactate + H2O',         'LacticAcid',   1),
+            Rxn('AceticAcid + Ethanol -> EthylAcetate + H2O',         'AceticAcid',   1),
+            # Assume succinic acid has the same conversion as acetic acid
+            Rxn('SuccinicAcid + 2 Ethanol -> EthylSuccinate + 2 H2O', 'SuccinicAcid', 1)
+            ])
+        
+        # Streams used in _run to avoid creating new ones in each simulation
+        self._feeds = tmo.Stream(None)
+        self._feeds2 = tmo.Stream(None)
+        self._recycled = tmo.Stream(None)
+        self._discarded = tmo.Stream(None)
 
     def compute_coefficients(self, T):
         K = self.K = exp(2.9625 - 515.13/T)
@@ -987,35 +1005,40 @@ class Esterification(Reactor):
         feed, ethanol1, recycled_LA, supplement_ethanol, ethanol2 = self.ins 
         effluent, wastewater = self.outs
         
-        acids = ('LacticAcid', 'AceticAcid', 'SuccinicAcid')
+        acids = self._acids
         # Succnic acid is a dicarboxylic acid, needs twice as much ethanol
-        ratios = self.ethanol2acids * np.array([1, 1, 2])
+        ratios = self.ethanol2acids * self._acid_ratios
+        recycled = self._recycled
+        discarded = self._discarded
         
-        feeds = feed.copy()
+        feeds = copy_stream(feed, self._feeds)
         feeds.mix_from([feed, recycled_LA])
         
         # Have enough ethanol in feed and recycle2, discharge some recycle2
         # and all of recycle1
         if compute_extra_chemical(feeds, ethanol2, acids, 'Ethanol', ratios) > 0:
             effluent, ethanol2_discarded = \
-                adjust_recycle(feeds, ethanol2, acids, 'Ethanol', ratios)
+                adjust_recycle(feeds, ethanol2, acids, 'Ethanol', ratios,
+                               effluent, discarded, recycled)
             wastewater.mix_from([ethanol1, ethanol2_discarded])
             supplement_ethanol.empty()
         
         else:
             # Recycle all of ethanol2 and combine feed and recycle2 as feed2
-            feeds2 = feeds.copy()
+            feeds2 = copy_stream(feeds, self._feeds2)
             feeds2.mix_from([feeds, ethanol2])
             # Have enough ethanol in feed2 and ethanol1
-            if compute_extra_chemical(feeds2, ethanol1, acids, 'Ethanol', ratios) > 0:
+            extra_ethanol = compute_extra_chemical(feeds2, ethanol1, acids,
+                                                   'Ethanol', ratios)
+            if extra_ethanol > 0:
                 effluent, ethanol1_discarded = \
-                    adjust_recycle(feeds2, ethanol1, acids, 'Ethanol', ratios)
-                wastewater = ethanol1_discarded
+                    adjust_recycle(feeds2, ethanol1, acids, 'Ethanol', ratios,
+                                   effluent, discarded, recycled)
+                wastewater.copy_like(ethanol1_discarded)
                 supplement_ethanol.empty()
             # Not have enough ethanol in both recycles, need supplementary ethanol
             else:
-                supplement_ethanol.imol['Ethanol'] = \
-                    - compute_extra_chemical(feeds2, ethanol1, acids, 'Ethanol', ratios)
+                supplement_ethanol.imol['Ethanol'] = - extra_ethanol
                 effluent.mix_from(self.ins)
                 wastewater.empty()
 
@@ -1036,22 +1059,15 @@ class Esterification(Reactor):
         else:
             if not self.X2:
                 raise AttributeError('X2 must be defined if assumeX2equalsX1 is False')
+            X2 = self.X2
         
         X1 *= self.X_factor
         X2 *= self.X_factor
 
-        self.esterification_rxns = ParallelRxn([
-            #   Reaction definition                                     Reactant  Conversion
-            Rxn('LacticAcid + Ethanol -> EthylLactate + H2O',         'LacticAcid',   X1),
-            Rxn('AceticAcid + Ethanol -> EthylAcetate + H2O',         'AceticAcid',   X2),
-            # Assume succinic acid has the same conversion as acetic acid
-            Rxn('SuccinicAcid + 2 Ethanol -> EthylSuccinate + 2 H2O', 'SuccinicAcid', X2)
-            ])
-
-        self.esterification_rxns(effluent.mol)
+        rxns = self.esterification_rxns
+        rxns.X[:] = (X1, X2, X2)
+        rxns(effluent.mol)
         effluent.T = self.T
-        self.outs[0].copy_like(effluent)
-        self.outs[1].copy_like(wastewater)
         
     def _cost(self):
         super()._cost()
@@ -1099,6 +1115,16 @@ class HydrolysisReactor(Reactor):
             Rxn('EthylSuccinate + 2 H2O -> SuccinicAcid + 2 Ethanol', 'EthylSuccinate', 0.8),
                 ])
     
+    _esters = ('EthylLactate', 'EthylAcetate', 'EthylSuccinate')
+    _ester_ratios = np.array([1, 1, 2])
+    
+    def __init__(self, ID='', ins=None, outs=(), **kwargs):
+        Reactor.__init__(self, ID, ins, outs, **kwargs)
+        # Streams used in _run to avoid creating new ones in each simulation
+        self._feed2 = tmo.Stream(None)
+        self._recycled = tmo.Stream(None)
+        self._discarded = tmo.Stream(None)
+    
     def _run(self):
         # On weight basis, recycle2 is near 10% EtLA so will always be recycled,
         # but recycle1 is >97% water with <1% LA, so will only be used to supply
@@ -1106,37 +1132,40 @@ class HydrolysisReactor(Reactor):
         feed, water, recycle1, recycle2 = self.ins
         effluent, wastewater = self.outs
         
-        esters = ('EthylLactate', 'EthylAcetate', 'EthylSuccinate')
+        esters = self._esters
         # Succnic acid is a dicarboxylic acid, needs twice as much water
-        ratios = self.water2esters * np.array([1, 1, 2])
+        ratios = self.water2esters * self._ester_ratios
+        recycled = self._recycled
+        discarded = self._discarded
         # Have enough water in feed and recycle2, discharge some recycle2
         # and all of recycle1
         if compute_extra_chemical(feed, recycle2, esters, 'H2O', ratios) > 0:
             effluent, recycle2_discarded = \
-                adjust_recycle(feed, recycle2, esters, 'H2O', ratios)
+                adjust_recycle(feed, recycle2, esters, 'H2O', ratios,
+                               effluent, discarded, recycled)
             wastewater.mix_from([recycle1, recycle2_discarded])
             water.empty()        
         else:
             # Recycle all of recycle2 and combine feed and recycle2 as feed2
-            feed2 = feed.copy()
+            feed2 = copy_stream(feed, self._feed2)
             feed2.mix_from([feed, recycle2])
             # Have enough water in feed2 and recycle1
-            if compute_extra_chemical(feed2, recycle1, esters, 'H2O', ratios) > 0:
+            extra_water = compute_extra_chemical(feed2, recycle1, esters,
+                                                 'H2O', ratios)
+            if extra_water > 0:
                 effluent, recycle1_discarded = \
-                    adjust_recycle(feed2, recycle1, esters, 'H2O', ratios)
-                wastewater = recycle1_discarded
+                    adjust_recycle(feed2, recycle1, esters, 'H2O', ratios,
+                                   effluent, discarded, recycled)
+                wastewater.copy_like(recycle1_discarded)
                 water.empty()
             # Not have enough water in both recycles, need supplementary water
             else:
-                water.imol['H2O'] = \
-                    - compute_extra_chemical(feed2, recycle1, esters, 'H2O', ratios)
+                water.imol['H2O'] = - extra_water
                 effluent.mix_from(self.ins)
                 wastewater.empty()
         
         rxns = self.hydrolysis_rxns
         rxns(effluent.mol)
-        self.outs[0].copy_like(effluent)
-        self.outs[1].copy_like(wastewater)
 
 
 # %% 
@@ -1169,11 +1198,12 @@ class AnaerobicDigestion(Unit):
         f_CO2 = 0.49 * 0.86/0.91/biogas_MW	
         f_sludge = 0.05 * 1/0.91/chems.WWTsludge.MW	
         	
-        def anaerobic_rxn(reactant):	
-            MW = getattr(chems, reactant).MW	
+        def anaerobic_rxn(reactant, MW):	
             return Rxn(f'{1/MW}{reactant} -> {f_CH4}CH4 + {f_CO2}CO2 + {f_sludge}WWTsludge',	
                        reactant, 0.91)	
-        self.digestion_rxns = ParallelRxn([anaerobic_rxn(i) for i in self.reactants])
+        MWs = chems.MW[chems.indices(self.reactants)]
+        self.digestion_rxns = ParallelRxn([anaerobic_rxn(i, MW) for i, MW
+                                           in zip(self.reactants, MWs)])
         
         self.sulfate_rxns = ParallelRxn([
             #   Reaction definition                           Reactant    Conversion
@@ -120,7 +120,16 @@ def compute_extra_chemical(feed, recycle, reactants_ID, chemical_ID, ratios):
     chemical_extra = (feed.imol[chemical_ID]+recycle.imol[chemical_ID]) - chemical_needed
     return chemical_extra
 
-def adjust_recycle(feed, recycle, reactants_ID, chemical_ID, ratios):
+# If the stream to copy into is given, copy in place instead of creating a new one
+def copy_stream(other, stream=None):
+    if stream is None: return other.copy()
+    stream.copy_like(other)
+    return stream
+
+# Streams to store results in (effluent, recycle_discarded, and recycle_recycled)
+# can be given to avoid creating new streams each time
+def adjust_recycle(feed, recycle, reactants_ID, chemical_ID, ratios,
+                   effluent=None, recycle_discarded=None, recycle_recycled=None):
     feed_chemical_needed = (feed.imol[reactants_ID]*ratios).sum() \
         - feed.imol[chemical_ID]
     
@@ -128,10 +137,10 @@ def adjust_recycle(feed, recycle, reactants_ID, chemical_ID, ratios):
         - (recycle.imol[reactants_ID]*ratios).sum()
     
     split = feed_chemical_needed / recycle_chemical_extra
-    effluent = feed.copy()
-    recycle_recycled = recycle.copy()
+    effluent = copy_stream(feed, effluent)
+    recycle_recycled = copy_stream(recycle, recycle_recycled)
     recycle_recycled.mol *= split
-    recycle_discarded = recycle.copy()
+    recycle_discarded = copy_stream(recycle, recycle_discarded)
     recycle_discarded.mol *= (1 - split)
     effluent.mix_from([feed, recycle_recycled])
     
@@ -145,22 +154,43 @@ def adjust_recycle(feed, recycle, reactants_ID, chemical_ID, ratios):
 #     C_nH_aO_bN_c + (n+a/4-b/2-3/4c)O2 -> nCO2 + (a/2-3/2c)H2O +cNH3
 # =============================================================================
 
-def compute_COD(IDs, stream):
-    unit_COD = []
-    if not iter(IDs):
-        raise TypeError(f'{IDs.__class__} is not iterable')
+# Stoichiometric O2 demands by Chemicals object and chemical IDs
+_COD_coefficients = {}
+
+def get_COD_coefficients(IDs, chemicals):
+    """
+    Return an array of stoichiometric O2 demands (kmol-O2/kmol) aligned with
+    the index of `chemicals`, chemicals not in `IDs` have a demand of 0.
+    Arrays are computed only once for each Chemicals object and IDs.
+    """
     if isinstance(IDs, str):
         IDs = (IDs,)
+    elif not iter(IDs):
+        raise TypeError(f'{IDs.__class__} is not iterable')
+    IDs = tuple(IDs)
+    key = (id(chemicals), IDs)
+    if key in _COD_coefficients: return _COD_coefficients[key][1]
+    coefficients = np.zeros(chemicals.size)
     for i in IDs:
-        if i not in stream.chemicals.IDs: continue
-        chemical = getattr(stream.chemicals, i)
+        if i not in chemicals.IDs: continue
         atoms = {}
         for j in ('C', 'H', 'O', 'N'): atoms[j] = 0
-        atoms.update(chemical.atoms)
+        atoms.update(getattr(chemicals, i).atoms)
         COD_ratio = atoms['C'] + atoms['H']/4 - atoms['O']/2 - 3/4*atoms['N']
-        unit_COD.append(COD_ratio)
-    unit_COD = np.asarray(unit_COD)
-    return unit_COD.sum()*32
+        coefficients[chemicals.index(i)] += COD_ratio
+    # Chemicals are kept alive so that their id is not reused
+    _COD_coefficients[key] = (chemicals, coefficients)
+    return coefficients
+
+# Note that the sum of stoichiometric O2 demands of all COD chemicals
+# (regardless of their flow) is used as the COD flow for design, 
+# use compute_stream_COD for the COD flow of the stream
+def compute_COD(IDs, stream):
+    return get_COD_coefficients(IDs, stream.chemicals).sum()*32
+
+def compute_stream_COD(IDs, stream):
+    """Return the COD flow of the stream (kg-O2/hr)."""
+    return get_COD_coefficients(IDs, stream.chemicals) @ stream.mol * 32
 
 
 # %% 
@@ -187,6 +217,22 @@ def find_split(IDs, flow0, flow1, chemical_groups):
     array[chemicals.index('WWTsludge')] = array[chemicals.index('FermMicrobe')]
     return array
 
+
+# %% 
+
+# =============================================================================
+# Function to set convergence settings of a system and all of its subsystems
+# (instead of the System class, so other systems are not affected)
+# =============================================================================
+
+def set_convergence(system, converge_method, maxiter, molar_tolerance):
+    system.maxiter = maxiter
+    system.molar_tolerance = molar_tolerance
+    if system.recycle: system.converge_method = converge_method
+    for i in system.subsystems:
+        set_convergence(i, converge_method, maxiter, molar_tolerance)
+
+
 IDs = ('Ethanol', 'H2O', 'Glucose', 'Xylose', 'OtherSugars',
     'SugarOligomers', 'OrganicSolubleSolids', 'InorganicSolubleSolids', 'Ammonia', 'AceticAcid', 
     'SulfuricAcid', 'Furfurals', 'OtherOrganics', 'CO2', 'CH4',
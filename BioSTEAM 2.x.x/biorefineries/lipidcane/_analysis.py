@@ -13,6 +13,8 @@ import biorefineries.sugarcane as sc
 from biorefineries.lipidcane.model import (lipidcane_model as model_lc,
                                            lipidcane_model_with_lipidfraction_parameter as model_lc_lf)
 from biorefineries.sugarcane.model import sugarcane_model as model_sc
+from biorefineries.evaluation import (evaluate_across_coordinate, evaluate_sequentially,
+                                      evaluate_in_shared_memory)
 
 def run_uncertainty(N_spearman_samples = 5000,
                     N_coordinate_samples = 1000,
@@ -25,22 +27,22 @@ def run_uncertainty(N_spearman_samples = 5000,
     samples = model_lc.sample(N_coordinate_samples, rule)
     model_lc.load_samples(samples)
     
-    model_lc.evaluate_across_coordinate('Lipid fraction',
-          lc.utils.set_lipid_fraction, coordinate,
-          xlfile='Monte Carlo across lipid fraction.xlsx')
+    results = evaluate_across_coordinate(model_lc, 'Lipid fraction',
+                                         lc.utils.set_lipid_fraction, coordinate,
+                                         notify=True)
+    results.to_excel('Monte Carlo across lipid fraction.xlsx')
         
     # Sugar cane Monte Carlo    
     samples = model_sc.sample(N_coordinate_samples, rule)
     model_sc.load_samples(samples)
-    model_sc.evaluate()
+    evaluate_in_shared_memory(model_sc)
     model_sc.table.to_excel('Monte Carlo sugarcane.xlsx')
 
     if N_spearman_samples:
-        # Spearman's correlation    
-        samples = model_lc_lf.sample(N_spearman_samples, rule)
-        model_lc_lf.load_samples(samples)
-        model_lc_lf.evaluate()
+        # Spearman's correlation (stops once coefficients converge)
         IRR_metric = model_lc_lf.metrics[0]
+        evaluate_sequentially(model_lc_lf, N_spearman_samples, rule=rule,
+                              percentiles=(), spearman_metrics=(IRR_metric,))
         spearman = model_lc_lf.spearman(metrics=(IRR_metric,))
         spearman.to_excel("Spearman correlation lipidcane.xlsx")
 
@@ -51,10 +53,9 @@ def run_without_uncertainty(N_coordinates = 40):
     sample = model_lc.get_baseline_sample()
     samples = np.expand_dims(sample, axis=0)
     model_lc.load_samples(samples)
-    model_lc.evaluate_across_coordinate('Lipid fraction',
-          lc.utils.set_lipid_fraction, coordinate,
-          xlfile='Monte Carlo across lipid fraction.xlsx',
-          notify=False)
+    results = evaluate_across_coordinate(model_lc, 'Lipid fraction',
+                                         lc.utils.set_lipid_fraction, coordinate)
+    results.to_excel('Monte Carlo across lipid fraction.xlsx')
     
     # Sugar cane
     sample = model_sc.get_baseline_sample()
@@ -14,6 +14,7 @@ import biosteam as bst
 from biosteam import units
 from ._process_settings import price
 from ..sugarcane import create_ethanol_production_system
+from ..evaluation import use_distillation_design_cache
 
 __all__ = ('create_system',)
 
@@ -480,6 +481,7 @@ def create_system(ID='lipidcane_sys'):
         D402.outs[0].imol['Water'] = 1100*C402.outs[0].imol['Glycerol']
             
     D402.specification = startup_water
+    use_distillation_design_cache(D401, D402)
     
     # Condense recycle methanol
     H403 = units.HXutility('H403', V=0, T=315)
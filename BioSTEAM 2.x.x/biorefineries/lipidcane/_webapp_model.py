@@ -7,6 +7,8 @@
 # for license details.
 """
 """
+import os
+import tempfile
 import matplotlib.pyplot as plt
 import biosteam as bst
 from biorefineries import lipidcane as lc
@@ -14,6 +16,8 @@ from biosteam.evaluation import Model, Metric
 from biosteam.evaluation.evaluation_tools import triang
 from biosteam.process_tools import UnitGroup
 from biosteam import plots
+from biorefineries.evaluation import (evaluate_across_coordinate, scale_flows,
+                                      EvaluationService)
 import pandas as pd
 import numpy as np
 
@@ -54,8 +58,11 @@ metrics_by_name = {i.name: i for i in metrics}
 plant_size_ = lc.lipidcane.F_mass * lc.lipidcane_tea.operating_days * 24 / 907.185
 constant_lipid_content = False
 def load_specifications():
-    # Plant size
-    lc.lipidcane.F_mass = plant_size_ / (lc.lipidcane_tea.operating_days * 24 / 907.185)
+    # Plant size; flows (other than feeds) are scaled linearly so that the
+    # simulation at the new capacity starts close to the solution
+    F_mass = plant_size_ / (lc.lipidcane_tea.operating_days * 24 / 907.185)
+    scale_flows(lc.lipidcane_sys, F_mass / lc.lipidcane.F_mass, feeds=False)
+    lc.lipidcane.F_mass = F_mass
 
 model = Model(lc.lipidcane_sys, metrics, load_specifications)
 param = model.parameter
@@ -109,6 +116,17 @@ model.get_parameters()[-1].name = 'IRR'
 
 # %% Interface
 
+#: [EvaluationService] Serves requests with a pool of workers forked from the
+#: converged system and caches results on disk by the rounded sample.
+service = EvaluationService(model, 
+                            cache=os.path.join(tempfile.gettempdir(),
+                                               'biorefineries_lipidcane_webapp'))
+
+def metric_values_to_series(values):
+    """Return a pandas.Series object of metric values by name."""
+    index = pd.MultiIndex.from_tuples([i.index for i in model.metrics])
+    return pd.Series(values, index)['Biorefinery']
+
 def evaluate_sample(lipid_content, plant_size, operating_days, ethanol_price,
                     lipidcane_price, electricity_price, IRR):
     """
@@ -135,8 +153,27 @@ def evaluate_sample(lipid_content, plant_size, operating_days, ethanol_price,
     46295.52888978263
     
     """
-    return model([lipid_content, plant_size, operating_days, ethanol_price,
-                  lipidcane_price, electricity_price, IRR])['Biorefinery']
+    values = service.evaluate([lipid_content, plant_size, operating_days, 
+                               ethanol_price, lipidcane_price, 
+                               electricity_price, IRR])
+    return metric_values_to_series(values)
+
+def iter_montecarlo(N=100, rule='L'):
+    """
+    Evaluate N samples and yield 2d arrays of metric values by sample 
+    (rows) and metric (columns) evaluated so far, as soon as each sample
+    is evaluated.
+    
+    Examples
+    --------
+    >>> # for values in iter_montecarlo(100): update_plot(values)
+    
+    """
+    samples = model.sample(N, rule)
+    values = np.zeros([len(samples), len(metrics)])
+    for n, (i, sample_values) in enumerate(service.imap(samples)):
+        values[n] = sample_values
+        yield values[:n+1]
 
 def plot_montecarlo(metric, N=100):
     """
@@ -156,10 +193,9 @@ def plot_montecarlo(metric, N=100):
     
     """
     if isinstance(metric, str): metric = metrics_by_name[metric]
-    samples = model.sample(N, 'L')
-    model.load_samples(samples)
-    model.evaluate()
-    df = model.table[[metric.index]]
+    for values in iter_montecarlo(N): pass
+    df = pd.DataFrame(values[:, metrics.index(metric)], 
+                      columns=pd.MultiIndex.from_tuples([metric.index]))
     bx = plots.plot_montecarlo(df, transpose=True)
     plt.xticks([], [])
     plt.ylabel(metric.name_with_units)
@@ -188,9 +224,8 @@ def plot_montecarlo_across_lipid_content(metric,
     model.load_samples(samples)
     
     constant_lipid_content = True
-    model.evaluate_across_coordinate('Lipid fraction',
-          lc.utils.set_lipid_fraction, coordinate,
-          xlfile='Monte Carlo across lipid fraction.xlsx')
+    results = evaluate_across_coordinate(model, 'Lipid fraction',
+                                         lc.utils.set_lipid_fraction, coordinate)
     constant_lipid_content = False    
     
     # TODO: Add model for sugarcane
@@ -205,9 +240,7 @@ def plot_montecarlo_across_lipid_content(metric,
     fig = plt.figure()
     
     # Plot lipid-cane    
-    readxl = lambda sheet: pd.read_excel('Monte Carlo across lipid fraction.xlsx',
-                                         sheet_name=sheet, index_col=0)
-    df_metric = readxl(metric.name)
+    df_metric = results.to_frame(metric)
     lipid_content = np.array(df_metric.columns) * 100
     plt.ylabel(metric.name_with_units)
     plots.plot_montecarlo_across_coordinate(lipid_content, df_metric)
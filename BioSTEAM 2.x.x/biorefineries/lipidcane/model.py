@@ -10,6 +10,7 @@
 from biosteam.evaluation import Model, Metric
 from biosteam.evaluation.evaluation_tools import triang
 from biosteam.process_tools import UnitGroup
+from biorefineries.evaluation import UnitGroupResults, MetricGraph
 import biorefineries.lipidcane as lc
 import numpy as np
 
@@ -20,32 +21,37 @@ ethanol = lc.ethanol
 biodiesel = lc.biodiesel
 lipidcane = lc.lipidcane
 ugroup = UnitGroup('Biorefinery', tea.units)
+unit_group_results = UnitGroupResults(ugroup.units)
 
-etoh_prodcost = [0]
+# Intermediate results shared by metrics are computed once per sample
+graph = MetricGraph(specification=unit_group_results.reset)
+IRR = graph.intermediate('IRR', f=tea.solve_IRR)
 products = (biodiesel, ethanol)
-def get_biodiesel_prodcost():
-    bd, etoh_prodcost[0] = tea.production_cost(products)
-    return bd
-get_etoh_prodcost = lambda: etoh_prodcost[0]
+production_costs = graph.intermediate('Production costs',
+                                      f=lambda: tea.production_cost(products))
+get_biodiesel_prodcost = lambda: production_costs()[0]
+get_etoh_prodcost = lambda: production_costs()[1]
+# FCI is cached by the TEA when solving the IRR
 get_FCI = lambda: tea._FCI_cached
 get_ethanol_production = lambda: lc.ethanol.F_mass * tea._annual_factor
 get_biodiesel_production = lambda: lc.biodiesel.F_mass * tea._annual_factor
 get_steam = lambda: sum([i.flow for i in lc.BT.steam_utilities])*18.01528*tea._annual_factor/1000
-get_electricity_consumption = lambda: tea._annual_factor * ugroup.get_electricity_consumption()
-get_electricity_production = lambda: tea._annual_factor * ugroup.get_electricity_production()
+get_electricity_consumption = lambda: tea._annual_factor * unit_group_results.get_electricity_consumption()
+get_electricity_production = lambda: tea._annual_factor * unit_group_results.get_electricity_production()
 get_excess_electricity = lambda: get_electricity_production() - get_electricity_consumption()
 
-metrics = (Metric('Internal rate of return', lc.lipidcane_tea.solve_IRR),
+metrics = (Metric('Internal rate of return', IRR),
            Metric('Biodiesel production cost', get_biodiesel_prodcost, 'USD/yr'),
            Metric('Ethanol production cost', get_etoh_prodcost, 'USD/yr'),
-           Metric('Fixed capital investment', get_FCI, 'USD'),
+           graph.metric('Fixed capital investment', 'USD', dependencies=[IRR],
+                        getter=lambda IRR: get_FCI()),
            Metric('Biodiesel production', get_biodiesel_production, 'kg/yr'),
            Metric('Ethanol production', get_ethanol_production, 'kg/yr'),
            Metric('Steam', get_steam, 'MT/yr'),
            Metric('Consumed electricity', get_electricity_consumption, 'MWhr/yr'),
            Metric('Excess electricity', get_excess_electricity, 'MWhr/yr'))
 
-lipidcane_model = Model(lc.lipidcane_sys, metrics)
+lipidcane_model = Model(lc.lipidcane_sys, metrics, specification=graph)
 lipidcane_model.load_default_parameters(lipidcane)
 param = lipidcane_model.parameter
 
@@ -11,63 +11,58 @@ energy balance the given oil composition of lipid cane to determine its
 composition.
 
 """
-from thermosteam import Stream
+import numpy as np
 from biorefineries import lipidcane as lc
-from numpy import array
+from biorefineries.evaluation import FeedstockComposition
 
 __all__ = ('set_lipid_fraction',
-           'get_lipid_fraction')
+           'get_lipid_fraction',
+           'get_lipidcane_flows')
 
-def set_lipid_fraction(lipid_fraction, stream=None, data={}):
-    """Adjust composition of lipid cane to achieve desired oil fraction (dry weight)."""
+# Feedstock compositions by stream, relative compositions of carbohydrates 
+# and fiber are those of the stream when first used
+_compositions = {}
+
+def get_lipidcane_composition(stream):
+    if stream in _compositions: return _compositions[stream]
+    _compositions[stream] = composition = FeedstockComposition(
+        stream,
+        {'Water': 'Water',
+         'Ash': 'Ash',
+         'Solids': 'Solids',
+         'Lipid': 'Lipid',
+         'Carbs': ('Glucose', 'Sucrose'),
+         'Fiber': ('Lignin', 'Cellulose', 'Hemicellulose')},
+        balance='Fiber', dry=False
+    )
+    return composition
+
+def get_lipidcane_flows(lipid_fractions, stream=None):
+    """
+    Return a 2d array of lipid cane mass flow rates (kg/hr) by oil fraction
+    (dry weight) and chemical, and a 1d array of whether each composition is
+    feasible.
+    """
     if not stream: stream = lc.lipidcane
-    if not data:
-        carbs_IDs = ('Glucose', 'Sucrose')
-        fiber_IDs = ('Lignin', 'Cellulose', 'Hemicellulose')
-        lipid_IDs = ('Lipid',)
-        
-        carbs   = Stream('Carbs', thermo=stream.thermo)
-        fiber   = Stream('Fiber', thermo=stream.thermo)
-        lipid   = Stream('Lipid', thermo=stream.thermo)
-        carbs.imol[carbs_IDs] = stream.imol[carbs_IDs]
-        fiber.imol[fiber_IDs] = stream.imol[fiber_IDs]
-        lipid.imol[lipid_IDs] = stream.imol[lipid_IDs]
-        
-        # Mass property arrays
-        carbs_mass = stream.imass[carbs_IDs]
-        fiber_mass = stream.imass[fiber_IDs]
-        lipid_mass = stream.imass[lipid_IDs]
-        
-        # Net weight
-        carbs_massnet = carbs_mass.sum()
-        fiber_massnet = fiber_mass.sum()
-        lipid_massnet = lipid_mass.sum()
-        
-        # Heats of combustion per kg
-        LHV_carbs_kg = carbs.LHV/carbs_massnet
-        LHV_lipid_kg = lipid.LHV/lipid_massnet
-        data['LHV_lipid_over_carbs'] = LHV_lipid_kg / LHV_carbs_kg
-        
-        
-        # Relative composition
-        data['r_mass_carbs'] = array(carbs_mass/carbs_massnet)
-        data['r_mass_fiber'] = array(fiber_mass/fiber_massnet)
-        
-    z_mass_lipid = lipid_fraction
-    F_mass = stream.F_mass
+    composition = get_lipidcane_composition(stream)
+    LHV_lipid_over_carbs = composition.get_LHV('Lipid') / composition.get_LHV('Carbs')
     z_dry = 0.3
-    z_mass_lipid = z_mass_lipid * z_dry 
-    z_mass_carbs = 0.149 - z_mass_lipid * data['LHV_lipid_over_carbs']
-    z_mass_fiber = z_dry - z_mass_carbs - z_mass_lipid - 0.006 - 0.015
-    imass = stream.imass
-    imass['Water'] = F_mass*0.7
-    imass['Ash'] = F_mass*0.006
-    imass['Solids'] = F_mass*0.015
-    imass['Lipid'] = z_mass_lipid * F_mass
-    imass['Glucose', 'Sucrose'] = data['r_mass_carbs'] * z_mass_carbs * F_mass
-    imass['Lignin', 'Cellulose', 'Hemicellulose'] = data['r_mass_fiber'] * z_mass_fiber * F_mass
-    if any(stream.mol < 0):
-        raise ValueError(f'lipid cane oil composition of {z_mass_lipid*100:.0f}% dry weight is infeasible')
+    z_mass_lipid = np.asarray(lipid_fractions, dtype=float) * z_dry 
+    z_mass_carbs = 0.149 - z_mass_lipid * LHV_lipid_over_carbs
+    return composition.flows({'Water': 0.7,
+                              'Ash': 0.006,
+                              'Solids': 0.015,
+                              'Lipid': z_mass_lipid,
+                              'Carbs': z_mass_carbs},
+                             stream)
+
+def set_lipid_fraction(lipid_fraction, stream=None):
+    """Adjust composition of lipid cane to achieve desired oil fraction (dry weight)."""
+    if not stream: stream = lc.lipidcane
+    (mass,), (feasible,) = get_lipidcane_flows(lipid_fraction, stream)
+    if not feasible:
+        raise ValueError(f'lipid cane oil composition of {lipid_fraction*30:.0f}% dry weight is infeasible')
+    stream.mass = mass
 
 def get_lipid_fraction(stream=None):
     if not stream: stream = lc.lipidcane
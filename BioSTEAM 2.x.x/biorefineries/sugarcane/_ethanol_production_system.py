@@ -8,6 +8,7 @@ Created on Thu Dec 21 11:05:24 2017
 import biosteam as bst
 from biosteam import units
 from ._process_settings import price
+from biorefineries.evaluation import use_linear_recycle_solver, use_distillation_design_cache
 
 __all__ = ('create_ethanol_production_system',
            'mass2molar_ethanol_fraction')
@@ -175,6 +176,16 @@ def create_ethanol_production_system(ID='ethanol_production_sys',
     
     ### System ###
     
+    ethanol_recycle_from_molecular_sieves = bst.System(
+        'ethanol_recycle_from_molecular_sieves',
+        [M303,
+         D303,
+         H303,
+         U301],
+        recycle=U301-0)
+    use_linear_recycle_solver(ethanol_recycle_from_molecular_sieves)
+    use_distillation_design_cache(D302, D303)
+    
     return bst.System(ID, 
                 [S301, 
                  F301, 
@@ -192,12 +203,7 @@ def create_ethanol_production_system(ID='ethanol_production_sys',
                       D302,
                       P302],
                      recycle=P302-0),
-                 bst.System('ethanol_recycle_from_molecular_sieves',
-                     [M303,
-                      D303,
-                      H303,
-                      U301],
-                     recycle=U301-0),
+                 ethanol_recycle_from_molecular_sieves,
                  H304,
                  T302, 
                  P304,
@@ -39,6 +39,15 @@ def test_lipidcane():
     assert np.allclose(units.get_electricity_consumption(), 9.65815356491132, rtol=1e-2)
     assert np.allclose(units.get_electricity_production(), 92.62805713580244, rtol=1e-2)
 
+def test_lipidcane_webapp_model():
+    from biorefineries.lipidcane import _webapp_model as webapp
+    try:
+        values = webapp.evaluate_sample(*webapp.model.get_baseline_sample())
+    finally:
+        webapp.service.close()
+    assert len(values) == len(webapp.metrics)
+    assert not values.isna().any()
+
 def test_cornstover():
     from biorefineries import cornstover as cs
     cs.load()
@@ -84,10 +93,31 @@ def test_wheatstraw():
     assert np.allclose(units.get_cooling_duty(), 270.20290353471364, rtol=1e-2)
     assert np.allclose(units.get_electricity_consumption(), 22.924114167705298, rtol=1e-2)
     assert np.allclose(units.get_electricity_production(), 39.74032666884628, rtol=1e-2)
+
+def test_fattyalcohol_specifications():
+    import biosteam as bst
+    from types import SimpleNamespace
+    from biorefineries import fattyalcohols as fa
+    bst.main_flowsheet.set_flowsheet('fattyalcohols')
+    system = fa.create_system()
+    system.simulate()
+    specs = fa.FattyalcoholProcessSpecifications(system, SimpleNamespace(operating_days=None))
+    specs.load_specifications()
+    system.simulate()
+    F_mass = specs.feed.F_mass
+    specs.scale_plant_size(2 * specs.plant_size)
+    assert np.allclose(specs.feed.F_mass, 2 * F_mass)
+    metrics = [lambda: specs.reactor.design_results['Reactor volume']]
+    results = specs.evaluate_across_TRY(np.array([specs.titer]), np.array([specs.yield_]), 
+                                        metrics, np.array([0.5, 1.]), processes=1)
+    assert results.shape == (1, 1, 2)
+    assert not np.isnan(results).any()
     
 if __name__ == '__main__':
     test_sugarcane()
     test_lipidcane()
+    test_lipidcane_webapp_model()
     test_cornstover()
     test_wheatstraw()
-    test_LAOs()
\ No newline at end of file
+    test_LAOs()
+    test_fattyalcohol_specifications()
\ No newline at end of file
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+import pytest
+
+def test_unit_group_results():
+    from biorefineries import cornstover as cs
+    from biorefineries.evaluation import UnitGroupResults
+    cs.load()
+    results = UnitGroupResults(cs.AllAreas.units, cs.areas)
+    for area in (cs.AllAreas, *cs.areas):
+        name = None if area is cs.AllAreas else area.name
+        assert np.allclose(results.get_installed_cost(name), area.get_installed_cost())
+        assert np.allclose(results.get_heating_duty(name), area.get_heating_duty())
+        assert np.allclose(results.get_cooling_duty(name), area.get_cooling_duty())
+        assert np.allclose(results.get_electricity_consumption(name),
+                           area.get_electricity_consumption())
+        assert np.allclose(results.get_electricity_production(name),
+                           area.get_electricity_production())
+
+def test_percentile_confidence_intervals():
+    from scipy.stats import norm
+    from biorefineries.evaluation import percentile_confidence_intervals
+    np.random.seed(0)
+    values = np.random.normal(size=[20000, 2])
+    percentiles = np.array([0.05, 0.5, 0.95])
+    lb, ub = percentile_confidence_intervals(values, percentiles)
+    assert lb.shape == ub.shape == (3, 2)
+    exact = norm.ppf(percentiles)[:, np.newaxis]
+    assert ((lb < exact) & (exact < ub)).all()
+    lb_small, ub_small = percentile_confidence_intervals(values[:500], percentiles)
+    assert ((ub - lb) < (ub_small - lb_small)).all()
+
+def test_morris_samples():
+    from types import SimpleNamespace
+    from biorefineries.evaluation import morris_samples
+    parameters = [SimpleNamespace(bounds=(0., 1.)),
+                  SimpleNamespace(bounds=(10., 20.)),
+                  SimpleNamespace(bounds=(-1., 1.))]
+    model = SimpleNamespace(get_parameters=lambda: parameters)
+    np.random.seed(0)
+    r = 5
+    k = len(parameters)
+    samples, steps, order = morris_samples(model, r, levels=4, uniform=True)
+    assert samples.shape == (r * (k + 1), k)
+    lb, ub = np.array([i.bounds for i in parameters]).transpose()
+    assert ((lb <= samples) & (samples <= ub)).all()
+    assert np.allclose(np.abs(steps), 2. / 3.)
+    trajectories = samples.reshape([r, k + 1, k])
+    for t in range(r):
+        assert sorted(order[t]) == list(range(k))
+        for n, i in enumerate(order[t]):
+            # Only one parameter changes at each step
+            change = trajectories[t, n + 1] - trajectories[t, n]
+            assert np.allclose(np.delete(change, i), 0.)
+            assert np.isclose(change[i], steps[t, i] * (ub[i] - lb[i]))
+
+def test_polynomial_chaos_sobol_indices():
+    from scipy.stats import uniform
+    from biorefineries.evaluation import PolynomialChaosExpansion
+    # Ishigami function, which has analytical Sobol indices
+    a = 7.
+    b = 0.1
+    distributions = 3 * [uniform(-np.pi, 2. * np.pi)]
+    np.random.seed(0)
+    samples = np.column_stack([i.rvs(400) for i in distributions])
+    x1, x2, x3 = samples.transpose()
+    values = np.sin(x1) + a * np.sin(x2)**2 + b * x3**4 * np.sin(x1)
+    expansion = PolynomialChaosExpansion(distributions, order=8).fit(samples, values)
+    V1 = 0.5 * (1. + b * np.pi**4 / 5.)**2
+    V2 = a**2 / 8.
+    V13 = b**2 * np.pi**8 * (1. / 18. - 1. / 50.)
+    V = V1 + V2 + V13
+    first_order, total = expansion.sobol_indices()
+    assert np.allclose(expansion.mean, a / 2., rtol=0.02)
+    assert np.allclose(expansion.variance, V, rtol=0.05)
+    assert np.allclose(first_order, [V1 / V, V2 / V, 0.], atol=0.03)
+    assert np.allclose(total, [(V1 + V13) / V, V2 / V, V13 / V], atol=0.03)
+
+def test_sample_evaluator():
+    import time
+    from types import SimpleNamespace
+    from biorefineries.evaluation import SampleEvaluator
+    simulations = []
+    def simulate():
+        simulations.append(delay)
+        if fail and len(simulations) == 1: raise RuntimeError('first simulation failed')
+        time.sleep(delay)
+    def set_delay(value):
+        nonlocal delay
+        delay = value
+    delay = 0.
+    fail = False
+    system = SimpleNamespace(streams=(), simulate=simulate, reset_cache=lambda: None)
+    model = SimpleNamespace(_system=system, _specification=None,
+                            _setters=[set_delay], _getters=[lambda: delay],
+                            _failed_metrics=[np.nan])
+    evaluator = SampleEvaluator(model, timeout=0.5)
+    assert evaluator([0.01]) == [0.01]
+    assert not evaluator.failure
+    # Simulations that exceed the time budget are stopped and not retried
+    simulations.clear()
+    start = time.perf_counter()
+    assert np.isnan(evaluator([10.])).all()
+    assert time.perf_counter() - start < 2.
+    assert evaluator.failure.startswith('EvaluationTimeout')
+    assert len(simulations) == 1
+    # Failed simulations are retried once from the saved state
+    simulations.clear()
+    fail = True
+    assert evaluator([0.02]) == [0.02]
+    assert not evaluator.failure
+    assert len(simulations) == 2
+
+def test_linear_recycle_solver():
+    from types import SimpleNamespace
+    from biorefineries.evaluation import use_linear_recycle_solver
+    # Linear loop with a slowly converging component (by substitution)
+    A = np.array([[0.2, 0.05, 0.],
+                  [0., 0.9, 0.],
+                  [0., 0.3, 0.5]])
+    b = np.array([100., 1000., 10.])
+    passes = []
+    def run():
+        passes.append(1)
+        data = recycle.imol.data
+        data[:] = A @ data + b
+    def converge():
+        raise AssertionError('linear loops should not need the original converge method')
+    def reset_iter():
+        system._iter = 0
+    recycle = SimpleNamespace(imol=SimpleNamespace(data=np.zeros(3)), T=300.)
+    system = SimpleNamespace(recycle=recycle, _run=run, _converge_method=converge,
+                             _reset_iter=reset_iter, molar_tolerance=1e-6,
+                             temperature_tolerance=0.1)
+    solver = use_linear_recycle_solver(system)
+    assert system._converge_method is solver
+    system._converge_method()
+    assert np.allclose(recycle.imol.data, np.linalg.solve(np.eye(3) - A, b))
+    assert len(passes) <= 6 # One pass, three probes, and verification
+    # The transfer matrix is reused at new feed flow rates
+    b *= 1.3
+    passes.clear()
+    system._converge_method()
+    assert np.allclose(recycle.imol.data, np.linalg.solve(np.eye(3) - A, b))
+    assert len(passes) <= 3
+    assert solver.linear
+
+def test_work_queue():
+    import os
+    import time
+    import tempfile
+    from types import SimpleNamespace
+    from biorefineries.evaluation import WorkQueue, failure_index
+    samples = np.arange(10.).reshape([5, 2])
+    metric_index = ('Model', 'Metric')
+    model = SimpleNamespace(_samples=samples, _index=[4, 3, 2, 1, 0], metrics=[None],
+                            table={}, _metric_indices=metric_index)
+    with tempfile.TemporaryDirectory() as directory:
+        queue = WorkQueue(os.path.join(directory, 'queue.db'), lease=0.2, max_attempts=2)
+        assert queue.enqueue(model, chunksize=2) == 3
+        assert queue.get_meta() == {'N_samples': 5, 'N_parameters': 2, 'N_metrics': 1}
+        # Chunks follow the model's order of evaluation
+        first = queue.claim('a')
+        assert list(first.rows) == [4, 3]
+        assert (first.samples == samples[[4, 3]]).all()
+        second = queue.claim('b')
+        third = queue.claim('c')
+        assert queue.claim('d') is None
+        # Only the worker holding the lease renews it
+        assert queue.renew(first, 'a')
+        assert not queue.renew(first, 'b')
+        assert queue.complete(first, first.samples[:, :1])
+        assert not queue.complete(first, first.samples[:, :1])
+        # Chunks with expired leases are claimed again
+        time.sleep(0.3)
+        assert queue.claim('d').ID == second.ID
+        assert not queue.renew(second, 'b')
+        assert queue.claim('d').ID == third.ID
+        assert queue.complete(second, second.samples[:, :1])
+        # Chunks fail once the lease of the last attempt expires
+        time.sleep(0.3)
+        assert queue.claim('e') is None
+        assert queue.progress() == {'done': 2, 'failed': 1}
+        assert queue.collect(model, wait=True, poll=0.) == 4
+        values = model.table[metric_index]
+        assert np.isnan(values[0]).all()
+        assert (values[1:, 0] == samples[1:, 0]).all()
+        failures = model.table[failure_index]
+        assert failures[0].startswith('AbandonedChunk') and not any(failures[1:])
+        # Late results replace failed chunks
+        assert queue.complete(third, third.samples[:, :1])
+        assert queue.collect(model) == 5
+
+if __name__ == '__main__':
+    test_unit_group_results()
+    test_percentile_confidence_intervals()
+    test_morris_samples()
+    test_polynomial_chaos_sobol_indices()
+    test_sample_evaluator()
+    test_linear_recycle_solver()
+    test_work_queue()
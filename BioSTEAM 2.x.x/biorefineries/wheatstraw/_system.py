@@ -14,6 +14,8 @@ from biorefineries.wheatstraw import units
 import thermosteam.reaction as rxn
 import numpy as np
 from biosteam.process_tools import BoundedNumericalSpecification
+from scipy.optimize import brentq
+from biorefineries.evaluation import use_linear_recycle_solver, use_distillation_design_cache
 
 
 __all__ = ('create_system',)
@@ -137,24 +139,43 @@ def create_system(ID='wheatstraw_sys'):
     steam_out0 = S203-0
     def update_split():
         steam_out1.mol[:] = steam_inS203.mol[:] - steam_out0.mol[:]
+    
+    ### TODO: There is a bug in original code; for now spec is constant
+#    S203.split[:] = 0.5
+    T90 = 90+273.15
+    def f_DSpret(split):
+        S203.split[:] = split
+        S203._run()
+        M205._run()
+        return M205.outs[0].T-T90
+    
+    # The split is solved at every iteration of the pretreatment recycle
+    # (only S203 and M205 are run), so the split and the recycle converge
+    # together in one loop
+    bracketed = [True]
+    def adjust_split():
+        f_lb = f_DSpret(0.10)
+        f_ub = f_DSpret(0.70)
+        bracketed[0] = f_lb * f_ub <= 0.
+        if bracketed[0]:
+            brentq(f_DSpret, 0.10, 0.70)
+        elif abs(f_lb) < abs(f_ub): # Not bracketed yet (e.g. empty recycle)
+            f_DSpret(0.10)
         
     pretreatment_sys = System('pretreatment_sys',
                    path=(water_recycle_sys,
-                            M205, M203,
+                            adjust_split, M205, M203,
                             R201, P201, T202, F201, M204,
                             S202, S203, update_split, H201), # TODO: H201 moved to the end, no need to resimulate system
                    recycle=M204-0)          
     
-    ### TODO: There is a bug in original code; for now spec is constant
-#    S203.split[:] = 0.5
-    T90 = 90+273.15
-    def f_DSpret(split):
-        S203.split[:] = split
-        for i in range(3): pretreatment_sys.simulate()
-        sobj=M205-0
-        return sobj.T-T90
+    def check_pretreatment_split():
+        pretreatment_sys._converge()
+        if not bracketed[0]:
+            raise RuntimeError('M205 outlet temperature cannot reach '
+                               f'{T90 - 273.15:.0f} C within split bounds')
     
-    pretreatment_sys.specification = BoundedNumericalSpecification(f_DSpret, 0.10, 0.70)    
+    pretreatment_sys.specification = check_pretreatment_split
 
     
     ### Fermentation system ###
@@ -463,6 +484,8 @@ def create_system(ID='wheatstraw_sys'):
     ethanol_recycle_sys = System('ethanol_recycle_sys',
                                  path=(M404, D404, H404, U401),
                                  recycle=M404-0)
+    use_linear_recycle_solver(ethanol_recycle_sys)
+    use_distillation_design_cache(D402, D403, D404)
 
     # Condense ethanol product
     H405 = bst.HXutility('H405', ins=U401-1, V=0,T=dist_high_dp.T-1)
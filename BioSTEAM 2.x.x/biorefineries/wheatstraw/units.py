@@ -558,7 +558,11 @@ class DistillationColumn(bst.BinaryDistillation):
         bst.BinaryDistillation._run(self)
             
     def _design(self):
-        bst.BinaryDistillation._design(self)       
+        bst.BinaryDistillation._design(self)
+        self._design_tower()
+
+    def _design_tower(self):
+        # Also used by DistillationDesignCache objects for rescaled designs
         H=self.get_design_result('Height','ft')
         Di=self.get_design_result('Diameter','ft')
         Po = self.P * 0.000145078 #to psi
@@ -577,7 +581,6 @@ class DistillationColumn(bst.BinaryDistillation):
         if self.energy_integration:  
             self.boiler.heat_utilities[0].flow=0
             self.boiler.heat_utilities[0].cost=0
-        self._simulate_components()    
 # %% Biogas production
 
 @cost('Reactor cooling', 'Heat exchangers', CE=522, cost=23900,
@@ -28,6 +28,7 @@ setup(
                            'fattyalcohols/units/*',
                            'LAOs/*',
                            'LAOs/units/*',
+                           'evaluation/*',
                            'tests/*',
                       ]},
     platforms=['Windows', 'Mac', 'Linux'],